@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, List
+from typing import Dict, List, Optional
 from app.services.dataset_service import DatasetService
+from app.services.feature_engine import parse_feature_names
 
 router = APIRouter(prefix="/dataset", tags=["dataset"])
 dataset_service = DatasetService()
@@ -41,9 +42,12 @@ async def toggle_leak_mode(sensor_id: str, leak_mode: bool):
     return {"message": f"Mode fuite {'activé' if leak_mode else 'désactivé'} pour le capteur {sensor_id}"}
 
 @router.get("/sensor/{sensor_id}/next-segment")
-async def get_next_segment(sensor_id: str):
+async def get_next_segment(sensor_id: str, features: Optional[str] = None):
     """Récupère le prochain segment avec spectrogramme pour un capteur"""
-    result = dataset_service.get_next_segment(sensor_id)
+    try:
+        result = dataset_service.get_next_segment(sensor_id, parse_feature_names(features))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if result is None:
         raise HTTPException(status_code=404, detail="Aucune donnée disponible pour ce capteur")
     
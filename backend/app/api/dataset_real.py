@@ -1,9 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
+import asyncio
 import random
 import numpy as np
-import pandas as pd
 from pathlib import Path
 from scipy import signal as scipy_signal
+from app.services.signal_store import signal_store
+from app.services.dataset_manifest import manifest_for_root
+from app.services.spectrogram_store import spectrogram_store, PROFILES
+from app.services.feature_engine import DATASET_SAMPLE_RATE, feature_engine, parse_feature_names
 
 router = APIRouter()
 
@@ -16,11 +21,8 @@ SENSOR_STATES = {str(i): {"leak_mode": False, "files": [], "position": 0} for i
 def load_csv_files():
     """Charger les fichiers CSV disponibles"""
     try:
-        normal_path = DATA_DIR / "Branched" / "No-leak"
-        leak_path = DATA_DIR / "Branched" / "Gasket Leak"
-        
-        if normal_path.exists():
-            normal_files = list(normal_path.glob("*.csv"))
+        normal_files = manifest_for_root(DATA_DIR).paths(network_type="branched", leak_class="normal")
+        if normal_files:
             for i in range(1, 6):
                 SENSOR_STATES[str(i)]["files"] = normal_files
                 
@@ -40,24 +42,24 @@ def get_real_data(sensor_id: str):
     try:
         # Choisir un fichier aléatoirement
         csv_file = random.choice(state["files"])
-        df = pd.read_csv(csv_file)
-        
-        # Prendre la première colonne numérique
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        if len(numeric_cols) == 0:
-            return generate_test_data(sensor_id)
-        
-        values = df[numeric_cols[0]].values
+        total_rows = signal_store.row_count(csv_file)
         
-        # Prendre un segment aléatoire
-        segment_size = min(2000, len(values) // 4)
-        start_idx = random.randint(0, max(0, len(values) - segment_size))
-        segment = values[start_idx:start_idx + segment_size]
+        # Prendre un segment aléatoire (lecture ciblée, sans parser tout le fichier)
+        # Début aligné sur le hop STFT pour pouvoir servir les trames précalculées
+        hop = PROFILES["dataset_real"].hop
+        segment_size = min(2000, total_rows // 4)
+        start_idx = random.randint(0, max(0, total_rows - segment_size))
+        start_idx -= start_idx % hop
+        segment = signal_store.read_segment(csv_file, start_idx, start_idx + segment_size)
         
-        # Calculer spectrogramme avec scipy
-        fs = 1000.0
-        f, t, Sxx = scipy_signal.spectrogram(segment, fs=fs, nperseg=128, noverlap=64)
-        Sxx_db = 10 * np.log10(Sxx + 1e-12)
+        stored = spectrogram_store.frames(csv_file, "dataset_real", start_idx, len(segment))
+        if stored is not None:
+            Sxx_db, f, t = stored
+        else:
+            # Calculer spectrogramme avec scipy
+            fs = 1000.0
+            f, t, Sxx = scipy_signal.spectrogram(segment, fs=fs, nperseg=128, noverlap=64)
+            Sxx_db = 10 * np.log10(Sxx + 1e-12)
         
         return {
             "signal": segment.tolist(),
@@ -91,9 +93,38 @@ def generate_test_data(sensor_id: str):
         "times": time_axis.tolist()
     }
 
+# Caractéristiques renvoyées par défaut (énergies par bande de fréquence, signal à 1 kHz)
+NEXT_SEGMENT_FEATURES = [
+    "rms", "dominant_frequency", "energy_low_freq", "energy_mid_freq", "energy_high_freq",
+    "signal_mean", "signal_std"
+]
+
+@router.get("/files")
+async def get_available_files(
+    network_type: Optional[str] = Query(None, description="Réseau: branched, looped"),
+    leak_class: Optional[str] = Query(None, description="Classe: normal, gasket_leak, orifice_leak..."),
+    flow_rate: Optional[str] = Query(None, description="Débit, ex: 0.18 LPS")
+):
+    """Fichiers du dataset (manifest), par réseau et type, ou filtrés par réseau, classe de fuite et débit"""
+    from .spectrogram import dataset_service
+
+    # Revalidation du manifest (stat des fichiers) hors de la boucle asyncio
+    if network_type or leak_class or flow_rate:
+        return await asyncio.to_thread(dataset_service.find_files, network_type, leak_class, flow_rate)
+    return await asyncio.to_thread(dataset_service.get_available_files)
+
 @router.get("/sensor/{sensor_id}/next-segment")
-async def get_next_segment(sensor_id: str):
+async def get_next_segment(
+    sensor_id: str,
+    features: Optional[str] = Query(None, description="Caractéristiques à calculer, ex: rms,crest_factor")
+):
     """Récupérer le prochain segment pour un capteur"""
+    requested = parse_feature_names(features) or NEXT_SEGMENT_FEATURES
+    try:
+        feature_engine.validate(requested)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         # Récupérer les données (CSV réels ou simulés)
         data = get_real_data(sensor_id)
@@ -101,17 +132,8 @@ async def get_next_segment(sensor_id: str):
         # Formater pour le frontend
         signal_data = [{"value": float(val)} for val in data["signal"]]
         
-        # Calculer métriques
-        signal_array = np.array(data["signal"])
-        features = {
-            "rms": float(np.sqrt(np.mean(signal_array**2))),
-            "dominant_frequency": float(data["frequencies"][np.argmax(np.mean(data["spectrogram_matrix"], axis=1))]) if data["frequencies"] else 120.0,
-            "energy_low_freq": float(np.sum(np.abs(signal_array[:len(signal_array)//3]))),
-            "energy_mid_freq": float(np.sum(np.abs(signal_array[len(signal_array)//3:2*len(signal_array)//3]))),
-            "energy_high_freq": float(np.sum(np.abs(signal_array[2*len(signal_array)//3:]))),
-            "signal_mean": float(np.mean(signal_array)),
-            "signal_std": float(np.std(signal_array))
-        }
+        # Calculer métriques (une seule rfft partagée par les caractéristiques spectrales)
+        segment_features = feature_engine.compute_one(np.array(data["signal"]), DATASET_SAMPLE_RATE, requested)
         
         return {
             "sensor_id": sensor_id,
@@ -121,10 +143,15 @@ async def get_next_segment(sensor_id: str):
                 "times": data["times"],
                 "spectrogram": data["spectrogram_matrix"]
             },
-            "features": features,
+            "features": segment_features,
             "is_leak": random.choice([True, False]),
             "timestamp": "2024-01-15T10:30:00Z"
         }
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Statistiques du cache partagé des signaux décodés"""
+    return signal_store.cache.stats()
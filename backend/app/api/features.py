@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from ..db.database import get_db
+from ..models.segment_features import SegmentFeatures
+from ..services.feature_engine import feature_engine
+
+router = APIRouter()
+
+FEATURE_COLUMNS = [
+    "rms", "dominant_frequency", "energy_low_freq", "energy_mid_freq", "energy_high_freq",
+    "signal_mean", "signal_std", "signal_skewness", "signal_kurtosis", "signal_max", "signal_min"
+]
+
+@router.get("/features/available")
+async def get_available_features():
+    """Caractéristiques du registre (paramètre `features` des endpoints de segments)"""
+    return feature_engine.available()
+
+@router.get("/features/segments")
+async def get_segment_features(
+    db: Session = Depends(get_db),
+    file_name: Optional[str] = Query(None, description="Nom du fichier CSV"),
+    network_type: Optional[str] = Query(None, description="Type de réseau (branched, looped)"),
+    leak_class: Optional[str] = Query(None, description="Classe de fuite (normal, gasket_leak, ...)"),
+    flow_rate: Optional[str] = Query(None, description="Débit (0.18 LPS, ND, ...)"),
+    limit: Optional[int] = Query(500, description="Nombre maximum de résultats")
+):
+    """Caractéristiques précalculées par le job extract_features.py"""
+    query = db.query(SegmentFeatures)
+    
+    if file_name:
+        query = query.filter(SegmentFeatures.file_name == file_name)
+    if network_type:
+        query = query.filter(SegmentFeatures.network_type == network_type)
+    if leak_class:
+        query = query.filter(SegmentFeatures.leak_class == leak_class)
+    if flow_rate:
+        query = query.filter(SegmentFeatures.flow_rate == flow_rate)
+    
+    rows = query.order_by(SegmentFeatures.file_name, SegmentFeatures.segment_index).limit(limit).all()
+    
+    return [
+        {
+            "file_name": row.file_name,
+            "network_type": row.network_type,
+            "leak_class": row.leak_class,
+            "flow_rate": row.flow_rate,
+            "segment_index": row.segment_index,
+            "start_idx": row.start_idx,
+            "end_idx": row.end_idx,
+            "nominal_sample_rate": row.nominal_sample_rate,
+            "source_sample_rate": row.source_sample_rate,
+            "features": {name: getattr(row, name) for name in FEATURE_COLUMNS},
+            "computed_at": row.computed_at.isoformat()
+        }
+        for row in rows
+    ]
@@ -0,0 +1,108 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+from typing import Dict, List, Optional
+import asyncio
+import numpy as np
+from ..core.config import settings
+from ..db.database import get_db
+from ..models.sensor import Sensor
+from ..services import dsp
+from ..services.leak_localization import SensorSite, localize
+from ..services.executors import dsp_executor, ExecutorBusy, ExecutorTimeout
+
+router = APIRouter()
+
+class SensorSegment(BaseModel):
+    sensor_id: int
+    values: List[float]
+
+class LocalizationRequest(BaseModel):
+    segments: List[SensorSegment]  # Segments acquis sur la même fenêtre de temps
+    sampling_rate: float
+    band_min: Optional[float] = None  # Hz
+    band_max: Optional[float] = None  # Hz
+    max_pair_distance: Optional[float] = None  # m
+
+def load_sites(db: Session, sensor_ids: List[str]) -> Dict[str, SensorSite]:
+    """Position et matériau des capteurs connus de la base"""
+    ids = [int(sensor_id) for sensor_id in sensor_ids if str(sensor_id).isdigit()]
+    sensors = db.query(Sensor).filter(Sensor.id.in_(ids)).all() if ids else []
+    return {
+        str(sensor.id): SensorSite(str(sensor.id), sensor.latitude, sensor.longitude, sensor.pipe_material)
+        for sensor in sensors
+    }
+
+async def run_localization(segments: Dict[str, np.ndarray], fs: float, sites: Dict[str, SensorSite],
+                           max_pair_distance: Optional[float], band_min: Optional[float],
+                           band_max: Optional[float]) -> Dict:
+    missing = [sensor_id for sensor_id in segments if sensor_id not in sites]
+    if len(segments) - len(missing) < 2:
+        raise HTTPException(status_code=400, detail="Au moins deux capteurs positionnés sont nécessaires")
+    band = (band_min, band_max) if band_min is not None or band_max is not None else None
+    try:
+        # Une rfft par capteur et les produits par paire dans le pool DSP
+        result = await dsp_executor.run(localize, segments, fs, sites, max_pair_distance, band)
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur localisation: {str(e)}")
+    result["unknown_sensors"] = missing
+    return result
+
+@router.post("/api/localization/analyze")
+async def analyze_localization(request: LocalizationRequest, db: Session = Depends(get_db)):
+    """
+    Localise une fuite par corrélation croisée GCC-PHAT des segments de capteurs voisins
+    """
+    dtype = dsp.float_dtype()
+    segments = {str(segment.sensor_id): np.array(segment.values, dtype=dtype) for segment in request.segments}
+    if any(len(values) < 16 for values in segments.values()):
+        raise HTTPException(status_code=400, detail="Pas assez de données (minimum 16 points par capteur)")
+    sites = load_sites(db, list(segments))
+    return await run_localization(segments, request.sampling_rate, sites, request.max_pair_distance,
+                                  request.band_min, request.band_max)
+
+@router.get("/api/localization/fleet")
+async def localize_fleet(
+    sensor_ids: str = Query(..., description="Capteurs à corréler, ex: 1,2,3"),
+    band_min: Optional[float] = Query(None, description="Fréquence basse de la corrélation (Hz)"),
+    band_max: Optional[float] = Query(None, description="Fréquence haute de la corrélation (Hz)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Localisation sur les canaux simultanés d'un même enregistrement du dataset
+
+    Le premier capteur fixe l'enregistrement et le segment (position de son
+    curseur, qui n'est pas avancé); seuls les capteurs ayant un canal de cet
+    enregistrement sont corrélés, à sa fréquence d'échantillonnage.
+    """
+    from .spectrogram import dataset_service
+
+    ids = [sensor_id.strip() for sensor_id in sensor_ids.split(",") if sensor_id.strip()]
+    # Lecture des fichiers hors de la boucle asyncio
+    aligned = await asyncio.to_thread(dataset_service.get_aligned_segments, ids)
+    if aligned is None:
+        raise HTTPException(status_code=404, detail="Aucun segment en cours pour le capteur de référence")
+    if len(aligned["segments"]) < 2:
+        raise HTTPException(status_code=400, detail=(
+            f"Au moins deux capteurs enregistrés simultanément sont nécessaires "
+            f"(enregistrement {aligned['recording']}, sans canal: {', '.join(aligned['unaligned']) or 'aucun'})"
+        ))
+
+    dtype = dsp.float_dtype()
+    segments = {sensor_id: np.asarray(values, dtype=dtype) for sensor_id, values in aligned["segments"].items()}
+    sites = load_sites(db, list(segments))
+    result = await run_localization(segments, aligned["fs"], sites, None, band_min, band_max)
+    result["recording"] = aligned["recording"]
+    result["segment"] = aligned["segment"]
+    result["files"] = aligned["files"]
+    result["unaligned_sensors"] = aligned["unaligned"]
+    return result
+
+@router.get("/api/localization/wave-speeds")
+async def get_wave_speeds():
+    """Vitesses de propagation utilisées par matériau de conduite"""
+    return {"wave_speeds": settings.wave_speeds, "default": settings.DEFAULT_WAVE_SPEED}
@@ -2,24 +2,18 @@ from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from typing import List
 import numpy as np
-from scipy import signal
-import librosa
-import cv2
-from tensorflow import keras
-import base64
-from io import BytesIO
-from PIL import Image
+from ..core.config import settings
+from ..services import dsp
+from ..services.ml_preprocessing import prepare_prediction_input
+from ..services.executors import dsp_executor, inference_executor, ExecutorBusy, ExecutorTimeout
+from ..services.inference_batcher import MicroBatcher
+from ..services.model_loader import leak_model, ModelNotAvailable
 
 router = APIRouter()
 
-# Charger le modèle au démarrage
-MODEL_PATH = "transfer_learning_adxl345_model.h5"
-try:
-    model = keras.models.load_model(MODEL_PATH)
-    print(f"✅ Modèle chargé: {MODEL_PATH}")
-except Exception as e:
-    print(f"❌ Erreur chargement modèle: {e}")
-    model = None
+# Modèle chargé à la première utilisation (ou au warm-up du démarrage), sur le worker d'inférence
+# Requêtes concurrentes regroupées en un seul passage du modèle (predict_on_batch: sans la boucle de predict)
+batcher = MicroBatcher("ml_predict", leak_model.predict_on_batch)
 
 class AcousticDataPoint(BaseModel):
     timestamp: str
@@ -37,55 +31,13 @@ class MLPredictionResponse(BaseModel):
     spectrogram_image: str  # Base64 encoded image 224x224
     probabilities: dict
 
-def calculate_vibration_signal(acc_x: np.ndarray, acc_y: np.ndarray, acc_z: np.ndarray) -> np.ndarray:
-    """Calcule le signal vibratoire"""
-    return np.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
-
-def create_spectrogram_224x224(vibration_signal: np.ndarray, sampling_rate: float) -> tuple:
-    """
-    Crée un spectrogramme 224x224 pour le modèle de deep learning
-    Retourne: (spectrogram_array, spectrogram_image_base64)
-    """
-    # Normaliser le signal
-    vibration_normalized = vibration_signal / (np.max(np.abs(vibration_signal)) + 1e-10)
-    
-    # Paramètres STFT
-    n_fft = min(512, len(vibration_normalized))
-    n_fft = 2 ** int(np.log2(n_fft))
-    hop_length = max(1, n_fft // 16)
-    
-    # Calculer le spectrogramme
-    D = librosa.stft(vibration_normalized, n_fft=n_fft, hop_length=hop_length, window='hann')
-    S_db = librosa.amplitude_to_db(np.abs(D), ref=np.max)
-    
-    # Normaliser entre 0 et 255
-    S_normalized = ((S_db - S_db.min()) / (S_db.max() - S_db.min() + 1e-10) * 255).astype(np.uint8)
-    
-    # Redimensionner à 224x224
-    S_resized = cv2.resize(S_normalized, (224, 224), interpolation=cv2.INTER_LINEAR)
-    
-    # Pour le modèle: garder en niveaux de gris (1 canal)
-    S_grayscale = np.expand_dims(S_resized, axis=-1)  # Shape: (224, 224, 1)
-    
-    # Pour l'affichage: convertir en RGB avec colormap
-    S_rgb_display = cv2.applyColorMap(S_resized, cv2.COLORMAP_JET)
-    S_rgb_display = cv2.cvtColor(S_rgb_display, cv2.COLOR_BGR2RGB)
-    
-    # Encoder en base64 pour l'envoyer au frontend
-    img = Image.fromarray(S_rgb_display)
-    buffered = BytesIO()
-    img.save(buffered, format="PNG")
-    img_base64 = base64.b64encode(buffered.getvalue()).decode()
-    
-    return S_grayscale, img_base64
-
 @router.post("/api/ml/predict", response_model=MLPredictionResponse)
 async def predict_leak(request: MLPredictionRequest):
     """
     Analyse les données acoustiques et prédit s'il y a une fuite
     """
     try:
-        if model is None:
+        if leak_model.error is not None:
             raise HTTPException(status_code=500, detail="Modèle non chargé")
         
         if len(request.data) < 16:
@@ -96,9 +48,11 @@ async def predict_leak(request: MLPredictionRequest):
         print("="*80)
         
         # Convertir les données en arrays numpy
-        acc_x = np.array([point.accX for point in request.data])
-        acc_y = np.array([point.accY for point in request.data])
-        acc_z = np.array([point.accZ for point in request.data])
+        # Précision DSP configurée (float32 par défaut) dès l'ingestion
+        dtype = dsp.float_dtype()
+        acc_x = np.array([point.accX for point in request.data], dtype=dtype)
+        acc_y = np.array([point.accY for point in request.data], dtype=dtype)
+        acc_z = np.array([point.accZ for point in request.data], dtype=dtype)
         
         print(f"📊 Données reçues:")
         print(f"   - Nombre de points: {len(request.data)}")
@@ -107,28 +61,23 @@ async def predict_leak(request: MLPredictionRequest):
         print(f"   - Plage AccY: [{acc_y.min():.3f}, {acc_y.max():.3f}]")
         print(f"   - Plage AccZ: [{acc_z.min():.3f}, {acc_z.max():.3f}]")
         
-        # Calculer le signal vibratoire
-        vibration_signal = calculate_vibration_signal(acc_x, acc_y, acc_z)
+        # Signal vibratoire, spectrogramme 224x224 et image dans le pool DSP (hors boucle asyncio)
+        prepared = await dsp_executor.run(prepare_prediction_input, acc_x, acc_y, acc_z, request.sampling_rate)
+        model_input = prepared["model_input"]
+        spectrogram_base64 = prepared["spectrogram_base64"]
         print(f"\n📈 Signal vibratoire:")
-        print(f"   - Amplitude moyenne: {np.mean(vibration_signal):.3f}")
-        print(f"   - Amplitude max: {np.max(vibration_signal):.3f}")
-        print(f"   - Écart-type: {np.std(vibration_signal):.3f}")
-        
-        # Créer le spectrogramme 224x224
-        spectrogram_grayscale, spectrogram_base64 = create_spectrogram_224x224(vibration_signal, request.sampling_rate)
+        print(f"   - Amplitude moyenne: {prepared['signal_mean']:.3f}")
+        print(f"   - Amplitude max: {prepared['signal_max']:.3f}")
+        print(f"   - Écart-type: {prepared['signal_std']:.3f}")
         print(f"\n🖼️  Spectrogramme généré: 224x224 pixels")
         
-        # Préparer l'input pour le modèle (normaliser entre 0 et 1)
-        model_input = spectrogram_grayscale.astype(np.float32) / 255.0
-        model_input = np.expand_dims(model_input, axis=0)  # Ajouter batch dimension -> (1, 224, 224, 1)
-        
         print(f"\n🤖 Exécution du modèle ML...")
         print(f"   - Shape de l'input: {model_input.shape}")
         print(f"   - Min/Max de l'input: [{model_input.min():.3f}, {model_input.max():.3f}]")
         print(f"   - Moyenne de l'input: {model_input.mean():.3f}")
         
-        # Faire la prédiction
-        predictions = model.predict(model_input, verbose=0)
+        # Faire la prédiction (lot de requêtes concurrentes sur le worker d'inférence dédié)
+        predictions = await batcher.submit(model_input)
         print(f"   - Shape de la sortie: {predictions.shape}")
         print(f"   - Valeur brute de sortie: {predictions[0]}")
         
@@ -142,11 +91,8 @@ async def predict_leak(request: MLPredictionRequest):
             prob_normal = 1.0 - prob_fuite
             
             # AJUSTEMENT: Le modèle a un biais fort vers "Fuite"
-            # On utilise un seuil plus élevé pour compenser
-            THRESHOLD = 0.95  # Au lieu de 0.5
-            
-            # Déterminer la classe prédite
-            if prob_fuite > THRESHOLD:
+            # On utilise un seuil plus élevé pour compenser (ML_LEAK_THRESHOLD, au lieu de 0.5)
+            if prob_fuite > settings.ML_LEAK_THRESHOLD:
                 predicted_class = "Fuite"
                 confidence = prob_fuite
             else:
@@ -189,14 +135,42 @@ async def predict_leak(request: MLPredictionRequest):
             probabilities=probabilities
         )
     
+    except HTTPException:
+        raise
+    except ModelNotAvailable:
+        raise HTTPException(status_code=500, detail="Modèle non chargé")
+    except ExecutorBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ExecutorTimeout as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur prédiction: {str(e)}")
 
+@router.post("/api/ml/warmup")
+async def warm_up_model():
+    """Charge le modèle et exécute une inférence factice (sonde de disponibilité des déploiements)"""
+    try:
+        await inference_executor.run_background(leak_model.warm_up)
+    except ModelNotAvailable as e:
+        raise HTTPException(status_code=500, detail=f"Modèle non chargé: {e}")
+    return leak_model.status()
+
 @router.get("/api/ml/health")
 async def health_check():
-    """Health check endpoint"""
+    """Health check endpoint ("ok" seulement une fois le modèle chargé et une inférence exécutée)"""
+    model_status = leak_model.status()
+    if model_status["state"] == "error":
+        status = "error"
+    elif model_status["state"] == "ready":
+        status = "ok"
+    else:
+        # Pas encore chargé (ML_WARMUP_ON_STARTUP désactivé) ou warm-up en cours
+        status = "loading"
     return {
-        "status": "ok" if model is not None else "error",
-        "model_loaded": model is not None,
-        "model_path": MODEL_PATH
+        "status": status,
+        "model_loaded": leak_model.loaded,
+        "model_path": leak_model.path,
+        "model": model_status,
+        "executors": [dsp_executor.stats(), inference_executor.stats()],
+        "batching": batcher.stats()
     }
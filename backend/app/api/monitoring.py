@@ -1,4 +1,4 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import numpy as np
@@ -6,17 +6,22 @@ from datetime import datetime
 import random
 from ..db.database import SessionLocal
 from ..models.analysis_history import AnalysisHistory
+from ..services.anomaly_detector import anomaly_detector
+from ..services.dataset_service import MONITORING_CURSORS
+from ..services.spectrogram_pyramid import spectrogram_pyramid
 
 router = APIRouter()
 
 class MonitoringManager:
     def __init__(self):
         self.active_connections: list[WebSocket] = []
+        self.connection_sensors: dict[WebSocket, int] = {}
         self.is_running = False
 
-    async def connect(self, websocket: WebSocket):
+    async def connect(self, websocket: WebSocket, sensor_id: int):
         await websocket.accept()
         self.active_connections.append(websocket)
+        self.connection_sensors[websocket] = sensor_id
         if not self.is_running:
             self.is_running = True
             asyncio.create_task(self.send_monitoring_data())
@@ -24,6 +29,7 @@ class MonitoringManager:
     def disconnect(self, websocket: WebSocket):
         if websocket in self.active_connections:
             self.active_connections.remove(websocket)
+        self.connection_sensors.pop(websocket, None)
         if not self.active_connections:
             self.is_running = False
     
@@ -62,6 +68,7 @@ class MonitoringManager:
                 
                 # Vérifier si on a une nouvelle analyse disponible
                 analysis_result = await ttn_integration.get_latest_analysis()
+                fleet_data = {}
                 
                 if analysis_result:
                     # Utiliser les résultats de l'analyse IA complète
@@ -94,20 +101,8 @@ class MonitoringManager:
                         peak = float(np.max(np.abs(ttn_array)))
                         std_val = float(np.std(ttn_array))
                         
-                        # Détection simple basée sur les métriques
-                        if std_val > 0.5:
-                            status = "anomaly"
-                            confidence = 0.85
-                            severity = 0.8
-                        elif std_val > 0.2:
-                            status = "warning"
-                            confidence = 0.75
-                            severity = 0.6
-                        else:
-                            status = "normal"
-                            confidence = 0.90
-                            severity = 0.1
-                            severity = std_val
+                        # Détection relative à l'historique du flux TTN (écart-type)
+                        status, confidence, severity = self.fallback_analysis("ttn", {"std": std_val})
                         
                         frequency = 0.1  # Fréquence TTN
                         data_points = len(ttn_values)
@@ -115,10 +110,14 @@ class MonitoringManager:
                         
                         print(f"📡 Données TTN récentes: {len(ttn_values)} points, type: {signal_type}")
                     else:
+                        # Capteurs connectés rejoués depuis le dataset: un seul tick pour toute la flotte
+                        sensor_ids = sorted({str(sensor_id) for sensor_id in self.connection_sensors.values()})
+                        fleet_data = await asyncio.to_thread(self.build_fleet_data, sensor_ids)
+                        
                         # Fallback sur simulation
                         signal, spectrogram = self.generate_demo_data()
-                        status, confidence, severity = self.fallback_analysis(0.3, 0.5)
                         rms, peak, frequency = 0.3, 0.5, 0.1
+                        status, confidence, severity = self.fallback_analysis("demo", {"rms": rms, "peak": peak})
                         data_points = 0
                         data_source = "Demo"
                 
@@ -147,13 +146,15 @@ class MonitoringManager:
                     }
                 }
                 
-                # Envoyer aux clients connectés
+                # Envoyer aux clients connectés (données de leur capteur si disponibles)
                 message = json.dumps(monitoring_data)
+                sensor_messages = {sensor_id: json.dumps(data) for sensor_id, data in fleet_data.items()}
                 disconnected = []
                 
                 for connection in self.active_connections:
                     try:
-                        await connection.send_text(message)
+                        sensor_id = str(self.connection_sensors.get(connection))
+                        await connection.send_text(sensor_messages.get(sensor_id, message))
                     except:
                         disconnected.append(connection)
                 
@@ -168,6 +169,57 @@ class MonitoringManager:
                 print(f"Erreur monitoring: {e}")
                 await asyncio.sleep(1)
     
+    def build_fleet_data(self, sensor_ids: list) -> dict:
+        """
+        Données de monitoring des capteurs assignés au dataset (spectrogrammes calculés en lot)
+
+        Le tick a ses propres curseurs: il ne fait pas sauter de segments aux endpoints.
+        """
+        from .spectrogram import dataset_service
+        
+        fleet_data = {}
+        segments = dataset_service.get_next_segment_arrays(sensor_ids, cursor_namespace=MONITORING_CURSORS)
+        for sensor_id, result in segments.items():
+            # Chronologie zoomable du capteur: seule source d'ajout, chaque segment y entre une fois
+            spectrogram_pyramid.append(sensor_id, result["spectrogram"])
+            values = result["values"]
+            features = result["features"]
+            status, confidence, severity = self.fallback_analysis(f"dataset:{sensor_id}", {
+                "rms": features["rms"],
+                "peak": float(np.max(np.abs(values))),
+                # Énergies par bande en log: variations multiplicatives
+                **{band: float(np.log10(features[band] + 1e-12))
+                   for band in ("energy_low_freq", "energy_mid_freq", "energy_high_freq")}
+            })
+            
+            # Même format que les données de démonstration: 1024 points, spectrogramme 32x64 dans [0, 1]
+            waveform = values[np.linspace(0, len(values) - 1, 1024).astype(int)]
+            fleet_data[sensor_id] = {
+                "waveform": waveform.tolist(),
+                "spectrogram": self.compact_spectrogram(result["spectrogram"]["spectrogram"]),
+                "analysis": {
+                    "status": status,
+                    "confidence": confidence,
+                    "severity": severity,
+                    "rms": float(features["rms"]),
+                    "peak": float(np.max(np.abs(values))),
+                    "frequency": float(features["dominant_frequency"]),
+                    "timestamp": datetime.now().isoformat(),
+                    "ttn_data_points": 0,
+                    "data_source": f"Dataset ({result['file_name']})"
+                }
+            }
+        return fleet_data
+    
+    def compact_spectrogram(self, spectrogram_db: np.ndarray, n_freqs: int = 32, n_times: int = 64) -> list:
+        """Réduit un spectrogramme en dB à n_freqs x n_times, normalisé dans [0, 1]"""
+        pooled = np.array([
+            [block.mean() for block in np.array_split(rows, n_times, axis=1)]
+            for rows in np.array_split(spectrogram_db, n_freqs, axis=0)
+        ])
+        span = pooled.max() - pooled.min()
+        return ((pooled - pooled.min()) / span if span > 1e-6 else np.zeros_like(pooled)).tolist()
+    
     def interpolate_ttn_data(self, ttn_values, target_length=1024):
         """Interpole les données TTN pour créer un signal plus dense"""
         if len(ttn_values) < 2:
@@ -236,21 +288,25 @@ class MonitoringManager:
         
         return signal, spectrogram
     
-    def fallback_analysis(self, rms, peak):
-        """Analyse de fallback pour démonstration"""
-        if rms > 0.6 or peak > 0.9:
-            return "anomaly", 0.85 + random.uniform(0, 0.1), 0.8 + random.uniform(0, 0.2)
-        elif rms > 0.4:
-            return "warning", 0.70 + random.uniform(0, 0.15), 0.5 + random.uniform(0, 0.3)
-        else:
-            return "normal", 0.90 + random.uniform(0, 0.08), 0.1 + random.uniform(0, 0.2)
+    def fallback_analysis(self, sensor_key: str, metrics: dict):
+        """Statut relatif à la ligne de base du capteur (détecteur en flux, O(1) par segment)"""
+        detection = anomaly_detector.observe(sensor_key, metrics)
+        return detection["status"], detection["confidence"], detection["severity"]
 
 monitoring_manager = MonitoringManager()
 
+@router.get("/api/monitoring/baseline/{sensor_key}")
+async def get_detector_baseline(sensor_key: str):
+    """Ligne de base apprise par le détecteur pour un flux (ex: dataset:3, vibration:default, ttn)"""
+    state = anomaly_detector.state(sensor_key)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Aucune ligne de base pour ce capteur")
+    return {"sensor_key": sensor_key, "metrics": state}
+
 @router.websocket("/ws/sensor/{sensor_id}")
 async def websocket_monitoring(websocket: WebSocket, sensor_id: int):
     """WebSocket pour données de monitoring temps réel"""
-    await monitoring_manager.connect(websocket)
+    await monitoring_manager.connect(websocket, sensor_id)
     try:
         while True:
             # Garder la connexion ouverte
@@ -1,39 +1,63 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import Response
 from app.services.dataset_service import DatasetService
-from app.services.spectrogram_service import SpectrogramService
-import base64
+from app.services.dsp_plans import plan_cache
+from app.services.feature_engine import parse_feature_names
+from app.services.spectrogram_renderer import spectrogram_renderer
+from app.services.spectrogram_pyramid import spectrogram_pyramid
+from typing import Optional
+import numpy as np
 
 router = APIRouter(prefix="/spectrogram", tags=["spectrogram"])
 dataset_service = DatasetService()
 
+IMAGE_MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
 @router.get("/sensor/{sensor_id}/image")
-async def get_spectrogram_image(sensor_id: str):
-    """Génère l'image PNG du spectrogramme pour un capteur"""
-    result = dataset_service.get_next_segment(sensor_id)
+async def get_spectrogram_image(
+    sensor_id: str,
+    format: str = Query("png", description="Format de l'image: png ou webp"),
+    axes: bool = Query(True, description="Graduations fréquence/temps")
+):
+    """Génère l'image du spectrogramme pour un capteur"""
+    if format not in IMAGE_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Format non supporté: {format}")
+
+    # Matrice numpy directement (sans passage par les listes JSON)
+    result = dataset_service.get_next_segment_arrays([sensor_id]).get(str(sensor_id))
     if result is None:
         raise HTTPException(status_code=404, detail="Aucune donnée disponible")
     
-    # Récupérer les données du signal
-    import pandas as pd
-    signal_data = pd.DataFrame(result["signal_data"])
-    
     try:
-        image_base64 = SpectrogramService.generate_spectrogram_image(signal_data)
-        image_bytes = base64.b64decode(image_base64)
+        # Rendu direct du spectrogramme du segment (store ou lot), mis en cache par segment et version du fichier
+        spectrogram = result["spectrogram"]
+        image_bytes = spectrogram_renderer.render(
+            spectrogram["spectrogram"],
+            spectrogram["frequencies"],
+            spectrogram["times"],
+            fmt=format,
+            axes=axes,
+            cache_key=("dataset", result["file_name"], result["segment"], result["source_mtime"])
+        )
         
         return Response(
             content=image_bytes,
-            media_type="image/png",
-            headers={"Content-Disposition": f"inline; filename=spectrogram_{sensor_id}.png"}
+            media_type=IMAGE_MEDIA_TYPES[format],
+            headers={"Content-Disposition": f"inline; filename=spectrogram_{sensor_id}.{format}"}
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur génération spectrogramme: {str(e)}")
 
 @router.get("/sensor/{sensor_id}/data")
-async def get_spectrogram_data(sensor_id: str):
+async def get_spectrogram_data(
+    sensor_id: str,
+    features: Optional[str] = Query(None, description="Caractéristiques à calculer, ex: rms,crest_factor")
+):
     """Récupère les données brutes du spectrogramme"""
-    result = dataset_service.get_next_segment(sensor_id)
+    try:
+        result = dataset_service.get_next_segment(sensor_id, parse_feature_names(features))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     if result is None:
         raise HTTPException(status_code=404, detail="Aucune donnée disponible")
     
@@ -42,4 +66,65 @@ async def get_spectrogram_data(sensor_id: str):
         "spectrogram": result["spectrogram"],
         "features": result["features"],
         "is_leak": result["is_leak"]
-    }
\ No newline at end of file
+    }
+
+@router.get("/sensor/{sensor_id}/tiles")
+async def get_tile_pyramid(sensor_id: str):
+    """Niveaux de zoom et tuiles disponibles de la chronologie d'un capteur"""
+    pyramid = spectrogram_pyramid.describe(sensor_id)
+    if pyramid is None:
+        raise HTTPException(status_code=404, detail="Aucun segment reçu pour ce capteur")
+    return {"sensor_id": sensor_id, **pyramid}
+
+@router.get("/sensor/{sensor_id}/tiles/{level}/{x}/{y}")
+async def get_spectrogram_tile(
+    sensor_id: str,
+    level: int,
+    x: int,
+    y: int,
+    format: str = Query("png", description="Format: png, webp ou json (valeurs en dB)"),
+    vmin: Optional[float] = Query(None, description="Bas de l'échelle de couleurs en dB"),
+    vmax: Optional[float] = Query(None, description="Haut de l'échelle de couleurs en dB")
+):
+    """
+    Tuile (x: temps, y: fréquence) d'un niveau de zoom de la pyramide
+
+    Le niveau 0 est la résolution STFT du segment; chaque niveau divise le
+    temps par 2. L'échelle par défaut est commune à toutes les tuiles du capteur.
+    """
+    if format not in IMAGE_MEDIA_TYPES and format != "json":
+        raise HTTPException(status_code=400, detail=f"Format non supporté: {format}")
+
+    found = spectrogram_pyramid.tile(sensor_id, level, x, y)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Tuile indisponible")
+    matrix, info = found
+
+    if format == "json":
+        return {
+            "sensor_id": sensor_id,
+            **info,
+            "spectrogram": np.where(np.isfinite(matrix), matrix, None).tolist()
+        }
+
+    low, high = info["db_range"]
+    vmin = low if vmin is None else vmin
+    vmax = high if vmax is None else vmax
+    # Colonnes pas encore remplies: bas de l'échelle
+    matrix = np.where(np.isnan(matrix), vmin, matrix)
+    image_bytes = spectrogram_renderer.render(
+        matrix, size=None, fmt=format, vmin=vmin, vmax=vmax,
+        # Une tuile partielle change de clé à chaque nouvelle colonne
+        cache_key=("tile", sensor_id, level, x, y, info["filled_columns"])
+    )
+    return Response(content=image_bytes, media_type=IMAGE_MEDIA_TYPES[format])
+
+@router.get("/plans/stats")
+async def get_plan_stats():
+    """Réutilisation des plans DSP (filtres, fenêtres, masques)"""
+    return plan_cache.stats()
+
+@router.get("/render/stats")
+async def get_render_stats():
+    """Cache des images de spectrogramme rendues"""
+    return spectrogram_renderer.stats()
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 from ..websocket.manager import manager
-from ..websocket.acoustic_manager import acoustic_background_task
+from ..websocket.acoustic_manager import acoustic_background_task, stream
 import asyncio
 
 router = APIRouter()
@@ -16,4 +16,11 @@ async def websocket_acoustic_endpoint(websocket: WebSocket):
             # Echo pour maintenir la connexion
             await websocket.send_text(f"Message reçu: {data}")
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
\ No newline at end of file
+        manager.disconnect(websocket)
+
+@router.get("/acoustic/stream/metrics")
+async def get_stream_metrics():
+    """Métriques du prefetch du flux acoustique"""
+    if stream is None:
+        return {"available": False}
+    return {"available": True, **stream.metrics()}
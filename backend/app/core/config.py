@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 import json
 
 class Settings(BaseSettings):
@@ -7,6 +7,33 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "your-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    SIGNAL_CACHE_BYTES: int = 512 * 1024 * 1024  # Budget du cache de signaux décodés
+    DSP_PRECISION: str = "float32"  # Précision des signaux, filtres, STFT et caractéristiques (float32 ou float64)
+    ACOUSTIC_DECIMATION: int = 4  # Décimation du flux acoustique avant STFT (bande utile 0-4 kHz)
+    DSP_WORKERS: int = 0  # Processus du pool DSP des endpoints (0: un par cœur)
+    DSP_QUEUE_SIZE: int = 32  # Tâches DSP en cours ou en attente au-delà desquelles on répond 503
+    DSP_TIMEOUT_SECONDS: float = 30.0
+    INFERENCE_QUEUE_SIZE: int = 8  # Prédictions en cours ou en attente sur le worker d'inférence
+    INFERENCE_TIMEOUT_SECONDS: float = 30.0
+    ML_BACKEND: str = "keras"  # Moteur d'inférence: keras (.h5), tflite ou onnx (modèles produits par convert_model.py)
+    ML_MODEL_PATH: str = "transfer_learning_adxl345_model.h5"
+    ML_INFERENCE_THREADS: int = 0  # Threads du moteur TFLite/ONNX (0: défaut de la bibliothèque)
+    ML_LEAK_THRESHOLD: float = 0.95  # Seuil de probabilité "Fuite" (sortie sigmoid); le modèle a un biais fort vers "Fuite"
+    ML_WARMUP_ON_STARTUP: bool = True  # Charger le modèle et faire une inférence factice au démarrage (en tâche de fond)
+    INFERENCE_MAX_BATCH: int = 16  # Requêtes /api/ml/predict regroupées au plus dans un appel du modèle
+    INFERENCE_BATCH_WAIT_MS: float = 5.0  # Attente maximale des requêtes concurrentes avant l'appel du modèle
+    PYRAMID_LEVELS: int = 8  # Niveaux de zoom des tuiles de spectrogramme (chaque niveau divise le temps par 2)
+    PYRAMID_MAX_TILES: int = 256  # Tuiles gardées par niveau et par capteur (les plus anciennes sont oubliées)
+    DETECTOR_ALPHA: float = 0.05  # Poids EWMA d'un nouveau segment dans la ligne de base d'un capteur
+    DETECTOR_WARMUP: int = 10  # Segments avant de passer des seuils globaux à la ligne de base du capteur
+    DETECTOR_WARNING_Z: float = 3.0  # Écart (en écarts-types) d'un avertissement
+    DETECTOR_ANOMALY_Z: float = 5.0  # Écart (en écarts-types) d'une anomalie
+    DETECTOR_REBASELINE_AFTER: int = 20  # Anomalies consécutives après lesquelles le nouveau niveau devient la ligne de base
+    DETECTOR_MIN_RELATIVE_STD: float = 0.01  # Écart-type plancher, relatif à la moyenne
+    DETECTOR_CHECKPOINT_SECONDS: float = 60.0  # Période d'écriture des états du détecteur en base
+    WAVE_SPEEDS: str = '{"PVC": 480, "PEHD": 380, "PE": 380, "Fonte": 1250, "Acier": 1300, "Béton": 1100, "Amiante-ciment": 1000}'  # Vitesse du bruit de fuite par matériau de conduite (m/s)
+    DEFAULT_WAVE_SPEED: float = 500.0  # Matériau absent de WAVE_SPEEDS
+    LOCALIZATION_MAX_PAIR_DISTANCE: float = 1000.0  # Distance maximale (m) entre deux capteurs corrélés
     CORS_ORIGINS: str = '["http://localhost:3000","http://localhost:5173","https://aquaguard-om6o3r58x-amede0430s-projects.vercel.app"]'
 
     class Config:
@@ -19,4 +46,11 @@ class Settings(BaseSettings):
         except:
             return ["http://localhost:3000", "http://localhost:5173"]
 
+    @property
+    def wave_speeds(self) -> Dict[str, float]:
+        try:
+            return {name: float(speed) for name, speed in json.loads(self.WAVE_SPEEDS).items()}
+        except (ValueError, AttributeError):
+            return {}
+
 settings = Settings()
\ No newline at end of file
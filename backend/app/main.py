@@ -17,7 +17,9 @@ from .api.history import router as history_router
 from .api.ttn_integration import router as ttn_router
 from .api.vibration_analysis import router as vibration_router
 from .api.ml_prediction import router as ml_router
-from .models import user, sensor, alert, activity, report, sensor_data, analysis_history
+from .api.features import router as features_router
+from .api.localization import router as localization_router
+from .models import user, sensor, alert, activity, report, sensor_data, analysis_history, segment_features, detector_state
 import asyncio
 
 # Créer les tables
@@ -32,8 +34,44 @@ async def startup_event():
     print("Démarrage des tâches de fond...")
     asyncio.create_task(simulate_sensor_updates())
     asyncio.create_task(acoustic_background_task())
+    asyncio.create_task(detector_checkpoint_task())
+    if settings.ML_WARMUP_ON_STARTUP:
+        asyncio.create_task(warm_up_model())
     print("Tâches de fond démarrées")
 
+async def warm_up_model():
+    """Charge le modèle ML et fait une inférence factice sans retarder le démarrage"""
+    from .services.executors import inference_executor
+    from .services.model_loader import leak_model
+    try:
+        await inference_executor.run_background(leak_model.warm_up)
+    except Exception as e:
+        print(f"Warm-up du modèle impossible: {e}")
+
+async def detector_checkpoint_task():
+    """Recharge puis enregistre périodiquement les lignes de base du détecteur d'anomalies"""
+    from .services.anomaly_detector import anomaly_detector
+    try:
+        print(f"Lignes de base restaurées: {await asyncio.to_thread(anomaly_detector.load)} capteurs")
+    except Exception as e:
+        print(f"Erreur chargement détecteur: {e}")
+    while True:
+        await asyncio.sleep(settings.DETECTOR_CHECKPOINT_SECONDS)
+        try:
+            await asyncio.to_thread(anomaly_detector.checkpoint)
+        except Exception as e:
+            print(f"Erreur checkpoint détecteur: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from .services.executors import shutdown_executors
+    from .services.anomaly_detector import anomaly_detector
+    shutdown_executors()
+    try:
+        anomaly_detector.checkpoint()
+    except Exception as e:
+        print(f"Erreur checkpoint détecteur: {e}")
+
 # Configuration CORS
 app.add_middleware(
     CORSMiddleware,
@@ -65,6 +103,8 @@ app.include_router(history_router, tags=["history"])
 app.include_router(ttn_router, prefix="/ttn", tags=["ttn"])
 app.include_router(vibration_router, tags=["vibration"])
 app.include_router(ml_router, tags=["ml"])
+app.include_router(features_router, tags=["features"])
+app.include_router(localization_router, tags=["localization"])
 
 @app.get("/")
 async def root():
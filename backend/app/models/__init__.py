@@ -5,5 +5,7 @@ from .alert import Alert
 from .activity import Activity
 from .report import Report
 from .analysis_history import AnalysisHistory
+from .segment_features import SegmentFeatures, FeatureCheckpoint
+from .detector_state import DetectorState
 
-__all__ = ["User", "Sensor", "SensorData", "Alert", "Activity", "Report", "AnalysisHistory"]
\ No newline at end of file
+__all__ = ["User", "Sensor", "SensorData", "Alert", "Activity", "Report", "AnalysisHistory", "SegmentFeatures", "FeatureCheckpoint", "DetectorState"]
\ No newline at end of file
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from ..db.database import Base
+from datetime import datetime
+
+class DetectorState(Base):
+    """Statistiques glissantes du détecteur d'anomalies d'un capteur (point de reprise)"""
+    __tablename__ = "detector_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    sensor_key = Column(String(100), nullable=False, unique=True, index=True)  # ex: dataset:3, vibration:default
+    observations = Column(Integer, nullable=False, default=0)
+    state = Column(Text, nullable=False)  # JSON {métrique: [n, moyenne, m2, ewma, ewm_var]}
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<DetectorState(sensor={self.sensor_key}, observations={self.observations})>"
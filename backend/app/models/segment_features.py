@@ -0,0 +1,51 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, UniqueConstraint
+from ..db.database import Base
+from datetime import datetime
+
+class SegmentFeatures(Base):
+    __tablename__ = "segment_features"
+    __table_args__ = (UniqueConstraint("file_path", "segment_index", name="uq_segment_features_file_segment"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    
+    # Identification du segment
+    file_path = Column(String(500), nullable=False, index=True)
+    file_name = Column(String(200), nullable=False, index=True)
+    network_type = Column(String(50), nullable=True, index=True)
+    leak_class = Column(String(50), nullable=True, index=True)
+    flow_rate = Column(String(50), nullable=True)
+    segment_index = Column(Integer, nullable=False)
+    start_idx = Column(Integer, nullable=False)
+    end_idx = Column(Integer, nullable=False)
+    # Fréquence conventionnelle des caractéristiques (DATASET_SAMPLE_RATE, comme les endpoints):
+    # dominant_frequency et les bandes energy_* sont en Hz nominaux, pas ceux de l'acquisition
+    nominal_sample_rate = Column(Float, nullable=False)
+    source_sample_rate = Column(Float, nullable=True)  # fréquence réelle du fichier (manifest)
+    
+    # Caractéristiques
+    rms = Column(Float, nullable=False)
+    dominant_frequency = Column(Float, nullable=False)
+    energy_low_freq = Column(Float, nullable=False)
+    energy_mid_freq = Column(Float, nullable=False)
+    energy_high_freq = Column(Float, nullable=False)
+    signal_mean = Column(Float, nullable=False)
+    signal_std = Column(Float, nullable=False)
+    signal_skewness = Column(Float, nullable=False)
+    signal_kurtosis = Column(Float, nullable=False)
+    signal_max = Column(Float, nullable=False)
+    signal_min = Column(Float, nullable=False)
+    
+    computed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<SegmentFeatures(file={self.file_name}, segment={self.segment_index}, rms={self.rms})>"
+
+class FeatureCheckpoint(Base):
+    """Fichiers déjà traités par le job d'extraction (reprise après interruption)"""
+    __tablename__ = "feature_checkpoints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    file_path = Column(String(500), nullable=False, unique=True)
+    source_mtime = Column(Float, nullable=False)
+    segments = Column(Integer, nullable=False)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
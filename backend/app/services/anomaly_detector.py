@@ -0,0 +1,210 @@
+import json
+import math
+import threading
+from typing import Callable, Dict, Optional, Tuple
+from ..core.config import settings
+from ..db.database import SessionLocal
+from ..models.detector_state import DetectorState
+
+
+class RunningStat:
+    """
+    Statistiques d'une métrique mises à jour en O(1) par observation.
+
+    Welford donne la moyenne et la variance sur tout l'historique; l'EWMA
+    (moyenne et variance exponentielles) suit la ligne de base récente.
+    """
+
+    __slots__ = ("n", "mean", "m2", "ewma", "ewm_var")
+
+    def __init__(self, n: int = 0, mean: float = 0.0, m2: float = 0.0, ewma: float = 0.0, ewm_var: float = 0.0):
+        self.n = int(n)
+        self.mean = mean
+        self.m2 = m2
+        self.ewma = ewma
+        self.ewm_var = ewm_var
+
+    def update(self, value: float, alpha: float):
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if self.n == 1:
+            self.ewma, self.ewm_var = value, 0.0
+        else:
+            diff = value - self.ewma
+            increment = alpha * diff
+            self.ewma += increment
+            self.ewm_var = (1 - alpha) * (self.ewm_var + diff * increment)
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    def zscore(self, value: float) -> float:
+        """Écart à la ligne de base récente, en écarts-types (plancher relatif pour les signaux constants)"""
+        spread = max(math.sqrt(max(self.ewm_var, self.variance)),
+                     settings.DETECTOR_MIN_RELATIVE_STD * abs(self.ewma), 1e-9)
+        return (value - self.ewma) / spread
+
+    def to_list(self) -> list:
+        return [self.n, self.mean, self.m2, self.ewma, self.ewm_var]
+
+
+def legacy_status(metrics: Dict[str, float]) -> str:
+    """Seuils globaux historiques (RMS 0.3/0.5, crête 0.7/1.0, écart-type 0.2/0.5), tant qu'il n'y a pas d'historique"""
+    rms, peak, std = metrics.get("rms", 0.0), metrics.get("peak", 0.0), metrics.get("std", 0.0)
+    if rms > 0.5 or peak > 1.0 or std > 0.5:
+        return "anomaly"
+    if rms > 0.3 or peak > 0.7 or std > 0.2:
+        return "warning"
+    return "normal"
+
+
+class StreamingDetector:
+    """
+    Détecteur d'anomalies par capteur, relatif à son propre historique.
+
+    Chaque segment est comparé à la ligne de base du capteur (z-score sur
+    l'EWMA de chaque métrique), puis l'intègre; un segment anormal ne
+    modifie pas la ligne de base mais alimente une ligne de base candidate,
+    qui la remplace après `rebaseline_after` anomalies consécutives (changement
+    de niveau durable). Les états modifiés sont écrits en base par
+    checkpoint() et relus par load().
+    """
+
+    def __init__(self, alpha: float = settings.DETECTOR_ALPHA, warmup: int = settings.DETECTOR_WARMUP,
+                 warning_z: float = settings.DETECTOR_WARNING_Z, anomaly_z: float = settings.DETECTOR_ANOMALY_Z,
+                 rebaseline_after: int = settings.DETECTOR_REBASELINE_AFTER,
+                 session_factory: Callable = SessionLocal):
+        self.alpha = alpha
+        self.warmup = warmup
+        self.warning_z = warning_z
+        self.anomaly_z = anomaly_z
+        self.rebaseline_after = rebaseline_after
+        self._session_factory = session_factory
+        self._states: Dict[str, Dict[str, RunningStat]] = {}
+        # Statistiques de la série d'anomalies en cours, par capteur
+        self._candidates: Dict[str, Dict[str, RunningStat]] = {}
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def observe(self, sensor_key: str, metrics: Dict[str, float]) -> Dict:
+        """
+        Classe un segment et met à jour la ligne de base du capteur
+
+        Args:
+            sensor_key: Identifiant du flux (ex: "dataset:3")
+            metrics: {métrique: valeur} du segment (rms, peak, énergies log...)
+
+        Returns:
+            Dict avec status, confidence, severity et les z-scores par métrique
+        """
+        metrics = {name: float(value) for name, value in metrics.items() if math.isfinite(value)}
+        with self._lock:
+            stats = self._states.setdefault(sensor_key, {})
+            observations = min((stats[name].n for name in metrics if name in stats), default=0)
+
+            zscores = {name: stats[name].zscore(value) for name, value in metrics.items()
+                       if name in stats and stats[name].n >= 2}
+            # Seule une hausse signale une fuite (énergie, RMS, crête)
+            max_z = max(zscores.values(), default=0.0)
+
+            if observations < self.warmup:
+                status = legacy_status(metrics)
+            elif max_z >= self.anomaly_z:
+                status = "anomaly"
+            elif max_z >= self.warning_z:
+                status = "warning"
+            else:
+                status = "normal"
+
+            rebaselined = False
+            if status != "anomaly" or observations < self.warmup:
+                for name, value in metrics.items():
+                    stats.setdefault(name, RunningStat()).update(value, self.alpha)
+                self._candidates.pop(sensor_key, None)
+                self._dirty.add(sensor_key)
+            else:
+                candidate = self._candidates.setdefault(sensor_key, {})
+                for name, value in metrics.items():
+                    candidate.setdefault(name, RunningStat()).update(value, self.alpha)
+                if min((stat.n for stat in candidate.values()), default=0) >= self.rebaseline_after:
+                    # Niveau durablement différent: la série d'anomalies devient la ligne de base
+                    self._states[sensor_key] = self._candidates.pop(sensor_key)
+                    self._dirty.add(sensor_key)
+                    rebaselined = True
+
+        # Confiance: maturité de la ligne de base; sévérité: écart rapporté au double du seuil d'anomalie
+        confidence = 0.5 + 0.49 * observations / (observations + self.warmup)
+        severity = min(1.0, max(0.0, max_z / (2 * self.anomaly_z)))
+        return {
+            "status": status,
+            "confidence": confidence,
+            "severity": severity,
+            "zscores": zscores,
+            "observations": observations,
+            "baseline": "learning" if observations < self.warmup else "adaptive",
+            "rebaselined": rebaselined,
+        }
+
+    def state(self, sensor_key: str) -> Optional[Dict]:
+        with self._lock:
+            stats = self._states.get(sensor_key)
+            if stats is None:
+                return None
+            return {name: {"observations": stat.n, "mean": stat.mean, "std": math.sqrt(stat.variance),
+                           "ewma": stat.ewma, "ewm_std": math.sqrt(stat.ewm_var)}
+                    for name, stat in stats.items()}
+
+    def load(self) -> int:
+        """Recharge les états enregistrés; retourne le nombre de capteurs"""
+        db = self._session_factory()
+        try:
+            rows = db.query(DetectorState).all()
+            with self._lock:
+                for row in rows:
+                    # Un capteur déjà observé depuis le démarrage garde son état courant
+                    self._states.setdefault(row.sensor_key, {
+                        name: RunningStat(*values) for name, values in json.loads(row.state).items()
+                    })
+            return len(rows)
+        finally:
+            db.close()
+
+    def checkpoint(self) -> int:
+        """Écrit en base les états modifiés depuis le dernier checkpoint; retourne leur nombre"""
+        with self._lock:
+            snapshot: Dict[str, Tuple[int, str]] = {}
+            for sensor_key in self._dirty:
+                stats = self._states[sensor_key]
+                observations = max((stat.n for stat in stats.values()), default=0)
+                snapshot[sensor_key] = (observations, json.dumps({name: stat.to_list() for name, stat in stats.items()}))
+            self._dirty.clear()
+        if not snapshot:
+            return 0
+
+        db = self._session_factory()
+        try:
+            existing = {row.sensor_key: row for row in
+                        db.query(DetectorState).filter(DetectorState.sensor_key.in_(list(snapshot))).all()}
+            for sensor_key, (observations, state) in snapshot.items():
+                row = existing.get(sensor_key)
+                if row is None:
+                    db.add(DetectorState(sensor_key=sensor_key, observations=observations, state=state))
+                else:
+                    row.observations = observations
+                    row.state = state
+            db.commit()
+            return len(snapshot)
+        except Exception:
+            db.rollback()
+            # Réessayer au prochain checkpoint
+            with self._lock:
+                self._dirty.update(snapshot)
+            raise
+        finally:
+            db.close()
+
+
+anomaly_detector = StreamingDetector()
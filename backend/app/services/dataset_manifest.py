@@ -0,0 +1,249 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+from .signal_store import signal_store, COLUMNAR_SUFFIX
+
+MANIFEST_PATH = Path(__file__).parent.parent.parent / "dataset" / "manifest.json"
+
+# Fréquence d'échantillonnage des enregistrements Accelerometer
+DEFAULT_SAMPLE_RATE = 51200.0
+
+NETWORK_FOLDERS = {
+    "branched": "Branched",
+    "looped": "Looped",
+}
+
+LEAK_CLASS_FOLDERS = {
+    "normal": "No-leak",
+    "gasket_leak": "Gasket Leak",
+    "circumferential_crack": "Circumferential Crack",
+    "longitudinal_crack": "Longitudinal Crack",
+    "orifice_leak": "Orifice Leak",
+}
+
+_manifest_file_lock = threading.Lock()
+
+
+def standard_directories(root: Path) -> Dict[Tuple[str, str], Path]:
+    """Dossiers (réseau, classe) de l'arborescence Accelerometer standard"""
+    return {
+        (network_type, leak_class): Path(root) / network_folder / class_folder
+        for network_type, network_folder in NETWORK_FOLDERS.items()
+        for leak_class, class_folder in LEAK_CLASS_FOLDERS.items()
+    }
+
+
+def _parse_filename(name: str) -> Dict:
+    """Extrait débit et position d'un nom comme 'BR_NL_0.18 LPS_A1.csv'"""
+    parts = Path(name).stem.split("_")
+    return {
+        "flow_rate": parts[2] if len(parts) >= 4 else None,
+        "position": parts[-1] if len(parts) >= 3 else None,
+    }
+
+
+def recording_name(name: str) -> str:
+    """Enregistrement d'un fichier, sans la position du capteur: 'BR_GL_0.18 LPS_A1.csv' -> 'BR_GL_0.18 LPS'"""
+    parts = Path(name).stem.split("_")
+    return "_".join(parts[:-1]) if len(parts) >= 3 else Path(name).stem
+
+
+class DatasetManifest:
+    """
+    Index persistant des fichiers du dataset.
+
+    Construit une seule fois puis revalidé par le mtime de chaque dossier:
+    seul un dossier modifié (ajout, suppression, renommage) est relu, et ses
+    fichiers inchangés (taille et mtime) sont réutilisés. Un CSV réécrit sur
+    place ne change pas le mtime du dossier: refresh(force=True) le prend en
+    compte. Les listes filtrées (réseau, classe de fuite, débit) sont des lookups.
+    """
+
+    def __init__(self, directories: Dict[Tuple[str, str], Path],
+                 manifest_path: Path = MANIFEST_PATH, check_interval: float = 5.0):
+        self.directories = {key: Path(path).resolve() for key, path in directories.items()}
+        self.manifest_path = manifest_path
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self._dir_state: Dict[str, Dict] = {}
+        self._by_name: Dict[str, Set[str]] = {}
+        self._by_network: Dict[str, Set[str]] = {}
+        self._by_leak_class: Dict[str, Set[str]] = {}
+        self._by_flow_rate: Dict[str, Set[str]] = {}
+        self._last_check = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                stored = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        for directory in self.directories.values():
+            state = stored.get("directories", {}).get(str(directory))
+            if state:
+                self._dir_state[str(directory)] = state
+
+    def _save(self):
+        """Fusionne nos dossiers dans le manifest commun (écriture atomique)"""
+        with _manifest_file_lock:
+            try:
+                with open(self.manifest_path, 'r') as f:
+                    stored = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                stored = {}
+            stored.setdefault("directories", {}).update(self._dir_state)
+            tmp_path = self.manifest_path.with_name(f"{self.manifest_path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(stored, f, indent=2)
+                os.replace(tmp_path, self.manifest_path)
+            except OSError as e:
+                print(f"Erreur écriture manifest {self.manifest_path}: {e}")
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+    def _scan_directory(self, network_type: str, leak_class: str, directory: Path, reuse: bool = True) -> Dict:
+        """Indexe un dossier en réutilisant les entrées dont taille et mtime n'ont pas changé"""
+        previous = self._dir_state.get(str(directory), {}).get("files", {}) if reuse else {}
+        # mtime lu avant le listage: un changement pendant le scan sera vu au prochain refresh
+        dir_mtime = directory.stat().st_mtime
+        # Noms CSV logiques, y compris les fichiers disponibles seulement en Parquet
+        names = {f.name for f in directory.glob("*.csv")}
+        names |= {f.with_suffix(".csv").name for f in directory.glob(f"*{COLUMNAR_SUFFIX}")}
+        files = {}
+        for name in sorted(names):
+            csv_file = directory / name
+            source = signal_store.source_path(csv_file)
+            file_format = "parquet" if source.suffix == COLUMNAR_SUFFIX else "csv"
+            try:
+                stat = source.stat()
+            except FileNotFoundError:
+                # Supprimé entre le listage et le stat
+                continue
+            entry = previous.get(name)
+            if (entry and entry.get("format") == file_format
+                    and entry["size_bytes"] == stat.st_size and entry["mtime"] == stat.st_mtime):
+                files[name] = entry
+                continue
+            try:
+                value_column = signal_store.value_column(csv_file)
+                row_count = signal_store.row_count(csv_file)
+            except Exception as e:
+                print(f"Erreur indexation {csv_file}: {e}")
+                continue
+            files[name] = {
+                "path": str(csv_file),
+                "name": name,
+                "format": file_format,
+                "network_type": network_type,
+                "leak_class": leak_class,
+                **_parse_filename(name),
+                "row_count": row_count,
+                "sample_rate": DEFAULT_SAMPLE_RATE,
+                "value_column": value_column,
+                "size_bytes": stat.st_size,
+                "mtime": stat.st_mtime,
+            }
+        return {"mtime": dir_mtime, "files": files}
+
+    def _rebuild_indexes(self):
+        # Index construits à part puis publiés d'un coup (les lecteurs en prennent un snapshot)
+        entries: Dict[str, Dict] = {}
+        by_name, by_network, by_leak_class, by_flow_rate = {}, {}, {}, {}
+        for directory in self.directories.values():
+            for entry in self._dir_state.get(str(directory), {}).get("files", {}).values():
+                path = entry["path"]
+                entries[path] = entry
+                by_name.setdefault(entry["name"], set()).add(path)
+                by_network.setdefault(entry["network_type"], set()).add(path)
+                by_leak_class.setdefault(entry["leak_class"], set()).add(path)
+                if entry["flow_rate"]:
+                    by_flow_rate.setdefault(entry["flow_rate"], set()).add(path)
+        self._entries = entries
+        self._by_name, self._by_network, self._by_leak_class, self._by_flow_rate = (
+            by_name, by_network, by_leak_class, by_flow_rate)
+
+    def _snapshot(self) -> Tuple[Dict[str, Dict], Dict[str, Set[str]], Dict[str, Set[str]],
+                                 Dict[str, Set[str]], Dict[str, Set[str]]]:
+        """Entrées et index cohérents entre eux (jamais modifiés après publication)"""
+        self.refresh()
+        with self._lock:
+            return self._entries, self._by_name, self._by_network, self._by_leak_class, self._by_flow_rate
+
+    def refresh(self, force: bool = False):
+        """
+        Réindexe les dossiers dont le mtime a changé (tous avec force)
+
+        Dans un dossier relu, seuls les fichiers nouveaux ou modifiés (taille
+        ou mtime) sont réindexés; avec force, tous les fichiers le sont.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._entries and now - self._last_check < self.check_interval:
+                return
+            self._last_check = now
+
+            changed = False
+            for (network_type, leak_class), directory in self.directories.items():
+                key = str(directory)
+                if not directory.is_dir():
+                    if key in self._dir_state:
+                        del self._dir_state[key]
+                        changed = True
+                    continue
+                state = self._dir_state.get(key)
+                if not force and state and state["mtime"] == directory.stat().st_mtime:
+                    continue
+                scanned = self._scan_directory(network_type, leak_class, directory, reuse=not force)
+                if scanned != self._dir_state.get(key):
+                    self._dir_state[key] = scanned
+                    changed = True
+
+            if changed or not self._entries:
+                self._rebuild_indexes()
+            if changed:
+                self._save()
+
+    def files(self, network_type: Optional[str] = None, leak_class: Optional[str] = None,
+              flow_rate: Optional[str] = None) -> List[Dict]:
+        """Entrées du manifest filtrées par réseau, classe de fuite et/ou débit"""
+        entries, _, by_network, by_leak_class, by_flow_rate = self._snapshot()
+        selected: Optional[Set[str]] = None
+        for index, value in ((by_network, network_type),
+                             (by_leak_class, leak_class),
+                             (by_flow_rate, flow_rate)):
+            if value is None:
+                continue
+            matches = index.get(value, set())
+            selected = matches if selected is None else selected & matches
+        paths = entries.keys() if selected is None else selected
+        return [entries[path] for path in sorted(paths)]
+
+    def paths(self, **filters) -> List[Path]:
+        """Chemins des fichiers correspondant aux filtres"""
+        return [Path(entry["path"]) for entry in self.files(**filters)]
+
+    def find(self, filename: str, network_type: Optional[str] = None) -> Optional[Dict]:
+        """Retrouve un fichier par son nom"""
+        entries, by_name, _, _, _ = self._snapshot()
+        for path in sorted(by_name.get(filename, set())):
+            entry = entries[path]
+            if network_type is None or entry["network_type"] == network_type:
+                return entry
+        return None
+
+
+_manifests: Dict[Path, DatasetManifest] = {}
+
+
+def manifest_for_root(root: Path) -> DatasetManifest:
+    """Manifest partagé d'une arborescence Accelerometer standard"""
+    root = Path(root).resolve()
+    if root not in _manifests:
+        _manifests[root] = DatasetManifest(standard_directories(root))
+    return _manifests[root]
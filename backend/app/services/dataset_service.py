@@ -1,98 +1,257 @@
 import json
 import os
-import pandas as pd
+import numpy as np
 import random
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
-from .spectrogram_service import SpectrogramService
+from .spectrogram_service import SpectrogramService, DEFAULT_FEATURES
+from .feature_engine import DATASET_SAMPLE_RATE, feature_engine
+from .signal_store import signal_store
+from .dataset_manifest import DatasetManifest, recording_name
+from .playback_cursors import playback_cursors, DEFAULT_CURSOR
+from .spectrogram_store import spectrogram_store
+
+# Espace de curseurs du tick de monitoring, distinct de celui des endpoints
+MONITORING_CURSORS = "monitoring"
 
 class DatasetService:
     def __init__(self):
         self.config_path = Path(__file__).parent.parent.parent / "dataset" / "config.json"
         self.config = self._load_config()
+        self.manifest = DatasetManifest(self._dataset_directories())
         
     def _load_config(self) -> Dict:
         with open(self.config_path, 'r') as f:
             return json.load(f)
     
     def _save_config(self):
-        with open(self.config_path, 'w') as f:
+        tmp_path = self.config_path.with_name(f"{self.config_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'w') as f:
             json.dump(self.config, f, indent=2)
+        os.replace(tmp_path, self.config_path)
+    
+    def _dataset_directories(self) -> Dict[Tuple[str, str], Path]:
+        """Dossiers du dataset indexés par (réseau, classe de fuite)"""
+        base_path = Path(__file__).parent.parent.parent
+        return {
+            (network_type, leak_class): base_path / folder
+            for network_type, folders in self.config["dataset_paths"].items()
+            for leak_class, folder in folders.items()
+        }
     
     def get_sensor_files(self, sensor_id: str) -> Dict:
         """Récupère les fichiers associés à un capteur"""
-        return self.config["sensor_assignments"].get(str(sensor_id), {})
+        sensor_config = self.config["sensor_assignments"].get(str(sensor_id))
+        if not sensor_config:
+            return {}
+        return {**sensor_config, **playback_cursors.get(sensor_id)}
     
     def assign_files_to_sensor(self, sensor_id: str, normal_files: List[str], leak_files: List[str], network_type: str):
         """Assigne des fichiers à un capteur"""
         self.config["sensor_assignments"][str(sensor_id)] = {
             "network_type": network_type,
             "normal_files": normal_files,
-            "leak_files": leak_files,
-            "current_file": None,
-            "current_segment": 0,
-            "leak_mode": False
+            "leak_files": leak_files
         }
         self._save_config()
+        with playback_cursors.lock(sensor_id):
+            playback_cursors.update(sensor_id, **DEFAULT_CURSOR)
     
-    def get_next_segment(self, sensor_id: str) -> Optional[Dict]:
-        """Récupère le prochain segment de 5s avec spectrogramme pour un capteur"""
-        sensor_config = self.config["sensor_assignments"].get(str(sensor_id))
-        if not sensor_config:
-            return None
-            
-        # Sélectionner le bon type de fichiers
-        files = sensor_config["leak_files"] if sensor_config["leak_mode"] else sensor_config["normal_files"]
-        
-        # Si pas de fichier actuel, en choisir un aléatoirement
-        if not sensor_config["current_file"]:
-            sensor_config["current_file"] = random.choice(files)
-            sensor_config["current_segment"] = 0
-        
-        # Charger le fichier CSV
-        file_path = self._get_file_path(sensor_config["network_type"], sensor_config["current_file"], sensor_config["leak_mode"])
-        
-        try:
-            df = pd.read_csv(file_path)
-            
-            # Calculer les indices pour le segment de 5s
-            total_rows = len(df)
-            segment_size = total_rows // 6  # 6 segments de 5s dans 30s
-            start_idx = sensor_config["current_segment"] * segment_size
-            end_idx = min(start_idx + segment_size, total_rows)
-            
-            segment_data = df.iloc[start_idx:end_idx]
-            
-            # Générer spectrogramme et caractéristiques
-            spectrogram_data = SpectrogramService.generate_spectrogram(segment_data)
-            features = SpectrogramService.extract_features(segment_data)
+    def _advance_cursor(self, sensor_id: str, sensor_config: Dict,
+                        namespace: Optional[str] = None) -> Tuple[str, int, bool]:
+        """
+        Réserve le prochain segment d'un capteur et avance son curseur
+
+        Avec `namespace`, le curseur avancé est "<namespace>:<capteur>": sa
+        lecture est indépendante de celle des endpoints, le mode fuite reste
+        celui du capteur.
+        """
+        cursor_id = f"{namespace}:{sensor_id}" if namespace else str(sensor_id)
+        with playback_cursors.lock(cursor_id):
+            cursor = playback_cursors.get(cursor_id)
+            leak_mode = playback_cursors.get(sensor_id)["leak_mode"]
             
-            # Passer au segment suivant
-            sensor_config["current_segment"] += 1
+            # Sélectionner le bon type de fichiers
+            files = sensor_config["leak_files"] if leak_mode else sensor_config["normal_files"]
             
-            # Si fin du fichier, choisir un nouveau fichier
-            if sensor_config["current_segment"] >= 6:
-                sensor_config["current_file"] = random.choice(files)
-                sensor_config["current_segment"] = 0
+            # Si pas de fichier actuel (ou plus dans la liste: réaffectation, changement de mode), en choisir un
+            current_file = cursor["current_file"]
+            current_segment = cursor["current_segment"]
+            if not current_file or current_file not in files:
+                current_file = random.choice(files)
+                current_segment = 0
             
-            self._save_config()
+            # Passer au segment suivant, nouveau fichier en fin de fichier
+            next_file, next_segment = current_file, current_segment + 1
+            if next_segment >= 6:
+                next_file, next_segment = random.choice(files), 0
+            playback_cursors.update(cursor_id, current_file=next_file, current_segment=next_segment)
             
-            return {
+        return current_file, current_segment, leak_mode
+    
+    def get_next_segment(self, sensor_id: str, features: Optional[List[str]] = None) -> Optional[Dict]:
+        """Récupère le prochain segment de 5s avec spectrogramme pour un capteur"""
+        return self.get_next_segments([sensor_id], features).get(str(sensor_id))
+    
+    def get_next_segments(self, sensor_ids: List[str], features: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Prochain segment de plusieurs capteurs, au format JSON des endpoints (signal_data, listes)"""
+        results = {}
+        for sensor_id, segment in self.get_next_segment_arrays(sensor_ids, features).items():
+            results[sensor_id] = {
                 "sensor_id": sensor_id,
-                "signal_data": segment_data.to_dict('records'),
-                "spectrogram": spectrogram_data,
-                "features": features,
-                "is_leak": sensor_config["leak_mode"],
-                "file_name": sensor_config["current_file"],
-                "segment": sensor_config["current_segment"] - 1
+                "signal_data": [{"Value": value} for value in segment["values"].tolist()],
+                "spectrogram": {**segment["spectrogram"], "spectrogram": segment["spectrogram"]["spectrogram"].tolist()},
+                "features": segment["features"],
+                "is_leak": segment["is_leak"],
+                "file_name": segment["file_name"],
+                "segment": segment["segment"]
             }
+        return results
+    
+    def get_next_segment_arrays(self, sensor_ids: List[str], features: Optional[List[str]] = None,
+                                cursor_namespace: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Prochain segment de plusieurs capteurs (un tick pour toute la flotte)
+        
+        `cursor_namespace` (ex: MONITORING_CURSORS) fait avancer des curseurs
+        propres à l'appelant plutôt que les curseurs partagés des endpoints.
+        
+        Les spectrogrammes absents du store et les caractéristiques
+        (`features`, défaut DEFAULT_FEATURES) sont calculés en un seul
+        appel batch par longueur de segment. Signal ("values") et matrice
+        du spectrogramme restent des tableaux numpy: la conversion JSON
+        est faite par get_next_segments, pour les seuls endpoints.
+        """
+        features = features or DEFAULT_FEATURES
+        feature_engine.validate(features)
+        
+        segments = {}
+        for sensor_id in sensor_ids:
+            sensor_config = self.config["sensor_assignments"].get(str(sensor_id))
+            if not sensor_config:
+                continue
             
-        except Exception as e:
-            print(f"Erreur lecture fichier {file_path}: {e}")
-            return None
+            current_file, current_segment, leak_mode = self._advance_cursor(sensor_id, sensor_config, cursor_namespace)
+            
+            # Charger le signal (sidecar float32 mappé en mémoire)
+            file_path = self._get_file_path(sensor_config["network_type"], current_file, leak_mode)
+            
+            try:
+                values = signal_store.load(file_path)
+                
+                # Calculer les indices pour le segment de 5s
+                total_rows = len(values)
+                segment_size = total_rows // 6  # 6 segments de 5s dans 30s
+                start_idx = current_segment * segment_size
+                end_idx = min(start_idx + segment_size, total_rows)
+                
+                segments[str(sensor_id)] = {
+                    "values": values[start_idx:end_idx],
+                    # Spectrogramme précalculé si disponible, sinon calcul à la volée
+                    "spectrogram": spectrogram_store.segment(file_path, "dataset", current_segment),
+                    "is_leak": leak_mode,
+                    "file_name": current_file,
+                    "segment": current_segment,
+                    # Version du fichier lu (clé de cache des rendus)
+                    "source_mtime": signal_store.source_path(file_path).stat().st_mtime
+                }
+            except Exception as e:
+                print(f"Erreur lecture fichier {file_path}: {e}")
+        
+        by_length: Dict[int, List[str]] = {}
+        for sensor_id, segment in segments.items():
+            by_length.setdefault(len(segment["values"]), []).append(sensor_id)
+        
+        for ids in by_length.values():
+            stacked = np.stack([segments[sensor_id]["values"] for sensor_id in ids])
+            batch_features = feature_engine.compute(stacked, DATASET_SAMPLE_RATE, features)
+            for row, sensor_id in enumerate(ids):
+                segments[sensor_id]["features"] = {name: float(values[row]) for name, values in batch_features.items()}
+        
+        pending: Dict[int, List[str]] = {}
+        for sensor_id, segment in segments.items():
+            if segment["spectrogram"] is None:
+                pending.setdefault(len(segment["values"]), []).append(sensor_id)
+        
+        for ids in pending.values():
+            try:
+                batch = SpectrogramService.generate_spectrograms_batch(
+                    np.stack([segments[sensor_id]["values"] for sensor_id in ids])
+                )
+            except Exception as e:
+                print(f"Erreur calcul spectrogrammes {ids}: {e}")
+                for sensor_id in ids:
+                    del segments[sensor_id]
+                continue
+            for sensor_id, spectrogram in zip(ids, batch["spectrograms"]):
+                segments[sensor_id]["spectrogram"] = {
+                    "frequencies": batch["frequencies"].tolist(),
+                    "times": batch["times"].tolist(),
+                    "spectrogram": spectrogram,
+                    "fs": batch["fs"],
+                    "signal_length": batch["signal_length"],
+                    "frequency_resolution": batch["frequency_resolution"],
+                    "time_resolution": batch["time_resolution"]
+                }
+        
+        return segments
     
+    def get_aligned_segments(self, sensor_ids: List[str]) -> Optional[Dict]:
+        """
+        Segments simultanés de plusieurs capteurs, sans avancer leurs curseurs
+
+        Le premier capteur fixe l'enregistrement et le segment (position de
+        son curseur); chaque autre capteur fournit son canal du même
+        enregistrement (même nom, autre position A1/A2...) sur les mêmes
+        échantillons. Les capteurs sans tel canal sont listés dans "unaligned".
+        """
+        assignments = self.config["sensor_assignments"]
+        ids = [str(sensor_id) for sensor_id in sensor_ids if str(sensor_id) in assignments]
+        if not ids:
+            return None
+        cursor = playback_cursors.get(ids[0])
+        if not cursor["current_file"]:
+            return None
+        recording = recording_name(cursor["current_file"])
+        segment_index = cursor["current_segment"]
+        network_type = assignments[ids[0]]["network_type"]
+        segments_per_file = self.config["simulation"]["segments_per_file"]
+
+        segments, files, unaligned = {}, {}, []
+        fs, total_rows = None, None
+        for sensor_id in ids:
+            sensor_config = assignments[sensor_id]
+            channel = next((name for name in sensor_config["normal_files"] + sensor_config["leak_files"]
+                            if recording_name(name) == recording), None)
+            entry = self.manifest.find(channel, network_type) if channel else None
+            if entry is None:
+                unaligned.append(sensor_id)
+                continue
+            try:
+                values = signal_store.load(Path(entry["path"]))
+            except Exception as e:
+                print(f"Erreur lecture fichier {entry['path']}: {e}")
+                unaligned.append(sensor_id)
+                continue
+            if fs is None:
+                fs, total_rows = entry["sample_rate"], len(values)
+            elif entry["sample_rate"] != fs or len(values) != total_rows:
+                # Même nom mais pas la même acquisition (cadence ou durée différente)
+                unaligned.append(sensor_id)
+                continue
+            segment_size = total_rows // segments_per_file
+            segments[sensor_id] = values[segment_index * segment_size:(segment_index + 1) * segment_size]
+            files[sensor_id] = channel
+
+        return {"recording": recording, "segment": segment_index, "fs": fs,
+                "segments": segments, "files": files, "unaligned": unaligned}
+
     def _get_file_path(self, network_type: str, filename: str, is_leak: bool) -> Path:
         """Construit le chemin complet vers un fichier CSV"""
+        entry = self.manifest.find(filename, network_type)
+        if entry:
+            return Path(entry["path"])
+        
         base_path = Path(__file__).parent.parent.parent
         
         if is_leak:
@@ -114,10 +273,9 @@ class DatasetService:
     def toggle_leak_mode(self, sensor_id: str, leak_mode: bool):
         """Active/désactive le mode fuite pour un capteur"""
         if str(sensor_id) in self.config["sensor_assignments"]:
-            self.config["sensor_assignments"][str(sensor_id)]["leak_mode"] = leak_mode
-            # Reset le fichier actuel pour changer immédiatement
-            self.config["sensor_assignments"][str(sensor_id)]["current_file"] = None
-            self._save_config()
+            with playback_cursors.lock(sensor_id):
+                # Reset le fichier actuel pour changer immédiatement
+                playback_cursors.update(sensor_id, leak_mode=leak_mode, current_file=None, current_segment=0)
     
     def get_available_files(self) -> Dict:
         """Liste tous les fichiers disponibles par type de réseau"""
@@ -125,14 +283,39 @@ class DatasetService:
         
         for network_type in ["branched", "looped"]:
             # Fichiers normaux
-            normal_path = Path(__file__).parent.parent.parent / self.config["dataset_paths"][network_type]["normal"]
-            if normal_path.exists():
-                available_files[network_type]["normal"] = [f.name for f in normal_path.glob("*.csv")]
+            available_files[network_type]["normal"] = [
+                entry["name"] for entry in self.manifest.files(network_type=network_type, leak_class="normal")
+            ]
             
             # Fichiers avec fuites
             for leak_type in ["gasket_leak", "circumferential_crack", "longitudinal_crack", "orifice_leak"]:
-                leak_path = Path(__file__).parent.parent.parent / self.config["dataset_paths"][network_type][leak_type]
-                if leak_path.exists():
-                    available_files[network_type]["leak"].extend([f.name for f in leak_path.glob("*.csv")])
+                available_files[network_type]["leak"].extend(
+                    entry["name"] for entry in self.manifest.files(network_type=network_type, leak_class=leak_type)
+                )
         
-        return available_files
\ No newline at end of file
+        return available_files
+    
+    def iter_dataset_files(self) -> List[Dict]:
+        """Fichiers référencés par les affectations de capteurs, sans doublons"""
+        files = {}
+        for sensor_config in self.config["sensor_assignments"].values():
+            network_type = sensor_config["network_type"]
+            for is_leak, key in ((False, "normal_files"), (True, "leak_files")):
+                for filename in sensor_config[key]:
+                    path = self._get_file_path(network_type, filename, is_leak)
+                    entry = self.manifest.find(filename, network_type) or {}
+                    files.setdefault(str(path), {
+                        "path": str(path),
+                        "file_name": filename,
+                        "network_type": network_type,
+                        "leak_class": entry.get("leak_class"),
+                        "flow_rate": entry.get("flow_rate"),
+                        "sample_rate": entry.get("sample_rate"),
+                        "is_leak": is_leak
+                    })
+        return list(files.values())
+    
+    def find_files(self, network_type: Optional[str] = None, leak_class: Optional[str] = None,
+                   flow_rate: Optional[str] = None) -> List[Dict]:
+        """Liste les fichiers du manifest filtrés par réseau, classe de fuite et débit"""
+        return self.manifest.files(network_type=network_type, leak_class=leak_class, flow_rate=flow_rate)
@@ -0,0 +1,87 @@
+import numpy as np
+from scipy import fft as sp_fft
+from scipy import signal
+from typing import Callable, Optional, Union
+from ..core.config import settings
+
+# Primitives DSP internes: reproduisent librosa.stft / amplitude_to_db /
+# fft_frequencies / frames_to_time (défauts de librosa >= 0.10) avec numpy
+# et scipy.fft, sans importer librosa ni numba. Vérifié par test_dsp.py.
+
+
+def float_dtype(dtype=None) -> np.dtype:
+    """Précision des calculs DSP (DSP_PRECISION par défaut)"""
+    return np.dtype(dtype or settings.DSP_PRECISION)
+
+
+def stft(y: np.ndarray, n_fft: int = 2048, hop_length: Optional[int] = None,
+         window: Union[str, tuple, np.ndarray] = 'hann', center: bool = True,
+         pad_mode: str = 'constant', workers: int = -1) -> np.ndarray:
+    """
+    Transformée de Fourier à court terme, comme librosa.stft
+
+    Returns:
+        Matrice complexe (1 + n_fft // 2, n_trames)
+    """
+    y = np.asarray(y)
+    if not np.issubdtype(y.dtype, np.floating):
+        y = y.astype(float_dtype())
+    if hop_length is None:
+        hop_length = n_fft // 4
+    if isinstance(window, np.ndarray):
+        window_values = window
+    else:
+        window_values = signal.get_window(window, n_fft, fftbins=True)
+    if len(window_values) != n_fft:
+        raise ValueError(f"Fenêtre de longueur {len(window_values)} pour n_fft={n_fft}")
+    # Fenêtre à la précision du signal: float32 reste float32 (complex64)
+    window_values = window_values.astype(y.dtype, copy=False)
+
+    if center:
+        y = np.pad(y, n_fft // 2, mode=pad_mode)
+    if len(y) < n_fft:
+        raise ValueError(f"Signal trop court ({len(y)}) pour n_fft={n_fft}")
+
+    frames = np.lib.stride_tricks.sliding_window_view(y, n_fft)[::hop_length]
+    return sp_fft.rfft(frames * window_values, axis=-1, workers=workers).T
+
+
+def power_to_db(S: np.ndarray, ref: Union[float, Callable] = 1.0, amin: float = 1e-10,
+                top_db: Optional[float] = 80.0) -> np.ndarray:
+    """Puissance -> dB, comme librosa.power_to_db"""
+    S = np.asarray(S)
+    ref_value = ref(S) if callable(ref) else np.abs(ref)
+    log_spec = 10.0 * np.log10(np.maximum(amin, S))
+    log_spec -= 10.0 * np.log10(np.maximum(amin, ref_value))
+    if top_db is not None:
+        log_spec = np.maximum(log_spec, log_spec.max() - top_db)
+    return log_spec
+
+
+def amplitude_to_db(S: np.ndarray, ref: Union[float, Callable] = 1.0, amin: float = 1e-5,
+                    top_db: Optional[float] = 80.0) -> np.ndarray:
+    """Amplitude -> dB, comme librosa.amplitude_to_db"""
+    magnitude = np.abs(S)
+    ref_value = ref(magnitude) if callable(ref) else np.abs(ref)
+    return power_to_db(np.square(magnitude), ref=ref_value**2, amin=amin**2, top_db=top_db)
+
+
+def fft_frequencies(sr: float, n_fft: int) -> np.ndarray:
+    """Fréquences des bins de la STFT"""
+    return np.fft.rfftfreq(n_fft, 1 / sr)
+
+
+def frames_to_time(frames: np.ndarray, sr: float, hop_length: int) -> np.ndarray:
+    """Instant de début de chaque trame (centre si la STFT est centrée)"""
+    return np.asarray(frames) * hop_length / sr
+
+
+def band_mask(frequencies: np.ndarray, f_min: Optional[float] = None,
+              f_max: Optional[float] = None) -> np.ndarray:
+    """Masque des bins dans [f_min, f_max]"""
+    mask = np.ones(len(frequencies), dtype=bool)
+    if f_min is not None:
+        mask &= frequencies >= f_min
+    if f_max is not None:
+        mask &= frequencies <= f_max
+    return mask
@@ -0,0 +1,124 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from scipy import signal
+from typing import Dict, Optional, Tuple, Union
+from .dsp import band_mask, float_dtype
+
+
+@dataclass(frozen=True)
+class DSPPlan:
+    """Coefficients et axes précalculés d'une STFT (filtre, fenêtre, fréquences)"""
+    fs: float
+    nperseg: int
+    hop: int
+    band: Optional[Tuple[float, float]]
+    order: int
+    dtype: np.dtype                     # précision des coefficients et des calculs
+    sos: Optional[np.ndarray]           # passe-bande Butterworth, None sans bande
+    window: np.ndarray                  # fenêtre échantillonnée (périodique, comme scipy/librosa)
+    frequencies: np.ndarray             # axe rfft complet
+    freq_mask: np.ndarray               # bins conservés (freq_range)
+    scale: float                        # mise à l'échelle 'density' de scipy.signal.spectrogram
+
+    @property
+    def masked_frequencies(self) -> np.ndarray:
+        return self.frequencies[self.freq_mask]
+
+
+def _build_plan(fs: float, nperseg: int, hop: int, band: Optional[Tuple[float, float]], order: int,
+                window: Union[str, Tuple], freq_range: Optional[Tuple[Optional[float], Optional[float]]],
+                dtype: np.dtype) -> DSPPlan:
+    # Conception en float64, puis coefficients stockés à la précision du plan
+    sos = signal.butter(order, band, btype='band', fs=fs, output='sos').astype(dtype) if band else None
+    window_values = signal.get_window(window, nperseg).astype(dtype)
+    frequencies = np.fft.rfftfreq(nperseg, 1 / fs)
+
+    freq_mask = band_mask(frequencies, *freq_range) if freq_range is not None else band_mask(frequencies)
+
+    # sos reste inscriptible: sosfilt exige un buffer modifiable
+    for array in (window_values, frequencies, freq_mask):
+        array.setflags(write=False)
+
+    return DSPPlan(
+        fs=fs, nperseg=nperseg, hop=hop, band=band, order=order, dtype=dtype, sos=sos,
+        window=window_values, frequencies=frequencies, freq_mask=freq_mask,
+        scale=1.0 / (fs * float(np.sum(window_values.astype(np.float64)**2)))
+    )
+
+
+@lru_cache(maxsize=16)
+def decimation_filter(factor: int, fs: float, passband: float, attenuation: float = 60.0) -> np.ndarray:
+    """
+    FIR anti-repliement (Kaiser) d'une décimation par `factor`
+
+    [0, passband] est conservé; tout ce qui se replierait dans cette bande
+    (au-delà de fs/factor - passband) est atténué de `attenuation` dB.
+    """
+    fs_out = fs / factor
+    if passband >= fs_out / 2:
+        raise ValueError(f"Bande {passband} Hz au-delà du Nyquist décimé ({fs_out / 2} Hz)")
+    numtaps, beta = signal.kaiserord(attenuation, (fs_out - 2 * passband) / (fs / 2))
+    taps = signal.firwin(numtaps | 1, fs_out / 2, window=('kaiser', beta), fs=fs)
+    taps.setflags(write=False)
+    return taps
+
+
+class DSPPlanCache:
+    """
+    Cache LRU borné des plans DSP.
+
+    Les plans sont partagés entre requêtes (tableaux en lecture seule);
+    les compteurs permettent de vérifier qu'ils sont réutilisés en charge.
+    """
+
+    def __init__(self, max_plans: int = 64):
+        self.max_plans = max_plans
+        self._plans: "OrderedDict[Tuple, DSPPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def get(self, fs: float, nperseg: int, hop: int, band: Optional[Tuple[float, float]] = None,
+            order: int = 4, window: Union[str, Tuple] = 'hann',
+            freq_range: Optional[Tuple[Optional[float], Optional[float]]] = None,
+            dtype=None) -> DSPPlan:
+        """Plan pour (fs, nperseg, hop, band, order), construit au premier appel"""
+        band = tuple(float(b) for b in band) if band else None
+        dtype = float_dtype(dtype)
+        key = (float(fs), int(nperseg), int(hop), band, int(order), window, freq_range, dtype.str)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is not None:
+                self._plans.move_to_end(key)
+                self.hits += 1
+                return plan
+
+        plan = _build_plan(float(fs), int(nperseg), int(hop), band, int(order), window, freq_range, dtype)
+        with self._lock:
+            if key not in self._plans:
+                self.builds += 1
+                self._plans[key] = plan
+                while len(self._plans) > self.max_plans:
+                    self._plans.popitem(last=False)
+                    self.evictions += 1
+            return self._plans[key]
+
+    def stats(self) -> Dict:
+        """Nombre de plans construits, réutilisés et évincés"""
+        with self._lock:
+            requests = self.builds + self.hits
+            return {
+                "plans": len(self._plans),
+                "max_plans": self.max_plans,
+                "builds": self.builds,
+                "hits": self.hits,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+plan_cache = DSPPlanCache()
@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+from ..core.config import settings
+
+
+class ExecutorBusy(Exception):
+    """File d'attente de l'exécuteur pleine"""
+
+
+class ExecutorTimeout(Exception):
+    """Tâche non terminée dans le délai imparti"""
+
+
+class BoundedExecutor:
+    """
+    Exécuteur géré pour le travail lourd des endpoints.
+
+    Le nombre de tâches en cours ou en attente est borné (au-delà:
+    ExecutorBusy) et chaque tâche a un délai (ExecutorTimeout); la boucle
+    asyncio ne fait qu'attendre le résultat.
+    """
+
+    def __init__(self, name: str, factory: Callable[[], Executor], max_pending: int, timeout: float):
+        self.name = name
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._factory = factory
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self._metrics = {"submitted": 0, "completed": 0, "rejected": 0, "timeouts": 0, "errors": 0}
+
+    def _get_executor(self) -> Executor:
+        # Création paresseuse: les processus ne démarrent qu'à la première requête
+        with self._lock:
+            if self._executor is None:
+                self._executor = self._factory()
+            return self._executor
+
+    def _release(self, _future):
+        with self._lock:
+            self.pending -= 1
+
+    async def run(self, fn: Callable, *args, **kwargs):
+        """Exécute fn(*args, **kwargs) hors de la boucle asyncio"""
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self._metrics["rejected"] += 1
+                raise ExecutorBusy(f"{self.name}: {self.pending} tâches en cours, réessayer plus tard")
+            self.pending += 1
+        self._metrics["submitted"] += 1
+        submitted = False
+        try:
+            future = self._get_executor().submit(fn, *args, **kwargs)
+            # Place libérée à la fin réelle de la tâche: après un délai dépassé, elle occupe encore un worker
+            future.add_done_callback(self._release)
+            submitted = True
+            result = await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            self._metrics["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            self._metrics["timeouts"] += 1
+            raise ExecutorTimeout(f"{self.name}: délai de {self.timeout:g}s dépassé")
+        except BrokenProcessPool:
+            # Processus mort (OOM, crash natif): recréer le pool à la prochaine tâche
+            self._metrics["errors"] += 1
+            with self._lock:
+                self._executor = None
+            raise
+        except Exception:
+            self._metrics["errors"] += 1
+            raise
+        finally:
+            if not submitted:
+                self._release(None)
+
+    async def run_background(self, fn: Callable, *args):
+        """Tâche de maintenance (chargement, warm-up) sur l'exécuteur, sans borne ni délai"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args))
+
+    def stats(self) -> Dict:
+        return {
+            "name": self.name,
+            "started": self._executor is not None,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "timeout_seconds": self.timeout,
+            **self._metrics,
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+def _init_dsp_worker():
+    """Importe les seuls modules de calcul dans un processus du pool (ni routers, ni base, ni threads)"""
+    from . import dsp, leak_localization, ml_preprocessing, vibration_dsp  # noqa: F401
+
+
+# DSP (STFT, périodogramme, redimensionnement, encodage PNG) sur tous les cœurs.
+# 'spawn': le serveur a déjà des threads (prefetch, curseurs) au moment du fork.
+# Les tâches soumises sont définies dans des modules de services légers (vibration_dsp,
+# ml_preprocessing, leak_localization) pour ne pas importer app.main dans les workers.
+dsp_executor = BoundedExecutor(
+    "dsp",
+    lambda: ProcessPoolExecutor(max_workers=settings.DSP_WORKERS or os.cpu_count(),
+                                mp_context=multiprocessing.get_context("spawn"),
+                                initializer=_init_dsp_worker),
+    max_pending=settings.DSP_QUEUE_SIZE,
+    timeout=settings.DSP_TIMEOUT_SECONDS,
+)
+
+# Inférence sur un thread dédié: le modèle reste dans le processus et n'est jamais appelé en parallèle
+inference_executor = BoundedExecutor(
+    "inference",
+    lambda: ThreadPoolExecutor(max_workers=1, thread_name_prefix="inference"),
+    max_pending=settings.INFERENCE_QUEUE_SIZE,
+    timeout=settings.INFERENCE_TIMEOUT_SECONDS,
+)
+
+
+def shutdown_executors():
+    dsp_executor.shutdown()
+    inference_executor.shutdown()
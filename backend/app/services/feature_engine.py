@@ -0,0 +1,217 @@
+import numpy as np
+from dataclasses import dataclass
+from functools import cached_property
+from scipy import fft as sp_fft
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from .dsp import float_dtype
+
+# Fréquence appliquée aux segments du dataset par les caractéristiques servies (dataset_service,
+# dataset_real) et stockées (feature_store); DEFAULT_BANDS couvre 0 Hz jusqu'à sa fréquence de Nyquist
+DATASET_SAMPLE_RATE = 1000.0
+DEFAULT_BANDS = {"low": (0.0, 100.0), "mid": (100.0, 300.0), "high": (300.0, 500.0)}
+
+
+class FeatureContext:
+    """
+    Intermédiaires partagés d'un lot de segments (n_segments, n_samples).
+
+    Chaque intermédiaire (moments, spectre rfft) est calculé au premier
+    accès seulement: une caractéristique temporelle ne paie pas de FFT.
+    """
+
+    def __init__(self, segments: np.ndarray, fs: float, bands: Dict[str, Tuple[float, float]]):
+        self.segments = segments
+        self.fs = fs
+        self.bands = bands
+
+    @cached_property
+    def mean(self) -> np.ndarray:
+        return self.segments.mean(axis=1)
+
+    @cached_property
+    def centered(self) -> np.ndarray:
+        return self.segments - self.mean[:, None]
+
+    @cached_property
+    def variance(self) -> np.ndarray:
+        return np.mean(self.centered**2, axis=1)
+
+    @cached_property
+    def rms(self) -> np.ndarray:
+        return np.sqrt(np.mean(self.segments**2, axis=1))
+
+    @cached_property
+    def peak(self) -> np.ndarray:
+        return np.max(np.abs(self.segments), axis=1)
+
+    @cached_property
+    def magnitude(self) -> np.ndarray:
+        """|rfft| de chaque segment, une seule FFT pour toutes les caractéristiques spectrales"""
+        return np.abs(sp_fft.rfft(self.segments, axis=1))
+
+    @cached_property
+    def frequencies(self) -> np.ndarray:
+        return np.fft.rfftfreq(self.segments.shape[1], 1 / self.fs)
+
+    def standardized_moment(self, order: int) -> np.ndarray:
+        variance = self.variance
+        safe = np.where(variance > 0, variance, 1.0)
+        return np.where(variance > 0, np.mean(self.centered**order, axis=1) / safe**(order / 2), 0.0)
+
+
+@dataclass(frozen=True)
+class Feature:
+    name: str
+    compute: Callable[[FeatureContext], np.ndarray]
+    description: str = ""
+
+
+FEATURES: Dict[str, Feature] = {}
+
+
+def register_feature(name: str, description: str = ""):
+    """Enregistre une caractéristique calculée sur un FeatureContext"""
+    def decorator(compute: Callable[[FeatureContext], np.ndarray]):
+        FEATURES[name] = Feature(name, compute, description)
+        return compute
+    return decorator
+
+
+@register_feature("rms", "Valeur efficace")
+def _rms(ctx: FeatureContext) -> np.ndarray:
+    return ctx.rms
+
+
+@register_feature("peak", "Amplitude crête")
+def _peak(ctx: FeatureContext) -> np.ndarray:
+    return ctx.peak
+
+
+@register_feature("crest_factor", "Facteur de crête (crête / RMS)")
+def _crest_factor(ctx: FeatureContext) -> np.ndarray:
+    return np.where(ctx.rms > 0, ctx.peak / np.where(ctx.rms > 0, ctx.rms, 1.0), 0.0)
+
+
+@register_feature("signal_mean", "Moyenne")
+def _mean(ctx: FeatureContext) -> np.ndarray:
+    return ctx.mean
+
+
+@register_feature("signal_std", "Écart-type")
+def _std(ctx: FeatureContext) -> np.ndarray:
+    return np.sqrt(ctx.variance)
+
+
+@register_feature("signal_skewness", "Asymétrie")
+def _skewness(ctx: FeatureContext) -> np.ndarray:
+    return ctx.standardized_moment(3)
+
+
+@register_feature("signal_kurtosis", "Kurtosis en excès")
+def _kurtosis(ctx: FeatureContext) -> np.ndarray:
+    return np.where(ctx.variance > 0, ctx.standardized_moment(4) - 3.0, 0.0)
+
+
+@register_feature("signal_max", "Maximum")
+def _max(ctx: FeatureContext) -> np.ndarray:
+    return ctx.segments.max(axis=1)
+
+
+@register_feature("signal_min", "Minimum")
+def _min(ctx: FeatureContext) -> np.ndarray:
+    return ctx.segments.min(axis=1)
+
+
+@register_feature("zero_crossing_rate", "Passages par zéro du signal centré, par échantillon")
+def _zero_crossing_rate(ctx: FeatureContext) -> np.ndarray:
+    signs = np.signbit(ctx.centered)
+    return np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+
+@register_feature("dominant_frequency", "Fréquence du maximum du spectre")
+def _dominant_frequency(ctx: FeatureContext) -> np.ndarray:
+    return ctx.frequencies[np.argmax(ctx.magnitude, axis=1)]
+
+
+@register_feature("spectral_centroid", "Centre de gravité du spectre d'amplitude")
+def _spectral_centroid(ctx: FeatureContext) -> np.ndarray:
+    total = ctx.magnitude.sum(axis=1)
+    return np.where(total > 0, ctx.magnitude @ ctx.frequencies / np.where(total > 0, total, 1.0), 0.0)
+
+
+def _band_energy(band_name: str) -> Callable[[FeatureContext], np.ndarray]:
+    def compute(ctx: FeatureContext) -> np.ndarray:
+        f_min, f_max = ctx.bands[band_name]
+        mask = (ctx.frequencies >= f_min) & (ctx.frequencies < f_max)
+        return ctx.magnitude[:, mask].sum(axis=1)
+    return compute
+
+
+class FeatureEngine:
+    """
+    Calcul des caractéristiques enregistrées sur des lots de segments.
+
+    Les énergies par bande (energy_<bande>_freq) dépendent des bandes du
+    moteur; seules les caractéristiques demandées sont évaluées.
+    """
+
+    def __init__(self, bands: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.bands = dict(bands or DEFAULT_BANDS)
+
+    def _resolve(self, bands: Dict[str, Tuple[float, float]]) -> Dict[str, Feature]:
+        features = dict(FEATURES)
+        for band_name, (f_min, f_max) in bands.items():
+            name = f"energy_{band_name}_freq"
+            features[name] = Feature(name, _band_energy(band_name), f"Énergie spectrale {f_min:g}-{f_max:g} Hz")
+        return features
+
+    def available(self, bands: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, str]:
+        """Caractéristiques disponibles et leur description"""
+        return {name: feature.description for name, feature in self._resolve(bands or self.bands).items()}
+
+    def validate(self, features: Optional[Iterable[str]],
+                 bands: Optional[Dict[str, Tuple[float, float]]] = None):
+        """Lève ValueError si une caractéristique demandée n'existe pas"""
+        registry = self._resolve(bands or self.bands)
+        unknown = [name for name in (features or []) if name not in registry]
+        if unknown:
+            raise ValueError(f"Caractéristiques inconnues: {', '.join(unknown)}")
+
+    def compute(self, segments: np.ndarray, fs: float, features: Optional[Iterable[str]] = None,
+                bands: Optional[Dict[str, Tuple[float, float]]] = None, dtype=None) -> Dict[str, np.ndarray]:
+        """
+        Caractéristiques d'un lot de segments en une passe
+
+        Args:
+            segments: Tableau (n_segments, n_samples)
+            fs: Fréquence d'échantillonnage en Hz
+            features: Noms demandés (None: toutes)
+            bands: Bandes {nom: (f_min, f_max)} des énergies (défaut: celles du moteur)
+            dtype: Précision des calculs (DSP_PRECISION par défaut)
+
+        Returns:
+            Dict {caractéristique: tableau (n_segments,)}
+        """
+        bands = bands or self.bands
+        self.validate(features, bands)
+        registry = self._resolve(bands)
+        names = list(registry) if features is None else list(features)
+
+        segments = np.atleast_2d(np.asarray(segments, dtype=float_dtype(dtype)))
+        ctx = FeatureContext(segments, fs, bands)
+        return {name: registry[name].compute(ctx) for name in names}
+
+    def compute_one(self, segment: np.ndarray, fs: float, features: Optional[Iterable[str]] = None,
+                    bands: Optional[Dict[str, Tuple[float, float]]] = None) -> Dict[str, float]:
+        """Caractéristiques d'un seul segment, en flottants Python"""
+        return {name: float(values[0]) for name, values in self.compute(segment, fs, features, bands).items()}
+
+
+def parse_feature_names(features: Optional[str]) -> Optional[List[str]]:
+    """Liste 'rms,crest_factor' d'un paramètre de requête (None: toutes)"""
+    if not features:
+        return None
+    return [name.strip() for name in features.split(",") if name.strip()]
+
+
+feature_engine = FeatureEngine()
@@ -0,0 +1,142 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from sqlalchemy import inspect
+from typing import Dict, List, Optional, Tuple
+from ..db.database import SessionLocal, engine
+from ..models.segment_features import SegmentFeatures, FeatureCheckpoint
+from .feature_engine import DATASET_SAMPLE_RATE, DEFAULT_BANDS
+from .signal_store import signal_store
+from .spectrogram_service import SpectrogramService
+
+# Mêmes bandes et fréquence que le moteur en ligne (dataset_service, dataset_real):
+# les colonnes energy_*_freq stockées sont comparables aux caractéristiques servies.
+# Cette fréquence est nominale (stockée comme nominal_sample_rate); celle du manifest
+# est gardée à côté (source_sample_rate)
+FEATURE_BANDS = DEFAULT_BANDS
+
+
+def compute_file_features(path: str, segments_per_file: int, sample_rate: float,
+                          bands: Dict[str, Tuple[float, float]]) -> Tuple[float, List[Dict]]:
+    """
+    Calcule les caractéristiques de tous les segments d'un fichier
+    (exécuté dans un processus du pool)
+    """
+    values = signal_store.load(path)
+    segment_size = len(values) // segments_per_file
+    if segment_size == 0:
+        raise ValueError(f"Fichier trop court: {path}")
+    
+    # Empiler les segments pour un calcul vectorisé en une passe
+    stacked = np.asarray(values[:segment_size * segments_per_file]).reshape(segments_per_file, segment_size)
+    features = SpectrogramService.extract_features_batch(stacked, sample_rate, bands)
+    
+    rows = []
+    for i in range(segments_per_file):
+        rows.append({
+            "segment_index": i,
+            "start_idx": i * segment_size,
+            "end_idx": (i + 1) * segment_size,
+            **{name: float(column[i]) for name, column in features.items()}
+        })
+    return signal_store.source_path(path).stat().st_mtime, rows
+
+
+class FeatureExtractionJob:
+    """
+    Job hors ligne: parcourt tous les fichiers/segments de la configuration du
+    dataset et écrit leurs caractéristiques dans la table segment_features.
+
+    Chaque fichier terminé est enregistré dans feature_checkpoints: un job
+    interrompu reprend là où il s'était arrêté.
+    """
+
+    def __init__(self, dataset_service, workers: Optional[int] = None,
+                 sample_rate: float = DATASET_SAMPLE_RATE, bands: Dict[str, Tuple[float, float]] = FEATURE_BANDS):
+        self.dataset_service = dataset_service
+        self.workers = workers
+        self.sample_rate = sample_rate
+        self.bands = bands
+        self.segments_per_file = dataset_service.config["simulation"]["segments_per_file"]
+        self._ensure_schema()
+        SegmentFeatures.__table__.create(bind=engine, checkfirst=True)
+        FeatureCheckpoint.__table__.create(bind=engine, checkfirst=True)
+
+    def _ensure_schema(self):
+        """Table dérivée, recalculable: recréée (avec ses checkpoints) si ses colonnes ont changé"""
+        inspector = inspect(engine)
+        if not inspector.has_table(SegmentFeatures.__tablename__):
+            return
+        existing = {column["name"] for column in inspector.get_columns(SegmentFeatures.__tablename__)}
+        if existing != {column.name for column in SegmentFeatures.__table__.columns}:
+            print("⚠️  Schéma de segment_features modifié: table recréée, caractéristiques à recalculer")
+            SegmentFeatures.__table__.drop(bind=engine)
+            FeatureCheckpoint.__table__.drop(bind=engine, checkfirst=True)
+
+    def pending_files(self, force: bool = False) -> List[Dict]:
+        """Fichiers sans checkpoint à jour"""
+        files = [f for f in self.dataset_service.iter_dataset_files()
+                 if signal_store.source_path(Path(f["path"])).exists()]
+        if force:
+            return files
+        
+        db = SessionLocal()
+        try:
+            done = {c.file_path: c.source_mtime for c in db.query(FeatureCheckpoint).all()}
+            # Segments calculés avec une autre fréquence nominale (donc d'autres bandes): à recalculer
+            stale = {path for (path,) in db.query(SegmentFeatures.file_path)
+                     .filter(SegmentFeatures.nominal_sample_rate != self.sample_rate).distinct()}
+        finally:
+            db.close()
+        return [f for f in files if f["path"] in stale
+                or done.get(f["path"]) != signal_store.source_path(Path(f["path"])).stat().st_mtime]
+
+    def _store(self, file_info: Dict, source_mtime: float, rows: List[Dict]):
+        """Remplace les caractéristiques d'un fichier et pose son checkpoint (une transaction)"""
+        db = SessionLocal()
+        try:
+            db.query(SegmentFeatures).filter(SegmentFeatures.file_path == file_info["path"]).delete()
+            for row in rows:
+                db.add(SegmentFeatures(
+                    file_path=file_info["path"],
+                    file_name=file_info["file_name"],
+                    network_type=file_info["network_type"],
+                    leak_class=file_info["leak_class"],
+                    flow_rate=file_info["flow_rate"],
+                    nominal_sample_rate=self.sample_rate,
+                    source_sample_rate=file_info.get("sample_rate"),
+                    **row
+                ))
+            checkpoint = db.query(FeatureCheckpoint).filter(FeatureCheckpoint.file_path == file_info["path"]).first()
+            if checkpoint is None:
+                checkpoint = FeatureCheckpoint(file_path=file_info["path"])
+                db.add(checkpoint)
+            checkpoint.source_mtime = source_mtime
+            checkpoint.segments = len(rows)
+            db.commit()
+        finally:
+            db.close()
+
+    def run(self, force: bool = False) -> Dict:
+        """Exécute le job sur un pool de processus; l'écriture en base reste dans ce processus"""
+        pending = self.pending_files(force)
+        print(f"🔄 {len(pending)} fichier(s) à traiter")
+        
+        stats = {"files": 0, "segments": 0, "errors": 0}
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(compute_file_features, f["path"], self.segments_per_file, self.sample_rate, self.bands): f
+                for f in pending
+            }
+            for future in as_completed(futures):
+                file_info = futures[future]
+                try:
+                    source_mtime, rows = future.result()
+                    self._store(file_info, source_mtime, rows)
+                    stats["files"] += 1
+                    stats["segments"] += len(rows)
+                    print(f"✅ {file_info['file_name']}: {len(rows)} segments")
+                except Exception as e:
+                    stats["errors"] += 1
+                    print(f"❌ {file_info['file_name']}: {e}")
+        return stats
@@ -0,0 +1,144 @@
+import os
+import time
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple, Type
+
+# Moteurs d'inférence interchangeables pour le modèle de détection de fuite.
+# Chaque moteur importe sa bibliothèque dans load(): seul le moteur configuré
+# (ML_BACKEND) est chargé. Modèles TFLite/ONNX produits par convert_model.py.
+
+
+class InferenceBackend(ABC):
+    """Interface commune: load() puis predict_on_batch(lot float32) -> sorties (n, n_classes)"""
+
+    name = "base"
+
+    def __init__(self, path: str, num_threads: int = 0):
+        self.path = path
+        self.num_threads = num_threads or None
+        self.import_seconds: Optional[float] = None
+
+    @property
+    @abstractmethod
+    def input_shape(self) -> Tuple:
+        """Forme d'entrée du modèle, lot en tête (None si dynamique)"""
+
+    @abstractmethod
+    def load(self):
+        """Importe la bibliothèque du moteur et charge le modèle"""
+
+    @abstractmethod
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        """Sorties (n, n_classes) d'un lot float32"""
+
+    def describe(self) -> Dict:
+        return {
+            "backend": self.name,
+            "path": self.path,
+            "size_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else None,
+        }
+
+
+class KerasBackend(InferenceBackend):
+    """Modèle .h5 complet via TensorFlow/Keras"""
+
+    name = "keras"
+
+    def load(self):
+        started = time.perf_counter()
+        from tensorflow import keras
+        self.import_seconds = time.perf_counter() - started
+        self.model = keras.models.load_model(self.path)
+
+    @property
+    def input_shape(self) -> Tuple:
+        return tuple(self.model.input_shape)
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_on_batch(batch))
+
+
+class TFLiteBackend(InferenceBackend):
+    """
+    Modèle .tflite (float ou int8) via tflite_runtime, ou tensorflow.lite à défaut
+
+    Les entrées/sorties quantifiées sont converties avec l'échelle et le
+    zéro du tenseur; le tenseur d'entrée est redimensionné à la taille du lot.
+    """
+
+    name = "tflite"
+
+    def load(self):
+        started = time.perf_counter()
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+            Interpreter = tf.lite.Interpreter
+        self.import_seconds = time.perf_counter() - started
+        self.interpreter = Interpreter(model_path=self.path, num_threads=self.num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = int(self._input["shape"][0])
+
+    @property
+    def input_shape(self) -> Tuple:
+        return (None, *self._input["shape"][1:])
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        if len(batch) != self._batch_size:
+            self.interpreter.resize_tensor_input(self._input["index"], [len(batch), *self._input["shape"][1:]])
+            self.interpreter.allocate_tensors()
+            self._input = self.interpreter.get_input_details()[0]
+            self._output = self.interpreter.get_output_details()[0]
+            self._batch_size = len(batch)
+
+        scale, zero_point = self._input["quantization"]
+        if scale:
+            info = np.iinfo(self._input["dtype"])
+            batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+        self.interpreter.set_tensor(self._input["index"], batch.astype(self._input["dtype"]))
+        self.interpreter.invoke()
+
+        output = self.interpreter.get_tensor(self._output["index"])
+        scale, zero_point = self._output["quantization"]
+        if scale:
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output.astype(np.float32)
+
+
+class OnnxBackend(InferenceBackend):
+    """Modèle .onnx (float ou QDQ int8) via ONNX Runtime sur CPU"""
+
+    name = "onnx"
+
+    def load(self):
+        started = time.perf_counter()
+        import onnxruntime as ort
+        self.import_seconds = time.perf_counter() - started
+        options = ort.SessionOptions()
+        if self.num_threads:
+            options.intra_op_num_threads = self.num_threads
+        self.session = ort.InferenceSession(self.path, options, providers=["CPUExecutionProvider"])
+        self._input = self.session.get_inputs()[0]
+
+    @property
+    def input_shape(self) -> Tuple:
+        return tuple(dim if isinstance(dim, int) else None for dim in self._input.shape)
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self._input.name: batch.astype(np.float32)})[0]
+
+
+BACKENDS: Dict[str, Type[InferenceBackend]] = {
+    backend.name: backend for backend in (KerasBackend, TFLiteBackend, OnnxBackend)
+}
+
+
+def create_backend(name: str, path: str, num_threads: int = 0) -> InferenceBackend:
+    """Moteur `name` (keras, tflite, onnx) pour le modèle `path`"""
+    if name not in BACKENDS:
+        raise ValueError(f"Moteur d'inférence inconnu: {name} (disponibles: {', '.join(BACKENDS)})")
+    return BACKENDS[name](path, num_threads)
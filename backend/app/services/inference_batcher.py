@@ -0,0 +1,122 @@
+import asyncio
+import time
+import numpy as np
+from collections import Counter, deque
+from typing import Callable, Dict, Optional
+from ..core.config import settings
+from .executors import BoundedExecutor, ExecutorBusy, inference_executor
+
+
+class MicroBatcher:
+    """
+    Regroupement des requêtes d'inférence concurrentes.
+
+    Les entrées (1, ...) arrivées pendant `max_wait_ms` après la première
+    (au plus `max_batch`) sont concaténées en un seul appel du modèle sur
+    l'exécuteur d'inférence; chaque requête reçoit sa ligne du résultat.
+    """
+
+    def __init__(self, name: str, predict: Callable[[np.ndarray], np.ndarray],
+                 max_batch: int = settings.INFERENCE_MAX_BATCH,
+                 max_wait_ms: float = settings.INFERENCE_BATCH_WAIT_MS,
+                 max_queue: Optional[int] = None,
+                 executor: BoundedExecutor = inference_executor):
+        self.name = name
+        self.predict = predict
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        # Par défaut: INFERENCE_QUEUE_SIZE lots pleins en attente
+        self.max_queue = max_queue or settings.INFERENCE_QUEUE_SIZE * max_batch
+        self.executor = executor
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._batch_sizes: Counter = Counter()
+        self._queue_delays = deque(maxlen=1000)
+        self._metrics = {"requests": 0, "batches": 0, "rejected": 0, "errors": 0, "forward_seconds": 0.0}
+
+    def _ensure_worker(self):
+        # Créés dans la boucle courante (au premier appel, pas à l'import)
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, model_input: np.ndarray) -> np.ndarray:
+        """Prédiction d'une entrée (1, ...) via le prochain lot; retourne sa sortie (1, ...)"""
+        self._ensure_worker()
+        if self._queue.qsize() >= self.max_queue:
+            self._metrics["rejected"] += 1
+            raise ExecutorBusy(f"{self.name}: {self._queue.qsize()} requêtes en attente, réessayer plus tard")
+
+        future = asyncio.get_running_loop().create_future()
+        self._metrics["requests"] += 1
+        await self._queue.put((model_input, future, time.perf_counter()))
+        # Pas de délai global ici: l'attente derrière les lots précédents est bornée par max_queue,
+        # et le délai de l'exécuteur (ExecutorTimeout) court à partir de l'envoi du lot
+        return await future
+
+    async def _collect(self) -> list:
+        batch = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch:
+            # Tout ce qui est déjà en file part sans attendre; sinon attendre jusqu'à l'échéance
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            started = time.perf_counter()
+            for _, _, enqueued in batch:
+                self._queue_delays.append(started - enqueued)
+            self._batch_sizes[len(batch)] += 1
+            self._metrics["batches"] += 1
+
+            try:
+                inputs = np.concatenate([model_input for model_input, _, _ in batch], axis=0)
+                outputs = np.asarray(await self.executor.run(self.predict, inputs))
+                self._metrics["forward_seconds"] += time.perf_counter() - started
+                offset = 0
+                for model_input, future, _ in batch:
+                    rows = len(model_input)
+                    if not future.done():
+                        future.set_result(outputs[offset:offset + rows])
+                    offset += rows
+            except Exception as e:
+                self._metrics["errors"] += 1
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def stats(self) -> Dict:
+        batches = self._metrics["batches"]
+        requests_batched = sum(size * count for size, count in self._batch_sizes.items())
+        delays = np.array(self._queue_delays) * 1000.0
+        return {
+            "name": self.name,
+            "max_batch": self.max_batch,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "queued": self._queue.qsize() if self._queue else 0,
+            **{name: value for name, value in self._metrics.items() if name != "forward_seconds"},
+            "mean_batch_size": requests_batched / batches if batches else 0.0,
+            "batch_fill": requests_batched / (batches * self.max_batch) if batches else 0.0,
+            "batch_sizes": dict(sorted(self._batch_sizes.items())),
+            "queue_delay_ms": {
+                "mean": float(delays.mean()) if len(delays) else 0.0,
+                "p95": float(np.percentile(delays, 95)) if len(delays) else 0.0,
+                "max": float(delays.max()) if len(delays) else 0.0,
+            },
+            "forward_ms_per_batch": self._metrics["forward_seconds"] * 1000.0 / batches if batches else 0.0,
+        }
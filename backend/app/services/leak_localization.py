@@ -0,0 +1,164 @@
+import numpy as np
+from dataclasses import dataclass
+from itertools import combinations
+from scipy import fft as sp_fft
+from typing import Dict, List, Optional, Sequence, Tuple
+from ..core.config import settings
+
+EARTH_RADIUS_M = 6371000.0
+
+
+@dataclass(frozen=True)
+class SensorSite:
+    """Position d'un capteur et matériau de la conduite sur laquelle il est posé"""
+    sensor_id: str
+    latitude: float
+    longitude: float
+    pipe_material: Optional[str] = None
+
+
+def haversine_m(a: SensorSite, b: SensorSite) -> float:
+    """Distance au sol entre deux capteurs en mètres"""
+    lat1, lon1, lat2, lon2 = map(np.radians, (a.latitude, a.longitude, b.latitude, b.longitude))
+    h = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return float(2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(h)))
+
+
+def wave_speed(material: Optional[str]) -> float:
+    """Vitesse de propagation du bruit de fuite dans la conduite (WAVE_SPEEDS, en m/s)"""
+    speeds = {name.lower(): speed for name, speed in settings.wave_speeds.items()}
+    return float(speeds.get((material or "").lower(), settings.DEFAULT_WAVE_SPEED))
+
+
+def gcc_phat(segments: np.ndarray, fs: float, pairs: Sequence[Tuple[int, int]],
+             max_lags: Optional[Sequence[int]] = None,
+             band: Optional[Tuple[Optional[float], Optional[float]]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retards GCC-PHAT de paires de segments synchronisés
+
+    Une seule rfft par capteur; chaque paire ne coûte qu'un produit
+    interspectral pondéré PHAT et une irfft, faites en lot.
+
+    Args:
+        segments: Tableau (n_capteurs, n_samples) aligné dans le temps
+        fs: Fréquence d'échantillonnage en Hz
+        pairs: Indices (i, j) des paires
+        max_lags: Retard maximal plausible par paire, en échantillons
+        band: Bande (f_min, f_max) retenue pour la corrélation
+
+    Returns:
+        (retards t_i - t_j en secondes, hauteur du pic de corrélation) par paire
+    """
+    segments = np.asarray(segments)
+    n_samples = segments.shape[1]
+    nfft = sp_fft.next_fast_len(2 * n_samples - 1, real=True)
+    centered = segments - segments.mean(axis=1, keepdims=True)
+    spectra = sp_fft.rfft(centered, n=nfft, axis=1, workers=-1)
+
+    first, second = (np.array(index, dtype=int) for index in zip(*pairs))
+    cross = spectra[first] * np.conj(spectra[second])
+    cross /= np.abs(cross) + 1e-12
+    if band is not None:
+        frequencies = sp_fft.rfftfreq(nfft, 1 / fs)
+        f_min, f_max = band
+        outside = np.zeros(len(frequencies), dtype=bool)
+        if f_min is not None:
+            outside |= frequencies < f_min
+        if f_max is not None:
+            outside |= frequencies > f_max
+        cross[:, outside] = 0
+    correlation = sp_fft.irfft(cross, n=nfft, axis=1, workers=-1)
+
+    # Retards -m..m (les retards négatifs sont en fin de tableau circulaire)
+    max_lags = np.full(len(pairs), n_samples - 1) if max_lags is None else np.minimum(max_lags, n_samples - 1)
+    m = int(max(max_lags))
+    lags = np.arange(-m, m + 1)
+    window = np.concatenate([correlation[:, nfft - m:], correlation[:, :m + 1]], axis=1) if m else correlation[:, :1]
+    window = np.where(np.abs(lags)[None, :] <= np.asarray(max_lags)[:, None], window, -np.inf)
+
+    best = np.argmax(window, axis=1)
+    rows = np.arange(len(pairs))
+    peaks = window[rows, best]
+
+    # Interpolation parabolique du pic: retard sous-échantillon
+    offsets = np.zeros(len(pairs))
+    inner = (best > 0) & (best < len(lags) - 1)
+    if np.any(inner):
+        left = window[rows[inner], best[inner] - 1]
+        right = window[rows[inner], best[inner] + 1]
+        centre = peaks[inner]
+        denominator = left - 2 * centre + right
+        valid = np.isfinite(denominator) & (denominator < 0)
+        offsets[inner] = np.where(valid, 0.5 * (left - right) / np.where(valid, denominator, -1.0), 0.0)
+
+    return (lags[best] + offsets) / fs, peaks
+
+
+def select_pairs(sites: Sequence[SensorSite], max_distance: float) -> List[Tuple[int, int, float]]:
+    """Paires de capteurs à moins de `max_distance` mètres (le bruit de fuite s'atténue vite)"""
+    pairs = []
+    for i, j in combinations(range(len(sites)), 2):
+        distance = haversine_m(sites[i], sites[j])
+        if 0 < distance <= max_distance:
+            pairs.append((i, j, distance))
+    return pairs
+
+
+def localize(segments: Dict[str, np.ndarray], fs: float, sites: Dict[str, SensorSite],
+             max_pair_distance: Optional[float] = None,
+             band: Optional[Tuple[Optional[float], Optional[float]]] = None) -> Dict:
+    """
+    Localisation de fuite sur chaque paire de capteurs voisins
+
+    Pour deux capteurs distants de D le long de la conduite (approchée par
+    la ligne droite) et un retard t_a - t_b = tau, la fuite est à
+    (D + c * tau) / 2 du capteur a, c étant la vitesse du matériau.
+
+    Args:
+        segments: {sensor_id: signal} acquis sur la même fenêtre de temps
+        fs: Fréquence d'échantillonnage en Hz
+        sites: {sensor_id: SensorSite}
+        max_pair_distance: Distance maximale d'une paire (LOCALIZATION_MAX_PAIR_DISTANCE)
+        band: Bande de fréquences de la corrélation
+
+    Returns:
+        Dict avec une estimation par paire
+    """
+    max_pair_distance = max_pair_distance or settings.LOCALIZATION_MAX_PAIR_DISTANCE
+    sensor_ids = [sensor_id for sensor_id in segments if sensor_id in sites]
+    ordered_sites = [sites[sensor_id] for sensor_id in sensor_ids]
+    pairs = select_pairs(ordered_sites, max_pair_distance)
+    if not pairs:
+        return {"sensors": len(sensor_ids), "fs": fs, "pairs": []}
+
+    # Fenêtre commune: les segments sont tronqués à la longueur la plus courte
+    n_samples = min(len(segments[sensor_id]) for sensor_id in sensor_ids)
+    stacked = np.stack([np.asarray(segments[sensor_id][:n_samples]) for sensor_id in sensor_ids])
+
+    speeds = [0.5 * (wave_speed(ordered_sites[i].pipe_material) + wave_speed(ordered_sites[j].pipe_material))
+              for i, j, _ in pairs]
+    # Retard physiquement possible: temps de parcours de la paire, plus une marge d'un échantillon
+    max_lags = [int(np.ceil(distance / speed * fs)) + 1 for (_, _, distance), speed in zip(pairs, speeds)]
+    delays, peaks = gcc_phat(stacked, fs, [(i, j) for i, j, _ in pairs], max_lags, band)
+
+    results = []
+    for (i, j, distance), speed, delay, peak in zip(pairs, speeds, delays, peaks):
+        site_a, site_b = ordered_sites[i], ordered_sites[j]
+        offset = 0.5 * (distance + speed * delay)
+        within = 0 <= offset <= distance
+        fraction = min(max(offset / distance, 0.0), 1.0)
+        results.append({
+            "sensor_a": site_a.sensor_id,
+            "sensor_b": site_b.sensor_id,
+            "distance_m": distance,
+            "wave_speed": speed,
+            "delay_seconds": float(delay),
+            "correlation_peak": float(peak),
+            "distance_from_a_m": float(min(max(offset, 0.0), distance)),
+            "within_pair": bool(within),
+            "latitude": site_a.latitude + fraction * (site_b.latitude - site_a.latitude),
+            "longitude": site_a.longitude + fraction * (site_b.longitude - site_a.longitude),
+        })
+    results.sort(key=lambda result: result["correlation_peak"], reverse=True)
+
+    return {"sensors": len(sensor_ids), "fs": fs, "n_samples": n_samples, "pairs": results}
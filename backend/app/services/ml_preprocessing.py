@@ -0,0 +1,68 @@
+import base64
+import numpy as np
+from typing import Dict
+from . import dsp
+from .dsp_plans import plan_cache
+from .spectrogram_renderer import spectrogram_renderer
+
+# Prétraitement de /api/ml/predict, sans dépendance au modèle: importable
+# par les processus du pool DSP sans charger TensorFlow.
+
+
+def calculate_vibration_signal(acc_x: np.ndarray, acc_y: np.ndarray, acc_z: np.ndarray) -> np.ndarray:
+    """Calcule le signal vibratoire"""
+    return np.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
+
+def create_spectrogram_224x224(vibration_signal: np.ndarray, sampling_rate: float) -> tuple:
+    """
+    Crée un spectrogramme 224x224 pour le modèle de deep learning
+    Retourne: (spectrogram_array, spectrogram_image_base64)
+    """
+    # Normaliser le signal
+    vibration_normalized = vibration_signal / (np.max(np.abs(vibration_signal)) + 1e-10)
+    
+    # Paramètres STFT
+    n_fft = min(512, len(vibration_normalized))
+    n_fft = 2 ** int(np.log2(n_fft))
+    hop_length = max(1, n_fft // 16)
+    plan = plan_cache.get(sampling_rate, n_fft, hop_length)
+    
+    # Calculer le spectrogramme
+    D = dsp.stft(vibration_normalized, n_fft=n_fft, hop_length=hop_length, window=plan.window)
+    S_db = dsp.amplitude_to_db(np.abs(D), ref=np.max)
+    
+    # Normaliser entre 0 et 255
+    S_normalized = ((S_db - S_db.min()) / (S_db.max() - S_db.min() + 1e-10) * 255).astype(np.uint8)
+    
+    # Redimensionner à 224x224 (OpenCV importé à la première prédiction seulement)
+    import cv2
+    S_resized = cv2.resize(S_normalized, (224, 224), interpolation=cv2.INTER_LINEAR)
+    
+    # Pour le modèle: garder en niveaux de gris (1 canal)
+    S_grayscale = np.expand_dims(S_resized, axis=-1)  # Shape: (224, 224, 1)
+    
+    # Pour l'affichage: table de couleurs jet du renderer, encodée en base64 pour le frontend
+    img_base64 = base64.b64encode(spectrogram_renderer.render_levels(S_resized, colormap="jet")).decode()
+    
+    return S_grayscale, img_base64
+
+def prepare_prediction_input(acc_x: np.ndarray, acc_y: np.ndarray, acc_z: np.ndarray,
+                             sampling_rate: float) -> Dict:
+    """
+    Prétraitement complet d'une requête de prédiction (exécuté dans le pool DSP)
+    Retourne l'entrée du modèle (1, 224, 224, 1), l'image et les statistiques du signal
+    """
+    vibration_signal = calculate_vibration_signal(acc_x, acc_y, acc_z)
+    spectrogram_grayscale, spectrogram_base64 = create_spectrogram_224x224(vibration_signal, sampling_rate)
+    
+    # Préparer l'input pour le modèle (normaliser entre 0 et 1)
+    model_input = spectrogram_grayscale.astype(np.float32) / 255.0
+    model_input = np.expand_dims(model_input, axis=0)  # Ajouter batch dimension -> (1, 224, 224, 1)
+    
+    return {
+        "model_input": model_input,
+        "spectrogram_base64": spectrogram_base64,
+        "signal_mean": float(np.mean(vibration_signal)),
+        "signal_max": float(np.max(vibration_signal)),
+        "signal_std": float(np.std(vibration_signal)),
+    }
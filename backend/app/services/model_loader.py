@@ -0,0 +1,101 @@
+import threading
+import time
+import numpy as np
+from datetime import datetime
+from typing import Dict, Optional
+from ..core.config import settings
+from .inference_backends import InferenceBackend, create_backend
+
+
+class ModelNotAvailable(Exception):
+    """Le modèle n'a pas pu être chargé"""
+
+
+class LazyModel:
+    """
+    Modèle chargé à la première utilisation, sur le moteur configuré.
+
+    La bibliothèque du moteur (TensorFlow, TFLite, ONNX Runtime) n'est
+    importée qu'au chargement: les workers qui ne servent pas /api/ml
+    démarrent sans elle. warm_up() charge le modèle et exécute une
+    inférence factice (graphe construit, noyaux initialisés) pour que la
+    première vraie requête ne paie pas ce coût.
+    """
+
+    def __init__(self, backend: str, path: str, num_threads: int = 0):
+        self.backend_name = backend
+        self.path = path
+        self.num_threads = num_threads
+        self._model: Optional[InferenceBackend] = None
+        self._lock = threading.Lock()
+        self.error: Optional[str] = None
+        self.warmed_up = False
+        self.timings: Dict[str, Optional[float]] = {"import_seconds": None, "load_seconds": None, "warmup_seconds": None}
+        self.loaded_at: Optional[datetime] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    def get(self) -> InferenceBackend:
+        """Moteur chargé (chargement au premier appel); lève ModelNotAvailable en cas d'échec"""
+        if self._model is not None:
+            return self._model
+        with self._lock:
+            if self._model is None:
+                if self.error is not None:
+                    raise ModelNotAvailable(self.error)
+                try:
+                    started = time.perf_counter()
+                    model = create_backend(self.backend_name, self.path, self.num_threads)
+                    model.load()
+                    self.timings["import_seconds"] = model.import_seconds
+                    self.timings["load_seconds"] = time.perf_counter() - started - (model.import_seconds or 0.0)
+                    self.loaded_at = datetime.now()
+                    self._model = model
+                    print(f"✅ Modèle chargé: {self.path} [{self.backend_name}] ({self.timings['load_seconds']:.2f}s)")
+                except Exception as e:
+                    # Pas de nouvel essai à chaque requête: le fichier ou la bibliothèque du moteur manque
+                    self.error = str(e)
+                    print(f"❌ Erreur chargement modèle: {e}")
+                    raise ModelNotAvailable(self.error)
+        return self._model
+
+    def warm_up(self):
+        """Charge le modèle et exécute une inférence factice sur une entrée nulle"""
+        model = self.get()
+        if self.warmed_up:
+            return
+        started = time.perf_counter()
+        input_shape = tuple(dim or 1 for dim in model.input_shape)
+        model.predict_on_batch(np.zeros(input_shape, dtype=np.float32))
+        self.timings["warmup_seconds"] = time.perf_counter() - started
+        self.warmed_up = True
+        print(f"🔥 Modèle prêt ({self.timings['warmup_seconds']:.2f}s de warm-up)")
+
+    def predict_on_batch(self, batch: np.ndarray) -> np.ndarray:
+        outputs = self.get().predict_on_batch(batch)
+        # Une vraie inférence réussie vaut warm-up (chargement paresseux sans warm-up au démarrage)
+        self.warmed_up = True
+        return outputs
+
+    def status(self) -> Dict:
+        if self.error is not None:
+            state = "error"
+        elif not self.loaded:
+            state = "not_loaded"
+        else:
+            state = "ready" if self.warmed_up else "loaded"
+        return {
+            "state": state,
+            "backend": self.backend_name,
+            "model_path": self.path,
+            "size_bytes": self._model.describe()["size_bytes"] if self._model else None,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "warmed_up": self.warmed_up,
+            "error": self.error,
+            **self.timings,
+        }
+
+
+leak_model = LazyModel(settings.ML_BACKEND, settings.ML_MODEL_PATH, settings.ML_INFERENCE_THREADS)
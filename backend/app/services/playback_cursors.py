@@ -0,0 +1,100 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict
+
+CURSORS_PATH = Path(__file__).parent.parent.parent / "dataset" / "cursors.json"
+
+DEFAULT_CURSOR = {
+    "current_file": None,
+    "current_segment": 0,
+    "leak_mode": False
+}
+
+
+class PlaybackCursors:
+    """
+    Curseurs de lecture par capteur (fichier, segment, mode fuite).
+
+    L'état vit en mémoire derrière un verrou par capteur et n'est écrit sur
+    disque que par un snapshot atomique périodique, hors du chemin des requêtes.
+    """
+
+    def __init__(self, snapshot_path: Path = CURSORS_PATH, interval_seconds: float = 5.0):
+        self.snapshot_path = snapshot_path
+        self.interval_seconds = interval_seconds
+        self._cursors: Dict[str, Dict] = self._load()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._dirty = False
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.snapshot_path, 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _ensure_snapshot_thread(self):
+        # Démarrage paresseux, un seul thread même si plusieurs requêtes mettent à jour en même temps
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                thread = threading.Thread(target=self._snapshot_loop, name="playback-cursors", daemon=True)
+                thread.start()
+                self._thread = thread
+
+    def _snapshot_loop(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.snapshot()
+
+    @contextmanager
+    def lock(self, sensor_id: str):
+        """Verrou exclusif sur le curseur d'un capteur"""
+        with self._locks_guard:
+            sensor_lock = self._locks.setdefault(str(sensor_id), threading.Lock())
+        with sensor_lock:
+            yield
+
+    def get(self, sensor_id: str) -> Dict:
+        """Copie du curseur d'un capteur"""
+        return {**DEFAULT_CURSOR, **self._cursors.get(str(sensor_id), {})}
+
+    def update(self, sensor_id: str, **fields):
+        """Met à jour le curseur en mémoire; l'écriture disque est différée"""
+        self._cursors[str(sensor_id)] = {**self.get(sensor_id), **fields}
+        self._dirty = True
+        self._ensure_snapshot_thread()
+
+    def snapshot(self):
+        """Écrit l'état courant sur disque (fichier temporaire puis os.replace)"""
+        with self._snapshot_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            state = {sensor_id: dict(cursor) for sensor_id, cursor in list(self._cursors.items())}
+            tmp_path = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+            try:
+                with open(tmp_path, 'w') as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                self._dirty = True
+                print(f"Erreur snapshot curseurs {self.snapshot_path}: {e}")
+
+    def close(self):
+        self._stop.set()
+        self.snapshot()
+
+
+# Instance globale partagée par toutes les instances de DatasetService
+playback_cursors = PlaybackCursors()
@@ -0,0 +1,391 @@
+import os
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+from ..core.config import settings
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet optionnel: repli sur CSV + sidecars
+    pa = None
+    pq = None
+
+# Suffixe des sidecars binaires écrits à côté des CSV
+SIDECAR_SUFFIX = ".f32.npy"
+
+# Format colonnaire préféré quand il est présent à côté du CSV
+COLUMNAR_SUFFIX = ".parquet"
+
+# Index d'offsets: position en octets d'une ligne de données sur ROW_INDEX_STRIDE
+ROW_INDEX_SUFFIX = ".rows.npz"
+ROW_INDEX_STRIDE = 1024
+
+
+def detect_value_column(df: pd.DataFrame) -> Optional[str]:
+    """Trouve la colonne de valeurs (priorité à 'Value', sinon dernière colonne numérique)"""
+    if 'Value' in df.columns:
+        return 'Value'
+    if 'value' in df.columns:
+        return 'value'
+    numeric_cols = df.select_dtypes(include=[np.number]).columns
+    if len(numeric_cols) == 0:
+        return None
+    # Prendre la dernière colonne numérique (pas Sample)
+    return numeric_cols[-1]
+
+
+def _is_newer(derived: Path, source: Path) -> bool:
+    """Vrai si le fichier dérivé existe et est plus récent que sa source"""
+    try:
+        return derived.stat().st_mtime >= source.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+
+def atomic_write(path: Path, write: Callable) -> None:
+    """Écrit via un fichier temporaire puis os.replace"""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+class SignalCache:
+    """
+    Cache LRU des signaux décodés, commun à tout le processus.
+
+    Clé (chemin, mtime), borné par un budget en octets. Seuls les signaux
+    décodés en mémoire (CSV, Parquet) comptent dans le budget: un sidecar
+    ouvert en mmap est gardé tel quel, ses pages restent gérées par l'OS.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[str, float], np.ndarray]" = OrderedDict()
+        self._keys_by_path: Dict[str, Tuple[str, float]] = {}
+        self._bytes = 0
+        self._mapped_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple[str, float]) -> Optional[np.ndarray]:
+        with self._lock:
+            values = self._entries.get(key)
+            if values is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return values
+
+    @staticmethod
+    def _resident_bytes(values: np.ndarray) -> int:
+        """Octets décomptés du budget (0 pour un mmap)"""
+        return 0 if isinstance(values, np.memmap) else values.nbytes
+
+    def put(self, key: Tuple[str, float], values: np.ndarray):
+        if self._resident_bytes(values) > self.max_bytes:
+            return
+        with self._lock:
+            # Une seule version par fichier: l'ancienne mtime est périmée
+            previous = self._keys_by_path.get(key[0])
+            if previous is not None:
+                self._remove(previous)
+            self._entries[key] = values
+            self._keys_by_path[key[0]] = key
+            self._add_bytes(values, 1)
+            # Seuls les signaux en mémoire sont évincés pour respecter le budget
+            resident = (k for k, v in list(self._entries.items()) if not isinstance(v, np.memmap))
+            while self._bytes > self.max_bytes:
+                self._remove(next(resident))
+                self.evictions += 1
+
+    def _add_bytes(self, values: np.ndarray, sign: int):
+        if isinstance(values, np.memmap):
+            self._mapped_bytes += sign * values.nbytes
+        else:
+            self._bytes += sign * values.nbytes
+
+    def _remove(self, key: Tuple[str, float]):
+        values = self._entries.pop(key, None)
+        if values is not None:
+            self._add_bytes(values, -1)
+            if self._keys_by_path.get(key[0]) == key:
+                del self._keys_by_path[key[0]]
+
+    def stats(self) -> Dict:
+        """Statistiques d'utilisation (taux de hit, occupation)"""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "mapped_entries": sum(isinstance(v, np.memmap) for v in self._entries.values()),
+                "mapped_bytes": self._mapped_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+class SignalStore:
+    """
+    Accès partagé aux signaux du dataset Accelerometer.
+
+    Les fichiers sont désignés par leur nom CSV logique; un Parquet du même
+    nom est prioritaire et seule la colonne de valeurs y est lue. Sinon, chaque CSV est converti une seule fois en sidecar .npy float32, ensuite
+    ouvert en mmap: un segment n'est plus qu'une tranche du tableau. Pour les
+    lectures ponctuelles sans sidecar, un index d'offsets permet de ne parser
+    que les lignes demandées. Les signaux décodés sont partagés via un cache LRU.
+    """
+
+    def __init__(self, cache_bytes: int = settings.SIGNAL_CACHE_BYTES):
+        self.cache = SignalCache(cache_bytes)
+        self._row_indexes: Dict[Path, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def sidecar_path(self, csv_path: Path) -> Path:
+        """Chemin du sidecar binaire associé à un CSV"""
+        csv_path = Path(csv_path)
+        return csv_path.with_suffix(SIDECAR_SUFFIX)
+
+    def row_index_path(self, csv_path: Path) -> Path:
+        """Chemin de l'index d'offsets associé à un CSV"""
+        return Path(csv_path).with_suffix(ROW_INDEX_SUFFIX)
+
+    def columnar_path(self, csv_path: Path) -> Path:
+        """Chemin du fichier Parquet associé à un CSV"""
+        return Path(csv_path).with_suffix(COLUMNAR_SUFFIX)
+
+    def has_columnar(self, csv_path: Path) -> bool:
+        """Vrai si un Parquet utilisable remplace le CSV (absent ou plus ancien)"""
+        if pq is None:
+            return False
+        parquet = self.columnar_path(csv_path)
+        if not parquet.exists():
+            return False
+        return not Path(csv_path).exists() or _is_newer(parquet, Path(csv_path))
+
+    def source_path(self, csv_path: Path) -> Path:
+        """Fichier effectivement lu pour un nom CSV logique"""
+        return self.columnar_path(csv_path) if self.has_columnar(csv_path) else Path(csv_path)
+
+    def is_fresh(self, csv_path: Path) -> bool:
+        """Vrai si le sidecar existe et est plus récent que le CSV"""
+        return _is_newer(self.sidecar_path(csv_path), Path(csv_path))
+
+    def _read_csv_values(self, csv_path: Path) -> np.ndarray:
+        df = pd.read_csv(csv_path)
+        if df.empty:
+            raise ValueError(f"Fichier vide: {csv_path}")
+        value_column = detect_value_column(df)
+        if value_column is None:
+            raise ValueError(f"Aucune colonne numérique dans {csv_path}")
+        return df[value_column].to_numpy(dtype=np.float32)
+
+    def _parquet_value_column(self, parquet: Path) -> str:
+        schema = pq.read_schema(parquet)
+        if 'Value' in schema.names:
+            return 'Value'
+        if 'value' in schema.names:
+            return 'value'
+        numeric_cols = [field.name for field in schema
+                        if pa.types.is_integer(field.type) or pa.types.is_floating(field.type)]
+        if not numeric_cols:
+            raise ValueError(f"Aucune colonne numérique dans {parquet}")
+        return numeric_cols[-1]
+
+    def _read_parquet_values(self, parquet: Path) -> np.ndarray:
+        # Projection: seule la colonne de valeurs est lue
+        table = pq.read_table(parquet, columns=[self._parquet_value_column(parquet)])
+        if table.num_rows == 0:
+            raise ValueError(f"Fichier vide: {parquet}")
+        return table.column(0).to_numpy().astype(np.float32, copy=False)
+
+    def convert_columnar(self, csv_path: Path) -> Path:
+        """Convertit un CSV en Parquet, colonne de valeurs en float32 (écriture atomique)"""
+        if pq is None:
+            raise RuntimeError("pyarrow n'est pas installé")
+        csv_path = Path(csv_path)
+        df = pd.read_csv(csv_path)
+        value_column = detect_value_column(df)
+        if value_column is None:
+            raise ValueError(f"Aucune colonne numérique dans {csv_path}")
+        df[value_column] = df[value_column].astype(np.float32)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        parquet = self.columnar_path(csv_path)
+        atomic_write(parquet, lambda f: pq.write_table(table, f))
+        return parquet
+
+    def convert(self, csv_path: Path) -> Path:
+        """Convertit un CSV en sidecar float32 (écriture atomique)"""
+        csv_path = Path(csv_path)
+        values = self._read_csv_values(csv_path)
+        sidecar = self.sidecar_path(csv_path)
+        atomic_write(sidecar, lambda f: np.save(f, values))
+        return sidecar
+
+    def _cache_key(self, csv_path: Path) -> Tuple[str, float]:
+        return (str(csv_path), self.source_path(csv_path).stat().st_mtime)
+
+    def _decode(self, csv_path: Path) -> np.ndarray:
+        if self.has_columnar(csv_path):
+            return self._read_parquet_values(self.columnar_path(csv_path))
+        if not self.is_fresh(csv_path):
+            try:
+                self.convert(csv_path)
+            except OSError as e:
+                print(f"Sidecar impossible pour {csv_path}: {e}")
+                return self._read_csv_values(csv_path)
+        return np.load(self.sidecar_path(csv_path), mmap_mode='r')
+
+    def load(self, csv_path: Path) -> np.ndarray:
+        """
+        Retourne le signal complet d'un CSV sous forme de tableau float32 en lecture seule
+
+        Le sidecar est créé au premier accès; si le dossier n'est pas
+        inscriptible, le CSV est lu directement en mémoire. Le sidecar est
+        servi en mmap (sans copie); le signal est gardé dans le cache partagé,
+        le budget ne portant que sur les décodages CSV/Parquet.
+        """
+        csv_path = Path(csv_path)
+        key = self._cache_key(csv_path)
+        values = self.cache.get(key)
+        if values is not None:
+            return values
+
+        values = self._decode(csv_path)
+        values.setflags(write=False)
+        self.cache.put(key, values)
+        return values
+
+    def build_row_index(self, csv_path: Path) -> Dict:
+        """Parcourt le CSV une fois et enregistre les offsets de lignes à côté du fichier"""
+        csv_path = Path(csv_path)
+        header = pd.read_csv(csv_path, nrows=5)
+        value_column = detect_value_column(header)
+        if value_column is None:
+            raise ValueError(f"Aucune colonne numérique dans {csv_path}")
+
+        size = csv_path.stat().st_size
+        offsets = []
+        line_starts = 0
+        position = 0
+        last_byte = b""
+        with open(csv_path, 'rb') as f:
+            while True:
+                chunk = f.read(1 << 22)
+                if not chunk:
+                    break
+                starts = position + np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == 10) + 1
+                # La ligne commençant en starts[i] est la ligne de données n° line_starts + i
+                rows = line_starts + np.arange(len(starts))
+                offsets.append(starts[rows % ROW_INDEX_STRIDE == 0])
+                line_starts += len(starts)
+                position += len(chunk)
+                last_byte = chunk[-1:]
+
+        row_count = line_starts - (1 if last_byte == b"\n" else 0)
+        offsets = np.concatenate(offsets) if offsets else np.zeros(0, dtype=np.int64)
+        index = {
+            "offsets": offsets[offsets < size].astype(np.int64),
+            "row_count": np.int64(max(0, row_count)),
+            "stride": np.int64(ROW_INDEX_STRIDE),
+            "columns": np.array([str(c) for c in header.columns]),
+            "value_column": np.array(str(value_column)),
+        }
+        try:
+            atomic_write(self.row_index_path(csv_path), lambda f: np.savez(f, **index))
+        except OSError as e:
+            print(f"Index d'offsets non persisté pour {csv_path}: {e}")
+        return index
+
+    def row_index(self, csv_path: Path) -> Dict:
+        """Index d'offsets d'un CSV (mémoire, puis disque, sinon construit)"""
+        csv_path = Path(csv_path)
+        mtime = csv_path.stat().st_mtime
+        with self._lock:
+            cached = self._row_indexes.get(csv_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        index_path = self.row_index_path(csv_path)
+        if _is_newer(index_path, csv_path):
+            with np.load(index_path) as stored:
+                index = {key: stored[key] for key in stored.files}
+        else:
+            index = self.build_row_index(csv_path)
+        with self._lock:
+            self._row_indexes[csv_path] = (mtime, index)
+        return index
+
+    def value_column(self, csv_path: Path) -> Optional[str]:
+        """Nom de la colonne de valeurs d'un fichier"""
+        if self.has_columnar(csv_path):
+            return self._parquet_value_column(self.columnar_path(csv_path))
+        return detect_value_column(pd.read_csv(csv_path, nrows=5))
+
+    def row_count(self, csv_path: Path) -> int:
+        """Nombre d'échantillons d'un fichier, sans le parser"""
+        if self.has_columnar(csv_path):
+            return int(pq.ParquetFile(self.columnar_path(csv_path)).metadata.num_rows)
+        if self.is_fresh(csv_path):
+            return int(np.load(self.sidecar_path(csv_path), mmap_mode='r').shape[0])
+        return int(self.row_index(csv_path)["row_count"])
+
+    def read_rows(self, csv_path: Path, start: int, stop: int) -> np.ndarray:
+        """Parse uniquement les lignes [start, stop) du CSV grâce à l'index d'offsets"""
+        index = self.row_index(csv_path)
+        start = max(0, start)
+        stop = min(stop, int(index["row_count"]))
+        if stop <= start:
+            return np.zeros(0, dtype=np.float32)
+
+        stride = int(index["stride"])
+        block = start // stride
+        columns = [str(c) for c in index["columns"]]
+        value_column = str(index["value_column"])
+        with open(csv_path, 'rb') as f:
+            f.seek(int(index["offsets"][block]))
+            df = pd.read_csv(
+                f,
+                header=None,
+                names=columns,
+                usecols=[value_column],
+                skiprows=start - block * stride,
+                nrows=stop - start,
+            )
+        return df[value_column].to_numpy(dtype=np.float32)
+
+    def read_segment(self, csv_path: Path, start: int, stop: int) -> np.ndarray:
+        """
+        Retourne les échantillons [start, stop) d'un fichier
+
+        Tranche du signal en cache, du Parquet ou du sidecar en mmap, sinon
+        lecture ciblée via l'index d'offsets: le coût ne dépend pas de la longueur du fichier.
+        """
+        csv_path = Path(csv_path)
+        values = self.cache.get(self._cache_key(csv_path))
+        if values is not None:
+            return values[start:stop]
+        if self.has_columnar(csv_path):
+            return self.load(csv_path)[start:stop]
+        if self.is_fresh(csv_path):
+            return np.load(self.sidecar_path(csv_path), mmap_mode='r')[start:stop]
+        return self.read_rows(csv_path, start, stop)
+
+
+# Instance globale partagée par DatasetService, SignalStream et dataset_real
+signal_store = SignalStore()
@@ -1,75 +1,129 @@
 import random
+import time
 import numpy as np
-import pandas as pd
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 from scipy import signal as scipy_signal
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from .signal_store import signal_store
+from .dataset_manifest import manifest_for_root
+from .dsp_plans import decimation_filter
 
 @dataclass
 class Segment:
-    samples: np.ndarray
+    """
+    Fenêtre du flux: `values` est une vue en lecture seule sur le signal
+    chargé (ou sur le buffer de fenêtre réutilisé), valide jusqu'au
+    prochain appel de next_segment. Les index et fs sont ceux du signal
+    décimé; index source = index * decimation.
+    """
     values: np.ndarray
     fs: float
     file_path: Path
     start_idx: int
     end_idx: int
+    decimation: int = 1
+
+    @property
+    def samples(self) -> np.ndarray:
+        """Axe temporel calculé à la demande depuis l'index et fs"""
+        return (self.start_idx + np.arange(len(self.values))) / self.fs
 
 class SignalStream:
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, decimation: int = 1, passband: float = 4000.0):
         self.data_dir = data_dir
         self.files = self._discover_files()
-        self.current_df: Optional[pd.DataFrame] = None
+        self.signal_values: Optional[np.ndarray] = None
         self.current_file: Optional[Path] = None
-        self.fs: float = 51200.0
+        self.source_fs: float = 51200.0
+        
+        # Décimation polyphase anti-repliement: seule la bande [0, passband] est exploitée
+        self.decimation = decimation
+        self.fs: float = self.source_fs / decimation
+        self._decimation_taps = decimation_filter(decimation, self.source_fs, passband) if decimation > 1 else None
         self.segment_seconds = 0.2  # Réduire à 0.2 seconde
         self.segment_overlap = 0.5
         self.window_samples = int(self.segment_seconds * self.fs)
         self.hop_samples = max(1, int(self.window_samples * (1.0 - self.segment_overlap)))
         self.current_index = 0
+        
+        # Buffer de fenêtre préalloué, utilisé seulement pour le padding
+        self._window_buffer = np.zeros(self.window_samples, dtype=np.float32)
+        
+        # Double buffer: le fichier suivant est choisi et décodé en tâche de fond
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signal-prefetch")
+        self._prefetch: Optional[Future] = None
+        self._metrics = {
+            "prefetch_hits": 0,
+            "prefetch_misses": 0,
+            "stall_seconds_total": 0.0,
+            "last_stall_seconds": 0.0,
+            "max_stall_seconds": 0.0,
+        }
         self._select_new_file()
 
     def _discover_files(self) -> List[Path]:
-        files = []
-        for csv_file in self.data_dir.rglob("*.csv"):
-            if "Accelerometer/Branched" in str(csv_file.parent):
-                files.append(csv_file)
-        return files
+        return manifest_for_root(self.data_dir).paths(network_type="branched")
 
-    def _select_new_file(self):
+    def _load_random_file(self) -> Tuple[Path, np.ndarray]:
+        """Choisit un fichier au hasard, le décode via le cache partagé et le décime"""
         if not self.files:
             raise FileNotFoundError(f"Aucun fichier CSV trouvé sous {self.data_dir}")
         
-        self.current_file = random.choice(self.files)
-        df = pd.read_csv(self.current_file)
-        
-        if df.empty:
-            self._select_new_file()
-            return
-            
-        self.current_df = df
+        candidates = random.sample(self.files, len(self.files))
+        for file_path in candidates:
+            try:
+                values = signal_store.load(file_path)
+            except ValueError:
+                # Fichier vide ou sans colonne numérique
+                continue
+            if len(values) == 0:
+                continue
+            if self._decimation_taps is not None:
+                values = scipy_signal.resample_poly(values, 1, self.decimation,
+                                                    window=self._decimation_taps).astype(np.float32)
+                values.setflags(write=False)
+            return file_path, values
         
-        # Trouver la colonne de valeurs (priorité à 'Value')
-        if 'Value' in df.columns:
-            self.value_column = 'Value'
-        elif 'value' in df.columns:
-            self.value_column = 'value'
+        raise FileNotFoundError(f"Aucun fichier exploitable sous {self.data_dir}")
+
+    def _schedule_prefetch(self):
+        self._prefetch = self._prefetch_executor.submit(self._load_random_file)
+
+    def _select_new_file(self):
+        prefetch = self._prefetch
+        if prefetch is None:
+            loaded = self._load_random_file()
         else:
-            numeric_cols = df.select_dtypes(include=[np.number]).columns
-            if len(numeric_cols) == 0:
-                self._select_new_file()
-                return
-            # Prendre la dernière colonne numérique (pas Sample)
-            self.value_column = numeric_cols[-1]
-        self.signal_values = df[self.value_column].astype(float).to_numpy()
-        
-        # Créer les échantillons temporels
-        self.time_values = np.arange(len(self.signal_values)) / self.fs
+            hit = prefetch.done()
+            self._metrics["prefetch_hits" if hit else "prefetch_misses"] += 1
+            started = time.perf_counter()
+            try:
+                loaded = prefetch.result()
+            except Exception as e:
+                print(f"Erreur prefetch signal: {e}")
+                loaded = self._load_random_file()
+            stall = 0.0 if hit else time.perf_counter() - started
+            self._metrics["last_stall_seconds"] = stall
+            self._metrics["stall_seconds_total"] += stall
+            self._metrics["max_stall_seconds"] = max(self._metrics["max_stall_seconds"], stall)
         
+        # Simple échange de références, puis préparation du fichier suivant
+        self.current_file, self.signal_values = loaded
         self.current_index = 0
+        self._schedule_prefetch()
+
+    def metrics(self) -> Dict:
+        """Statistiques du prefetch (hits/misses et temps de blocage)"""
+        return {
+            **self._metrics,
+            "prefetch_ready": self._prefetch is not None and self._prefetch.done(),
+            "current_file": str(self.current_file.name) if self.current_file else None,
+        }
 
     def next_segment(self) -> Segment:
-        if self.current_df is None or self.current_index + self.window_samples >= len(self.signal_values):
+        if self.signal_values is None or self.current_index + self.window_samples >= len(self.signal_values):
             self._select_new_file()
 
         start = self.current_index
@@ -77,17 +131,19 @@ class SignalStream:
         window = self.signal_values[start:end]
 
         if len(window) < self.window_samples:
-            pad = np.zeros(self.window_samples - len(window))
-            window = np.concatenate([window, pad])
+            buffer = self._window_buffer
+            buffer[:len(window)] = window
+            buffer[len(window):] = 0.0
+            window = buffer.view()
+            window.setflags(write=False)
 
-        samples = self.time_values[start:start + len(window)]
         self.current_index += self.hop_samples
 
         return Segment(
-            samples=samples.copy(),
-            values=window.copy(),
+            values=window,
             fs=self.fs,
             file_path=self.current_file,
             start_idx=start,
-            end_idx=end
-        )
\ No newline at end of file
+            end_idx=end,
+            decimation=self.decimation
+        )
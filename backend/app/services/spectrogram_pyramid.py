@@ -0,0 +1,208 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from ..core.config import settings
+
+TILE_FRAMES = 256  # Colonnes (trames) par tuile
+TILE_BINS = 64  # Bins de fréquence par tuile
+
+
+def _pair_mean(values: np.ndarray, axis: int) -> np.ndarray:
+    """Moyenne des paires consécutives le long d'un axe (le dernier élément impair est gardé seul)"""
+    if values.shape[axis] % 2:
+        last = np.take(values, [-1], axis=axis)
+        values = np.concatenate([values, last], axis=axis)
+    shape = list(values.shape)
+    shape[axis:axis + 1] = [shape[axis] // 2, 2]
+    return values.reshape(shape).mean(axis=axis + 1)
+
+
+class _Level:
+    """Tuiles d'un niveau de zoom: colonnes (n_bins, TILE_FRAMES) en dB, NaN tant que non remplies"""
+
+    def __init__(self, frequencies: np.ndarray, max_tiles: int):
+        self.frequencies = frequencies
+        self.max_tiles = max_tiles
+        self.tiles: "OrderedDict[int, np.ndarray]" = OrderedDict()
+        self.n_columns = 0
+        self.carry: Optional[np.ndarray] = None  # Colonne (puissance) en attente de sa paire
+
+    def write(self, columns_db: np.ndarray):
+        position = 0
+        while position < columns_db.shape[1]:
+            x, offset = divmod(self.n_columns, TILE_FRAMES)
+            tile = self.tiles.get(x)
+            if tile is None:
+                tile = np.full((len(self.frequencies), TILE_FRAMES), np.nan, dtype=np.float32)
+                self.tiles[x] = tile
+                # Rétention bornée: les tuiles les plus anciennes sont oubliées
+                while len(self.tiles) > self.max_tiles:
+                    self.tiles.popitem(last=False)
+            count = min(TILE_FRAMES - offset, columns_db.shape[1] - position)
+            tile[:, offset:offset + count] = columns_db[:, position:position + count]
+            position += count
+            self.n_columns += count
+
+
+class SensorPyramid:
+    """
+    Pyramide de tuiles de la chronologie d'un capteur.
+
+    Le niveau 0 garde les trames STFT telles quelles; chaque niveau
+    suivant moyenne (en puissance) les paires de colonnes du précédent et,
+    tant qu'il y a plus de TILE_BINS bins, les paires de fréquences. Les
+    segments sont ajoutés bout à bout: seules les nouvelles colonnes sont
+    réduites, jamais la STFT de la plage entière.
+    """
+
+    def __init__(self, frequencies: np.ndarray, frame_seconds: float, n_levels: int, max_tiles: int):
+        self.frame_seconds = frame_seconds
+        self.started_at = datetime.utcnow()
+        self.n_segments = 0
+        self.db_range: Optional[Tuple[float, float]] = None
+        self.levels: List[_Level] = []
+        frequencies = np.asarray(frequencies, dtype=np.float64)
+        self.n_bins = len(frequencies)
+        # Bins gardés: multiple de TILE_BINS (le bin de Nyquist d'une FFT paire est écarté)
+        self.kept_bins = len(frequencies) if len(frequencies) <= TILE_BINS else len(frequencies) // TILE_BINS * TILE_BINS
+        frequencies = frequencies[:self.kept_bins]
+        for _ in range(n_levels):
+            self.levels.append(_Level(frequencies, max_tiles))
+            if len(frequencies) > TILE_BINS:
+                frequencies = _pair_mean(frequencies, axis=0)
+
+    def append(self, columns_db: np.ndarray):
+        """Ajoute les colonnes (n_bins, n) en dB d'un nouveau segment"""
+        incoming = columns_db[:self.kept_bins]
+        finite = incoming[np.isfinite(incoming)]
+        if finite.size:
+            # Échelle de couleurs par défaut: percentiles 1-99 arrondis à 10 dB
+            low, high = np.percentile(finite, [1, 99])
+            low, high = 10 * np.floor(low / 10), 10 * np.ceil(high / 10)
+            if self.db_range is not None:
+                low, high = min(low, self.db_range[0]), max(high, self.db_range[1])
+            self.db_range = (float(low), float(high))
+
+        for index, level in enumerate(self.levels):
+            level.write(incoming)
+            if index + 1 == len(self.levels):
+                break
+
+            power = np.power(10.0, incoming / 10.0)
+            if level.carry is not None:
+                power = np.concatenate([level.carry, power], axis=1)
+            n_pairs = power.shape[1] // 2
+            level.carry = power[:, 2 * n_pairs:] if power.shape[1] % 2 else None
+            if n_pairs == 0:
+                break
+
+            reduced = power[:, :2 * n_pairs].reshape(power.shape[0], n_pairs, 2).mean(axis=2)
+            if len(self.levels[index + 1].frequencies) < power.shape[0]:
+                reduced = _pair_mean(reduced, axis=0)
+            incoming = (10 * np.log10(reduced)).astype(np.float32)
+        self.n_segments += 1
+
+    def tile(self, level: int, x: int, y: int) -> Optional[Tuple[np.ndarray, Dict]]:
+        if not 0 <= level < len(self.levels):
+            return None
+        zoom = self.levels[level]
+        tile = zoom.tiles.get(x)
+        n_y = -(-len(zoom.frequencies) // TILE_BINS)
+        if tile is None or not 0 <= y < n_y:
+            return None
+
+        rows = slice(y * TILE_BINS, (y + 1) * TILE_BINS)
+        frequencies = zoom.frequencies[rows]
+        column_seconds = self.frame_seconds * 2 ** level
+        filled = min(TILE_FRAMES, zoom.n_columns - x * TILE_FRAMES)
+        info = {
+            "level": level,
+            "x": x,
+            "y": y,
+            "filled_columns": filled,
+            "column_seconds": column_seconds,
+            "time_range": [x * TILE_FRAMES * column_seconds, (x + 1) * TILE_FRAMES * column_seconds],
+            "frequency_range": [float(frequencies[0]), float(frequencies[-1])],
+        }
+        return tile[rows].copy(), info
+
+    def describe(self) -> Dict:
+        levels = []
+        for index, zoom in enumerate(self.levels):
+            column_seconds = self.frame_seconds * 2 ** index
+            levels.append({
+                "level": index,
+                "columns": zoom.n_columns,
+                "column_seconds": column_seconds,
+                "tile_seconds": TILE_FRAMES * column_seconds,
+                "bins": len(zoom.frequencies),
+                "tiles_x": [min(zoom.tiles), max(zoom.tiles)] if zoom.tiles else None,
+                "tiles_y": -(-len(zoom.frequencies) // TILE_BINS),
+            })
+        return {
+            "started_at": self.started_at.isoformat(),
+            "segments": self.n_segments,
+            "duration_seconds": self.levels[0].n_columns * self.frame_seconds,
+            "frequency_range": [float(self.levels[0].frequencies[0]), float(self.levels[0].frequencies[-1])],
+            "db_range": self.db_range,
+            "tile_size": [TILE_FRAMES, TILE_BINS],
+            "levels": levels,
+        }
+
+
+class SpectrogramPyramidService:
+    """Pyramides par capteur, alimentées par le seul tick de monitoring (un segment par capteur et par tick)"""
+
+    def __init__(self, n_levels: int = settings.PYRAMID_LEVELS, max_tiles: int = settings.PYRAMID_MAX_TILES):
+        self.n_levels = n_levels
+        self.max_tiles = max_tiles
+        self._pyramids: Dict[str, SensorPyramid] = {}
+        self._lock = threading.Lock()
+
+    def append(self, sensor_id: str, spectrogram: Dict) -> bool:
+        """
+        Ajoute le spectrogramme d'un segment à la chronologie du capteur
+
+        `spectrogram` est au format de SpectrogramService.generate_spectrogram.
+        Retourne False si sa résolution ne correspond pas à la pyramide.
+        """
+        matrix = np.asarray(spectrogram["spectrogram"], dtype=np.float32)
+        frequencies = spectrogram["frequencies"]
+        frame_seconds = float(spectrogram.get("time_resolution") or 0)
+        if matrix.ndim != 2 or matrix.shape[1] == 0 or frame_seconds <= 0:
+            return False
+
+        with self._lock:
+            pyramid = self._pyramids.get(str(sensor_id))
+            if pyramid is None:
+                pyramid = SensorPyramid(frequencies, frame_seconds, self.n_levels, self.max_tiles)
+                self._pyramids[str(sensor_id)] = pyramid
+            elif pyramid.n_bins != matrix.shape[0] or not np.isclose(pyramid.frame_seconds, frame_seconds):
+                print(f"Spectrogramme incompatible avec la pyramide du capteur {sensor_id}: "
+                      f"{matrix.shape[0]} bins, trame {frame_seconds:g}s")
+                return False
+            pyramid.append(matrix)
+        return True
+
+    def tile(self, sensor_id: str, level: int, x: int, y: int) -> Optional[Tuple[np.ndarray, Dict]]:
+        """Tuile (TILE_BINS, TILE_FRAMES) en dB (fréquences croissantes) et ses métadonnées"""
+        with self._lock:
+            pyramid = self._pyramids.get(str(sensor_id))
+            if pyramid is None:
+                return None
+            found = pyramid.tile(level, x, y)
+            if found is None:
+                return None
+            matrix, info = found
+            info["db_range"] = pyramid.db_range
+            return matrix, info
+
+    def describe(self, sensor_id: str) -> Optional[Dict]:
+        with self._lock:
+            pyramid = self._pyramids.get(str(sensor_id))
+            return pyramid.describe() if pyramid else None
+
+
+spectrogram_pyramid = SpectrogramPyramidService()
@@ -0,0 +1,161 @@
+import threading
+import numpy as np
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image, ImageDraw
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+# Points d'ancrage RGB de viridis (17 points équidistants, interpolés à 256 niveaux)
+_VIRIDIS_ANCHORS = [
+    (68, 1, 84), (72, 24, 106), (71, 45, 123), (66, 64, 134), (59, 82, 139), (51, 99, 141),
+    (44, 114, 142), (38, 130, 142), (33, 145, 140), (31, 160, 136), (40, 174, 128), (63, 188, 115),
+    (94, 201, 98), (132, 212, 75), (173, 220, 48), (216, 226, 25), (253, 231, 37),
+]
+
+
+
+def _viridis_lut() -> np.ndarray:
+    anchors = np.array(_VIRIDIS_ANCHORS, dtype=np.float64)
+    positions = np.linspace(0.0, 1.0, len(anchors))
+    levels = np.arange(256) / 255.0
+    return np.stack([np.interp(levels, positions, anchors[:, c]) for c in range(3)], axis=1).round().astype(np.uint8)
+
+
+def _jet_lut() -> np.ndarray:
+    # Rampes de jet au centre de chaque niveau: écart <= 2/255 avec cv2.COLORMAP_JET
+    levels = (np.arange(256) + 0.5) / 256.0
+    channels = [np.clip(1.5 - np.abs(4.0 * levels - center), 0.0, 1.0) for center in (3.0, 2.0, 1.0)]
+    return (np.stack(channels, axis=1) * 255.0).round().astype(np.uint8)
+
+
+COLORMAPS: Dict[str, np.ndarray] = {
+    "viridis": _viridis_lut(),
+    "jet": _jet_lut(),
+    "gray": np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1),
+}
+
+
+def to_uint8(matrix: np.ndarray, vmin: Optional[float] = None, vmax: Optional[float] = None) -> np.ndarray:
+    """Normalise une matrice (dB) sur [vmin, vmax] en niveaux 0-255"""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    vmin = float(matrix.min()) if vmin is None else vmin
+    vmax = float(matrix.max()) if vmax is None else vmax
+    if vmax - vmin < 1e-6:
+        return np.zeros(matrix.shape, dtype=np.uint8)
+    return ((matrix - vmin) * (255.0 / (vmax - vmin))).clip(0, 255).astype(np.uint8)
+
+
+def apply_colormap(levels: np.ndarray, colormap: str = "viridis") -> np.ndarray:
+    """Niveaux uint8 (H, W) -> image RGB (H, W, 3) par table de correspondance"""
+    return COLORMAPS[colormap][levels]
+
+
+def encode_image(rgb: np.ndarray, fmt: str = "png") -> bytes:
+    """Encode une image RGB en PNG (compression rapide) ou WebP sans perte"""
+    buffer = BytesIO()
+    image = Image.fromarray(rgb)
+    if fmt == "webp":
+        image.save(buffer, format="WEBP", lossless=True, method=0)
+    elif fmt == "png":
+        image.save(buffer, format="PNG", compress_level=1)
+    else:
+        raise ValueError(f"Format d'image non supporté: {fmt}")
+    return buffer.getvalue()
+
+
+def _draw_axes(image: Image.Image, frequencies: Sequence[float], times: Sequence[float]) -> Image.Image:
+    """Ajoute une marge avec graduations fréquence (Hz, à gauche) et temps (s, en bas)"""
+    margin_left, margin_bottom = 48, 18
+    width, height = image.size
+    canvas = Image.new("RGB", (width + margin_left, height + margin_bottom), "white")
+    canvas.paste(image, (margin_left, 0))
+    draw = ImageDraw.Draw(canvas)
+
+    for i in range(5):
+        ratio = i / 4
+        y = int(round((1 - ratio) * (height - 1)))
+        value = frequencies[0] + ratio * (frequencies[-1] - frequencies[0])
+        draw.line([(margin_left - 4, y), (margin_left - 1, y)], fill="black")
+        draw.text((2, max(0, min(height - 10, y - 5))), f"{value:.0f}", fill="black")
+
+        x = margin_left + int(round(ratio * (width - 1)))
+        value = times[0] + ratio * (times[-1] - times[0])
+        draw.line([(x, height), (x, height + 3)], fill="black")
+        draw.text((max(margin_left, min(margin_left + width - 24, x - 12)), height + 5), f"{value:.2f}", fill="black")
+    return canvas
+
+
+class SpectrogramRenderer:
+    """
+    Rendu direct des spectrogrammes en PNG/WebP.
+
+    Niveaux uint8 -> table de couleurs -> encodage, sans figure
+    matplotlib; les images sont gardées dans un cache LRU indexé par
+    l'identité du segment (fichier, segment, paramètres de rendu).
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def render_levels(self, levels: np.ndarray, colormap: str = "viridis", fmt: str = "png",
+                      size: Optional[Tuple[int, int]] = None) -> bytes:
+        """Image d'une matrice uint8 déjà orientée (ligne 0 en haut)"""
+        if size is not None and levels.shape[::-1] != size:
+            levels = np.asarray(Image.fromarray(np.ascontiguousarray(levels, dtype=np.uint8)).resize(size, Image.BILINEAR))
+        return encode_image(apply_colormap(levels, colormap), fmt)
+
+    def render(self, spectrogram_db: np.ndarray, frequencies: Optional[Sequence[float]] = None,
+               times: Optional[Sequence[float]] = None, colormap: str = "viridis", fmt: str = "png",
+               size: Optional[Tuple[int, int]] = (640, 320), axes: bool = False,
+               vmin: Optional[float] = None, vmax: Optional[float] = None,
+               cache_key: Optional[Hashable] = None) -> bytes:
+        """
+        Image d'un spectrogramme (n_freqs, n_trames) en dB, basses fréquences en bas
+
+        [vmin, vmax] fixe l'échelle de couleurs (défaut: min et max de la
+        matrice). Avec `cache_key`, le rendu est mémorisé pour ces paramètres.
+        """
+        key = None
+        if cache_key is not None:
+            key = (cache_key, colormap, fmt, size, axes, vmin, vmax)
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+
+        levels = np.flipud(to_uint8(spectrogram_db, vmin, vmax))
+        if size is not None:
+            levels = np.asarray(Image.fromarray(np.ascontiguousarray(levels)).resize(size, Image.BILINEAR))
+        rgb = apply_colormap(levels, colormap)
+
+        if axes and frequencies is not None and times is not None and len(frequencies) and len(times):
+            rgb = np.asarray(_draw_axes(Image.fromarray(rgb), frequencies, times))
+        image_bytes = encode_image(rgb, fmt)
+
+        if key is not None:
+            with self._lock:
+                self._cache[key] = image_bytes
+                while len(self._cache) > self.max_entries:
+                    self._cache.popitem(last=False)
+        return image_bytes
+
+    def stats(self) -> Dict:
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                "entries": len(self._cache),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+            }
+
+
+spectrogram_renderer = SpectrogramRenderer()
@@ -1,12 +1,20 @@
 import numpy as np
 import pandas as pd
 from scipy import signal
+from scipy import fft as sp_fft
 import base64
-import io
-import matplotlib
-matplotlib.use('Agg')  # Backend non-interactif
-import matplotlib.pyplot as plt
-from typing import Dict, Tuple, List
+from typing import Dict, Tuple, List, Optional
+from .dsp_plans import plan_cache
+from .dsp import float_dtype
+from .feature_engine import feature_engine
+from .spectrogram_renderer import spectrogram_renderer
+
+# Caractéristiques historiques de extract_features et extract_features_batch
+DEFAULT_FEATURES = [
+    "rms", "dominant_frequency", "energy_low_freq", "energy_mid_freq", "energy_high_freq",
+    "signal_mean", "signal_std", "signal_max", "signal_min"
+]
+BATCH_FEATURES = DEFAULT_FEATURES[:7] + ["signal_skewness", "signal_kurtosis"] + DEFAULT_FEATURES[7:]
 
 class SpectrogramService:
     
@@ -32,6 +40,7 @@ class SpectrogramService:
         # Paramètres STFT
         nperseg = min(256, len(signal_data) // 4)  # Taille fenêtre
         noverlap = nperseg // 2  # Recouvrement 50%
+        plan = plan_cache.get(fs, nperseg, nperseg - noverlap)
         
         # Calcul spectrogramme
         f, t, Sxx = signal.spectrogram(
@@ -39,7 +48,7 @@ class SpectrogramService:
             fs=fs, 
             nperseg=nperseg, 
             noverlap=noverlap,
-            window='hann'
+            window=plan.window
         )
         
         # Conversion en dB
@@ -56,12 +65,69 @@ class SpectrogramService:
         }
     
     @staticmethod
-    def generate_spectrogram_image(data: pd.DataFrame, fs: int = 1000) -> str:
+    def generate_spectrograms_batch(signals: np.ndarray, fs: float = 1000, nperseg: Optional[int] = None,
+                                    band: Optional[Tuple[float, float]] = None,
+                                    freq_range: Optional[Tuple[Optional[float], Optional[float]]] = None,
+                                    workers: int = -1, dtype=None) -> Dict:
         """
-        Génère une image PNG du spectrogramme encodée en base64
+        Spectrogrammes de plusieurs capteurs en un seul appel vectorisé
         
+        Même résultat que generate_spectrogram ligne par ligne (fenêtre de Hann,
+        recouvrement 50%, densité en dB); filtrage et FFT portent sur tout le lot.
+        
+        Args:
+            signals: Tableau (n_capteurs, n_samples)
+            fs: Fréquence d'échantillonnage en Hz
+            nperseg: Taille de fenêtre (défaut: comme generate_spectrogram)
+            band: Passe-bande (f_min, f_max) appliqué avant la STFT
+            freq_range: Bins de fréquence conservés
+            workers: Threads FFT de scipy.fft (-1: tous les cœurs)
+            dtype: Précision des calculs (DSP_PRECISION par défaut)
+            
         Returns:
-            String base64 de l'image PNG
+            Dict avec "spectrograms" (n_capteurs, n_freqs, n_trames) et les axes
+        """
+        dtype = float_dtype(dtype)
+        signals = np.atleast_2d(np.asarray(signals, dtype=dtype))
+        n_samples = signals.shape[1]
+        if nperseg is None:
+            nperseg = min(256, n_samples // 4)
+        hop = nperseg - nperseg // 2
+        plan = plan_cache.get(fs, nperseg, hop, band=band, freq_range=freq_range, dtype=dtype)
+        
+        if plan.sos is not None:
+            signals = signal.sosfiltfilt(plan.sos, signals, axis=-1)
+        
+        # Trames (n_capteurs, n_trames, nperseg), detrend constant comme scipy
+        frames = np.lib.stride_tricks.sliding_window_view(signals, nperseg, axis=-1)[:, ::hop]
+        frames = (frames - frames.mean(axis=-1, keepdims=True)) * plan.window
+        spectrum = sp_fft.rfft(frames, axis=-1, workers=workers)
+        power = (spectrum.real**2 + spectrum.imag**2) * plan.scale
+        # Spectre unilatéral: doubler tout sauf DC (et Nyquist si nperseg pair)
+        power[..., 1:(None if nperseg % 2 else -1)] *= 2
+        
+        Sxx_db = 10 * np.log10(power[..., plan.freq_mask].transpose(0, 2, 1) + 1e-12)
+        f = plan.masked_frequencies
+        t = (np.arange(frames.shape[1]) * hop + nperseg / 2) / fs
+        
+        return {
+            "frequencies": f,
+            "times": t,
+            "spectrograms": Sxx_db,
+            "fs": fs,
+            "signal_length": n_samples,
+            "frequency_resolution": f[1] - f[0] if len(f) > 1 else 0,
+            "time_resolution": t[1] - t[0] if len(t) > 1 else 0
+        }
+    
+    @staticmethod
+    def render_spectrogram_image(data: pd.DataFrame, fs: int = 1000, fmt: str = "png",
+                                 axes: bool = True) -> bytes:
+        """
+        Génère l'image du spectrogramme (PNG ou WebP)
+        
+        Returns:
+            Octets de l'image, basses fréquences en bas
         """
         numeric_cols = data.select_dtypes(include=[np.number]).columns
         if len(numeric_cols) == 0:
@@ -72,6 +138,7 @@ class SpectrogramService:
         # Paramètres STFT
         nperseg = min(256, len(signal_data) // 4)
         noverlap = nperseg // 2
+        plan = plan_cache.get(fs, nperseg, nperseg - noverlap)
         
         # Calcul spectrogramme
         f, t, Sxx = signal.spectrogram(
@@ -79,32 +146,30 @@ class SpectrogramService:
             fs=fs, 
             nperseg=nperseg, 
             noverlap=noverlap,
-            window='hann'
+            window=plan.window
         )
         
-        # Création du graphique
-        plt.figure(figsize=(8, 4))
-        plt.pcolormesh(t, f, 10 * np.log10(Sxx + 1e-12), shading='gouraud', cmap='viridis')
-        plt.ylabel('Fréquence [Hz]')
-        plt.xlabel('Temps [s]')
-        plt.title('Spectrogramme')
-        plt.colorbar(label='Puissance [dB]')
-        plt.tight_layout()
-        
-        # Conversion en base64
-        buffer = io.BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
-        plt.close()
-        
-        return image_base64
+        return spectrogram_renderer.render(10 * np.log10(Sxx + 1e-12), f, t, fmt=fmt, axes=axes)
+    
+    @staticmethod
+    def generate_spectrogram_image(data: pd.DataFrame, fs: int = 1000) -> str:
+        """
+        Génère une image PNG du spectrogramme encodée en base64
+        
+        Returns:
+            String base64 de l'image PNG
+        """
+        image_bytes = SpectrogramService.render_spectrogram_image(data, fs)
+        return base64.b64encode(image_bytes).decode()
     
     @staticmethod
-    def extract_features(data: pd.DataFrame, fs: int = 1000) -> Dict:
+    def extract_features(data: pd.DataFrame, fs: int = 1000, features: Optional[List[str]] = None) -> Dict:
         """
         Extrait des caractéristiques du signal pour l'analyse IA
         
+        Args:
+            features: Sous-ensemble du registre à calculer (défaut: DEFAULT_FEATURES)
+        
         Returns:
             Dict avec RMS, fréquences dominantes, etc.
         """
@@ -113,32 +178,23 @@ class SpectrogramService:
             return {}
         
         signal_data = data[numeric_cols[0]].values
+        return feature_engine.compute_one(signal_data, fs, features or DEFAULT_FEATURES)
+    
+    @staticmethod
+    def extract_features_batch(segments: np.ndarray, fs: float,
+                               bands: Optional[Dict[str, Tuple[float, float]]] = None,
+                               dtype=None, features: Optional[List[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Extrait les caractéristiques de plusieurs segments en une passe vectorisée
         
-        # RMS
-        rms = np.sqrt(np.mean(signal_data**2))
-        
-        # FFT pour fréquences dominantes
-        fft = np.fft.fft(signal_data)
-        freqs = np.fft.fftfreq(len(signal_data), 1/fs)
-        magnitude = np.abs(fft)
-        
-        # Fréquence dominante
-        dominant_freq_idx = np.argmax(magnitude[:len(magnitude)//2])
-        dominant_freq = freqs[dominant_freq_idx]
-        
-        # Énergie par bandes de fréquence
-        low_freq = np.sum(magnitude[(freqs >= 0) & (freqs < 100)])
-        mid_freq = np.sum(magnitude[(freqs >= 100) & (freqs < 300)])
-        high_freq = np.sum(magnitude[(freqs >= 300) & (freqs < 500)])
-        
-        return {
-            "rms": float(rms),
-            "dominant_frequency": float(dominant_freq),
-            "energy_low_freq": float(low_freq),
-            "energy_mid_freq": float(mid_freq), 
-            "energy_high_freq": float(high_freq),
-            "signal_mean": float(np.mean(signal_data)),
-            "signal_std": float(np.std(signal_data)),
-            "signal_max": float(np.max(signal_data)),
-            "signal_min": float(np.min(signal_data))
-        }
\ No newline at end of file
+        Args:
+            segments: Tableau (n_segments, n_samples)
+            fs: Fréquence d'échantillonnage en Hz
+            bands: Bandes {nom: (f_min, f_max)} pour les énergies
+            dtype: Précision des calculs (DSP_PRECISION par défaut)
+            features: Sous-ensemble du registre à calculer (défaut: BATCH_FEATURES)
+            
+        Returns:
+            Dict {caractéristique: tableau (n_segments,)}
+        """
+        return feature_engine.compute(segments, fs, features or BATCH_FEATURES, bands=bands, dtype=dtype)
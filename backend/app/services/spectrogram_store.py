@@ -0,0 +1,213 @@
+import json
+import threading
+import numpy as np
+from dataclasses import dataclass
+from pathlib import Path
+from scipy import signal
+from typing import Dict, Optional, Tuple, Union
+from ..core.config import settings
+from .dsp_plans import decimation_filter
+from .signal_store import signal_store, atomic_write
+from .streaming_spectrogram import StreamingSpectrogram
+
+
+@dataclass(frozen=True)
+class SpectrogramProfile:
+    """Paramètres STFT d'un consommateur du dataset"""
+    name: str
+    fs: float
+    nperseg: int
+    noverlap: int
+    window: Union[str, Tuple] = 'hann'
+    band: Optional[Tuple[float, float]] = None  # passe-bande appliqué avant la STFT
+    max_freq: Optional[float] = None
+    segments: Optional[int] = None  # None: trames sur tout le fichier, n: n segments indépendants
+    decimation: int = 1  # fs est la cadence décimée; index source = index * decimation
+
+    @property
+    def hop(self) -> int:
+        return self.nperseg - self.noverlap
+
+    def params(self) -> Dict:
+        """Paramètres dont dépend le tenseur stocké (un tenseur construit autrement est ignoré)"""
+        return {"fs": self.fs, "nperseg": self.nperseg, "noverlap": self.noverlap,
+                "decimation": self.decimation, "band": list(self.band) if self.band else None,
+                "filter": "sosfilt" if self.band else None}
+
+
+PROFILES = {
+    # DatasetService.get_next_segment -> SpectrogramService.generate_spectrogram (6 segments de 5 s)
+    "dataset": SpectrogramProfile("dataset", fs=1000, nperseg=256, noverlap=128, segments=6),
+    # Flux /ws/acoustic -> StreamingSpectrogram sur le signal décimé (trames identiques au flux en direct)
+    "acoustic": SpectrogramProfile("acoustic", fs=51200.0 / settings.ACOUSTIC_DECIMATION,
+                                   nperseg=512 // settings.ACOUSTIC_DECIMATION,
+                                   noverlap=256 // settings.ACOUSTIC_DECIMATION,
+                                   window=('tukey', 0.25), band=(200.0, 4000.0), max_freq=4000.0,
+                                   decimation=settings.ACOUSTIC_DECIMATION),
+    # dataset_real.get_real_data (fenêtre par défaut de scipy)
+    "dataset_real": SpectrogramProfile("dataset_real", fs=1000.0, nperseg=128, noverlap=64,
+                                       window=('tukey', 0.25)),
+}
+
+
+class SpectrogramStore:
+    """
+    Spectrogrammes précalculés des fichiers du dataset.
+
+    Chaque fichier est transformé une fois par profil (build_spectrograms.py);
+    les tenseurs float16 en dB sont ouverts en mmap et servir le spectrogramme
+    d'un segment se réduit à une tranche.
+    """
+
+    def __init__(self):
+        self._open: Dict[Tuple[str, str], Tuple[float, np.ndarray, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def paths(self, csv_path: Path, profile: SpectrogramProfile) -> Tuple[Path, Path]:
+        """Chemins du tenseur et de ses métadonnées pour un fichier"""
+        base = Path(csv_path).with_suffix("")
+        return (base.with_name(f"{base.name}.spec-{profile.name}.f16.npy"),
+                base.with_name(f"{base.name}.spec-{profile.name}.json"))
+
+    def _source_mtime(self, csv_path: Path) -> float:
+        return signal_store.source_path(Path(csv_path)).stat().st_mtime
+
+    def build(self, csv_path: Path, profile: SpectrogramProfile) -> Path:
+        """Calcule et enregistre le spectrogramme d'un fichier pour un profil"""
+        csv_path = Path(csv_path)
+        source_mtime = self._source_mtime(csv_path)
+        values = np.asarray(signal_store.load(csv_path), dtype=np.float64)
+
+        if profile.decimation > 1:
+            # Même décimation polyphase que SignalStream (bande utile [0, max_freq])
+            source_fs = profile.fs * profile.decimation
+            taps = decimation_filter(profile.decimation, source_fs, profile.max_freq or 0.5 * profile.fs)
+            values = signal.resample_poly(values, 1, profile.decimation, window=taps).astype(np.float32)
+
+        meta = {
+            "profile": profile.name,
+            "params": profile.params(),
+            "fs": profile.fs,
+            "nperseg": profile.nperseg,
+            "noverlap": profile.noverlap,
+            "hop": profile.hop,
+            "source_mtime": source_mtime,
+            "signal_length": len(values),
+        }
+
+        if profile.segments:
+            segment_size = len(values) // profile.segments
+            if segment_size // 4 < profile.nperseg:
+                raise ValueError(f"Segments trop courts pour nperseg={profile.nperseg}: {csv_path}")
+            stacked = values[:segment_size * profile.segments].reshape(profile.segments, segment_size)
+            f, t, Sxx = signal.spectrogram(stacked, fs=profile.fs, window=profile.window,
+                                           nperseg=profile.nperseg, noverlap=profile.noverlap, axis=-1)
+            meta.update({"segment_size": segment_size, "segments": profile.segments, "times": t.tolist()})
+            Sxx_db = 10 * np.log10(Sxx + 1e-12)
+        elif profile.band:
+            # Moteur du flux en direct sur tout le fichier: filtre causal démarré au début
+            # du fichier, trames identiques à celles calculées par StreamingSpectrogram
+            engine = StreamingSpectrogram(profile.fs, nperseg=profile.nperseg, hop=profile.hop,
+                                          band=profile.band, max_freq=profile.max_freq,
+                                          history_frames=0, window=profile.window)
+            Sxx_db, _ = engine.push(values)
+            f = engine.frequencies
+            meta["n_frames"] = int(Sxx_db.shape[-1])
+        else:
+            f, t, Sxx = signal.spectrogram(values, fs=profile.fs, window=profile.window,
+                                           nperseg=profile.nperseg, noverlap=profile.noverlap)
+            if profile.max_freq is not None:
+                freq_mask = f <= profile.max_freq
+                f = f[freq_mask]
+                Sxx = Sxx[freq_mask, :]
+            Sxx_db = 10 * np.log10(Sxx + 1e-12)
+            meta["n_frames"] = int(Sxx.shape[-1])
+
+        meta["frequencies"] = f.tolist()
+        Sxx_db = Sxx_db.astype(np.float16)
+
+        tensor_path, meta_path = self.paths(csv_path, profile)
+        atomic_write(tensor_path, lambda fh: np.save(fh, Sxx_db))
+        atomic_write(meta_path, lambda fh: fh.write(json.dumps(meta).encode()))
+        return tensor_path
+
+    def is_built(self, csv_path: Path, profile: SpectrogramProfile) -> bool:
+        """Vrai si le spectrogramme stocké correspond à la version actuelle du fichier"""
+        return self._load(csv_path, profile) is not None
+
+    def _load(self, csv_path: Path, profile: SpectrogramProfile) -> Optional[Tuple[np.ndarray, Dict]]:
+        key = (str(csv_path), profile.name)
+        try:
+            source_mtime = self._source_mtime(Path(csv_path))
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._open.get(key)
+        if cached and cached[0] == source_mtime:
+            return cached[1], cached[2]
+
+        tensor_path, meta_path = self.paths(csv_path, profile)
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            if meta["source_mtime"] != source_mtime or meta.get("params") != profile.params():
+                return None
+            tensor = np.load(tensor_path, mmap_mode='r')
+            meta["frequencies_array"] = np.asarray(meta["frequencies"])
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            return None
+
+        with self._lock:
+            self._open[key] = (source_mtime, tensor, meta)
+        return tensor, meta
+
+    def segment(self, csv_path: Path, profile_name: str, index: int) -> Optional[Dict]:
+        """Spectrogramme du segment `index` au format de SpectrogramService.generate_spectrogram (matrice numpy float32)"""
+        profile = PROFILES[profile_name]
+        loaded = self._load(csv_path, profile)
+        if loaded is None:
+            return None
+        tensor, meta = loaded
+        if not 0 <= index < meta["segments"]:
+            return None
+
+        frequencies, times = meta["frequencies"], meta["times"]
+        return {
+            "frequencies": frequencies,
+            "times": times,
+            "spectrogram": tensor[index].astype(np.float32),
+            "fs": meta["fs"],
+            "signal_length": meta["segment_size"],
+            "frequency_resolution": frequencies[1] - frequencies[0] if len(frequencies) > 1 else 0,
+            "time_resolution": times[1] - times[0] if len(times) > 1 else 0
+        }
+
+    def frames(self, csv_path: Path, profile_name: str, start: int,
+               n_samples: int) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Trames STFT couvrant les échantillons [start, start + n_samples)
+
+        `start` et `n_samples` sont à la cadence du profil (décimée) et `start`
+        doit être aligné sur son hop. Retourne (Sxx_db, f, t) pour ces trames, ou
+        None si indisponible (tenseur absent ou construit avec d'autres paramètres).
+        """
+        profile = PROFILES[profile_name]
+        if start % profile.hop or n_samples < profile.nperseg:
+            return None
+        loaded = self._load(csv_path, profile)
+        if loaded is None:
+            return None
+        tensor, meta = loaded
+
+        first = start // profile.hop
+        count = (n_samples - profile.nperseg) // profile.hop + 1
+        if first + count > meta["n_frames"]:
+            return None
+
+        times = (np.arange(count) * profile.hop + profile.nperseg / 2) / profile.fs
+        return (tensor[:, first:first + count].astype(np.float32),
+                meta["frequencies_array"], times)
+
+
+spectrogram_store = SpectrogramStore()
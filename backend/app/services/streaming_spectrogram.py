@@ -0,0 +1,93 @@
+import numpy as np
+from collections import deque
+from scipy import signal
+from typing import Optional, Tuple
+from .dsp_plans import plan_cache
+
+
+class StreamingSpectrogram:
+    """
+    Spectrogramme incrémental pour un flux continu.
+
+    Le passe-bande est causal (sosfilt) et garde son état `zi` d'un bloc à
+    l'autre; seules les trames STFT complétées par les nouveaux échantillons
+    sont calculées. La mise à l'échelle reproduit scipy.signal.spectrogram
+    (densité, detrend constant, spectre unilatéral).
+    """
+
+    def __init__(self, fs: float, nperseg: int = 512, hop: int = 256,
+                 band: Tuple[float, float] = (200.0, 4000.0), order: int = 4,
+                 max_freq: Optional[float] = 4000.0, history_frames: int = 39,
+                 window=('tukey', 0.25), dtype=None):
+        self.fs = fs
+        self.nperseg = nperseg
+        self.hop = hop
+        plan = plan_cache.get(fs, nperseg, hop, band=band, order=order, window=window,
+                              freq_range=(None, max_freq), dtype=dtype)
+        self.dtype = plan.dtype
+        self.sos = plan.sos
+        self.window = plan.window
+        self.scale = plan.scale
+        self.freq_mask = plan.freq_mask
+        self.frequencies = plan.masked_frequencies
+
+        # Facteur 2 du spectre unilatéral, sauf DC et Nyquist
+        onesided = np.full(len(plan.frequencies), 2.0)
+        onesided[0] = 1.0
+        if nperseg % 2 == 0:
+            onesided[-1] = 1.0
+        self.onesided = onesided[self.freq_mask].astype(self.dtype)
+
+        self.history = deque(maxlen=history_frames)
+        self.reset()
+
+    def reset(self):
+        """Oublie l'état du filtre et le buffer (changement de fichier)"""
+        self._zi = None
+        self._buffer = np.zeros(0, dtype=self.dtype)
+        self._buffer_start = 0  # index absolu du premier échantillon du buffer
+        self._next_frame = 0    # index absolu du début de la prochaine trame
+        self.history.clear()
+
+    def push(self, samples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ajoute des échantillons et retourne les nouvelles colonnes
+
+        Returns:
+            (colonnes en dB de forme (n_freqs, n_nouvelles), centres des trames en s)
+        """
+        samples = np.asarray(samples, dtype=self.dtype)
+        if self._zi is None:
+            # Démarrage en régime établi pour éviter le transitoire du premier échantillon
+            zi = signal.sosfilt_zi(self.sos.astype(np.float64)) * (samples[0] if len(samples) else 0.0)
+            self._zi = zi.astype(self.dtype)
+        filtered, self._zi = signal.sosfilt(self.sos, samples, zi=self._zi)
+        self._buffer = np.concatenate([self._buffer, filtered])
+
+        offset = self._next_frame - self._buffer_start
+        n_frames = max(0, (len(self._buffer) - offset - self.nperseg) // self.hop + 1)
+        if n_frames == 0:
+            return np.zeros((len(self.frequencies), 0), dtype=self.dtype), np.zeros(0)
+
+        frames = np.lib.stride_tricks.sliding_window_view(self._buffer[offset:], self.nperseg)[::self.hop][:n_frames]
+        frames = frames - frames.mean(axis=1, keepdims=True)
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1)[:, self.freq_mask])**2
+        columns = (10 * np.log10(spectrum * self.scale * self.onesided + 1e-12)).T
+
+        starts = self._next_frame + self.hop * np.arange(n_frames)
+        times = (starts + self.nperseg / 2) / self.fs
+
+        # Ne garder que les échantillons utiles aux trames suivantes
+        self._next_frame += self.hop * n_frames
+        keep_from = self._next_frame - self._buffer_start
+        self._buffer = self._buffer[keep_from:]
+        self._buffer_start = self._next_frame
+
+        self.history.extend(columns.T)
+        return columns, times
+
+    def matrix(self) -> np.ndarray:
+        """Spectrogramme glissant des dernières trames, forme (n_freqs, n_trames)"""
+        if not self.history:
+            return np.zeros((len(self.frequencies), 0), dtype=self.dtype)
+        return np.stack(self.history, axis=1)
@@ -0,0 +1,109 @@
+import numpy as np
+from scipy import signal
+from . import dsp
+from .dsp_plans import plan_cache
+
+# Calculs de /api/vibration/analyze, sans dépendance au router ni à la base:
+# importables par les processus du pool DSP.
+
+
+def calculate_vibration_signal(acc_x: np.ndarray, acc_y: np.ndarray, acc_z: np.ndarray) -> np.ndarray:
+    """
+    Calcule le signal vibratoire à partir des trois axes d'accélération
+    Signal vibratoire = magnitude du vecteur d'accélération
+    """
+    # Calculer la magnitude du vecteur d'accélération
+    vibration = np.sqrt(acc_x**2 + acc_y**2 + acc_z**2)
+    return vibration
+
+def calculate_spectrogram(vibration_signal: np.ndarray, sampling_rate: float) -> tuple:
+    """
+    Calcule le spectrogramme du signal vibratoire (STFT interne, équivalente à librosa)
+    Filtre les fréquences entre 100Hz et 2000Hz
+    """
+    # Vérifier qu'on a assez de données
+    if len(vibration_signal) < 16:
+        # Pas assez de données, retourner un spectrogramme vide
+        return np.array([[]]), np.array([100.0, 2000.0]), np.array([0.0])
+    
+    # Normaliser le signal
+    vibration_normalized = vibration_signal / (np.max(np.abs(vibration_signal)) + 1e-10)
+    
+    # Calculer le spectrogramme
+    # STFT (Short-Time Fourier Transform)
+    # Adapter n_fft à la taille des données pour meilleure résolution
+    n_fft = min(512, len(vibration_normalized))  # Augmenté à 512
+    # S'assurer que n_fft est une puissance de 2
+    n_fft = 2 ** int(np.log2(n_fft))
+    hop_length = max(1, n_fft // 16)  # Réduit à //16 pour beaucoup plus de résolution temporelle
+    
+    # Fenêtre, axe et masque 100-2000 Hz partagés (cache de plans)
+    plan = plan_cache.get(sampling_rate, n_fft, hop_length, freq_range=(100.0, 2000.0))
+    
+    try:
+        D = dsp.stft(vibration_normalized, n_fft=n_fft, hop_length=hop_length, window=plan.window)
+        S_db = dsp.amplitude_to_db(np.abs(D), ref=np.max)
+        
+        # Calculer les axes de fréquence et temps
+        freqs = plan.frequencies
+        times = dsp.frames_to_time(np.arange(S_db.shape[1]), sr=sampling_rate, hop_length=hop_length)
+        
+        # Filtrer les fréquences entre 100Hz et 2000Hz
+        freq_mask = plan.freq_mask
+        
+        # Vérifier qu'on a des fréquences dans cette plage
+        if not np.any(freq_mask):
+            # Si aucune fréquence dans la plage, prendre toutes les fréquences disponibles
+            return S_db, freqs, times
+        
+        S_db_filtered = S_db[freq_mask, :]
+        freqs_filtered = freqs[freq_mask]
+        
+        return S_db_filtered, freqs_filtered, times
+    except Exception as e:
+        # En cas d'erreur, retourner un spectrogramme vide
+        print(f"Erreur calcul spectrogramme: {e}")
+        return np.array([[]]), np.array([100.0, 2000.0]), np.array([0.0])
+
+def analyze_vibration(vibration_signal: np.ndarray, sampling_rate: float) -> dict:
+    """
+    Analyse le signal vibratoire pour extraire des métriques
+    """
+    # RMS (Root Mean Square)
+    rms = np.sqrt(np.mean(vibration_signal**2))
+    
+    # Peak (valeur maximale)
+    peak = np.max(np.abs(vibration_signal))
+    
+    # Analyse fréquentielle
+    freqs, psd = signal.periodogram(vibration_signal, fs=sampling_rate)
+    
+    # Fréquence dominante
+    dominant_freq_idx = np.argmax(psd)
+    dominant_frequency = freqs[dominant_freq_idx]
+    
+    # Énergie (log) des tiers bas, moyen et haut du spectre, comparée à la ligne de base du capteur
+    band_energies = [float(np.log10(np.sum(band) + 1e-12)) for band in np.array_split(psd[1:], 3)]
+    
+    return {
+        "rms": float(rms),
+        "peak": float(peak),
+        "frequency": float(dominant_frequency),
+        "energy_low": band_energies[0],
+        "energy_mid": band_energies[1],
+        "energy_high": band_energies[2]
+    }
+
+def run_vibration_analysis(acc_x: np.ndarray, acc_y: np.ndarray, acc_z: np.ndarray,
+                           sampling_rate: float) -> dict:
+    """Signal vibratoire, métriques et spectrogramme (exécuté dans le pool DSP)"""
+    vibration_signal = calculate_vibration_signal(acc_x, acc_y, acc_z)
+    analysis = analyze_vibration(vibration_signal, sampling_rate)
+    S_db, freqs, times = calculate_spectrogram(vibration_signal, sampling_rate)
+    return {
+        "vibration_signal": vibration_signal,
+        "analysis": analysis,
+        "spectrogram": S_db,
+        "freqs": freqs,
+        "times": times
+    }
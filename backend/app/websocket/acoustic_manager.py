@@ -4,60 +4,64 @@ import numpy as np
 from pathlib import Path
 from scipy import signal as scipy_signal
 from ..services.signal_stream import SignalStream
+from ..services.spectrogram_store import spectrogram_store, PROFILES
+from ..services.streaming_spectrogram import StreamingSpectrogram
+from ..core.config import settings
 from .manager import manager
 
 # Initialiser le stream de données
 DATA_DIR = Path(__file__).parent.parent.parent.parent / "Accelerometer"
-stream = SignalStream(DATA_DIR) if DATA_DIR.exists() else None
+stream = SignalStream(DATA_DIR, decimation=settings.ACOUSTIC_DECIMATION) if DATA_DIR.exists() else None
 
-def compute_spectrogram(segment: np.ndarray, fs: float):
-    """Calculer le spectrogramme d'un segment"""
-    # Filtrage passe-bande comme dans l'ancien projet
-    from scipy.signal import butter, filtfilt
-    
-    def bandpass_filter(data, lowcut=200.0, highcut=4000.0, fs=51200.0, order=4):
-        nyquist = 0.5 * fs
-        low = lowcut / nyquist
-        high = highcut / nyquist
-        b, a = butter(order, [low, high], btype='band')
-        return filtfilt(b, a, data)
-    
-    filtered = bandpass_filter(segment, fs=fs)
-    
-    # Paramètres STFT
-    n_fft = 512
-    hop_length = 256
-    win_length = 512
-    
-    f, t, Sxx = scipy_signal.spectrogram(
-        filtered, 
-        fs=fs, 
-        nperseg=win_length, 
-        noverlap=win_length - hop_length,
-        nfft=n_fft
+# STFT de 512/256 échantillons à 51.2 kHz, ramenée à la cadence décimée
+DECIMATION = stream.decimation if stream else 1
+NPERSEG = 512 // DECIMATION
+HOP = 256 // DECIMATION
+
+# STFT incrémentale: seuls les échantillons nouveaux de chaque fenêtre sont filtrés et transformés
+streaming_spec = StreamingSpectrogram(
+    fs=stream.fs,
+    nperseg=NPERSEG,
+    hop=HOP,
+    history_frames=(stream.window_samples - NPERSEG) // HOP + 1
+) if stream else None
+_stream_position = {"file": None, "end": None}
+
+def streaming_spectrogram(segment):
+    """
+    Spectrogramme de la fenêtre via la STFT incrémentale.
+
+    Si la fenêtre prolonge la précédente (même fichier), seuls les nouveaux
+    échantillons sont poussés; sinon l'état du filtre est réinitialisé.
+    Retourne (Sxx_db, f, t, nouvelles colonnes, temps des colonnes dans le fichier).
+    """
+    contiguous = (
+        _stream_position["file"] == segment.file_path
+        and segment.start_idx < _stream_position["end"] <= segment.end_idx
     )
-    
-    # Limiter aux fréquences d'intérêt (0-4000 Hz)
-    freq_mask = f <= 4000.0
-    f_limited = f[freq_mask]
-    Sxx_limited = Sxx[freq_mask, :]
-    
-    # Convertir en dB
-    Sxx_db = 10 * np.log10(Sxx_limited + 1e-12)
-    
-    return Sxx_db, f_limited, t
+    if contiguous:
+        new_samples = segment.values[_stream_position["end"] - segment.start_idx:]
+    else:
+        streaming_spec.reset()
+        new_samples = segment.values
+    columns, column_times = streaming_spec.push(new_samples)
+    _stream_position["file"] = segment.file_path
+    _stream_position["end"] = segment.end_idx
 
-def spec_for_visualization(spec_raw: np.ndarray, freq_axis: np.ndarray):
-    """Préparer le spectrogramme pour visualisation"""
-    min_val = float(spec_raw.min())
-    max_val = float(spec_raw.max())
-    
+    spec_raw = streaming_spec.matrix()
+    time_axis = (np.arange(spec_raw.shape[1]) * streaming_spec.hop + streaming_spec.nperseg / 2) / segment.fs
+    return spec_raw, streaming_spec.frequencies, time_axis, columns, column_times
+
+def _scale_uint8(spec_raw: np.ndarray, min_val: float, max_val: float) -> np.ndarray:
     if max_val - min_val < 1e-6:
         norm = np.zeros_like(spec_raw)
     else:
         norm = (spec_raw - min_val) / (max_val - min_val)
-    
-    scaled = (norm * 255.0).clip(0, 255).astype(np.uint8)
+    return (norm * 255.0).clip(0, 255).astype(np.uint8)
+
+def spec_for_visualization(spec_raw: np.ndarray, freq_axis: np.ndarray):
+    """Préparer le spectrogramme pour visualisation"""
+    scaled = _scale_uint8(spec_raw, float(spec_raw.min()), float(spec_raw.max()))
     
     return {
         "matrix": scaled.tolist(),
@@ -71,15 +75,32 @@ def build_payload():
     
     try:
         segment = stream.next_segment()
-        spec_raw, freq_axis, time_axis = compute_spectrogram(segment.values, segment.fs)
+        # Trames précalculées (build_spectrograms.py) avec la même décimation et le même filtre causal;
+        # sinon (absentes ou autre décimation) STFT incrémentale
+        stored = None
+        if PROFILES["acoustic"].decimation == segment.decimation:
+            stored = spectrogram_store.frames(segment.file_path, "acoustic", segment.start_idx, len(segment.values))
+        if stored is not None:
+            spec_raw, freq_axis, time_axis = stored
+            columns = spec_raw[:, -(stream.hop_samples // HOP):]
+            column_times = segment.start_idx / segment.fs + time_axis[-columns.shape[1]:]
+            _stream_position["file"] = None
+        else:
+            spec_raw, freq_axis, time_axis, columns, column_times = streaming_spectrogram(segment)
         visual_spec = spec_for_visualization(spec_raw, freq_axis)
+        # Colonnes ajoutées depuis l'envoi précédent, même échelle que la matrice
+        scaled_columns = _scale_uint8(columns, float(spec_raw.min()), float(spec_raw.max()))
         
         return {
             "waveform": {
-                "samples": segment.samples.astype(float).tolist(),
-                "values": segment.values.astype(float).tolist(),
+                "samples": segment.samples.tolist(),
+                "values": segment.values.tolist(),
             },
             "spectrogram": visual_spec["matrix"],
+            "spectrogram_columns": {
+                "matrix": scaled_columns.tolist(),
+                "times": np.asarray(column_times, dtype=float).tolist(),
+            },
             "spectrogram_meta": {
                 "frequencies": visual_spec["frequencies"],
                 "times": time_axis.astype(float).tolist(),
@@ -114,6 +135,10 @@ def generate_fallback_payload():
             "values": signal.tolist(),
         },
         "spectrogram": scaled.tolist(),
+        "spectrogram_columns": {
+            "matrix": scaled.tolist(),
+            "times": time_axis.tolist(),
+        },
         "spectrogram_meta": {
             "frequencies": f.tolist(),
             "times": time_axis.tolist(),
@@ -130,6 +155,9 @@ async def acoustic_background_task():
     """Tâche de fond pour envoyer les données acoustiques"""
     print("Démarrage de la tâche acoustique...")
     
+    loop = asyncio.get_running_loop()
+    next_tick = loop.time()
+    
     while True:
         try:
             payload = build_payload()
@@ -147,6 +175,7 @@ async def acoustic_background_task():
             await manager.broadcast({
                 "type": "spectrogram_update", 
                 "spectrogram": payload["spectrogram"],
+                "spectrogram_columns": payload["spectrogram_columns"],
                 "spectrogram_meta": payload["spectrogram_meta"],
                 "source": payload["source"]
             })
@@ -158,4 +187,9 @@ async def acoustic_background_task():
             import traceback
             traceback.print_exc()
         
-        await asyncio.sleep(2)  # Toutes les 2 secondes comme l'ancien projet
\ No newline at end of file
+        # Toutes les 2 secondes comme l'ancien projet, sans dérive due au calcul
+        next_tick += 2
+        if next_tick < loop.time():
+            # En retard: repartir de maintenant plutôt que d'enchaîner les envois
+            next_tick = loop.time()
+        await asyncio.sleep(next_tick - loop.time())
\ No newline at end of file
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Précalcul des spectrogrammes du dataset pour chaque profil consommateur
+(dataset, acoustic, dataset_real), en parallèle sur tous les cœurs.
+
+Usage: python build_spectrograms.py [racine] [--profiles dataset,acoustic] [--workers N] [--force]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.dataset_manifest import manifest_for_root
+from app.services.spectrogram_store import spectrogram_store, PROFILES
+
+DEFAULT_ROOT = Path(__file__).parent.parent / "Accelerometer"
+
+
+def build_file(csv_path: str, profile_name: str) -> str:
+    """Calcule un spectrogramme (exécuté dans un processus du pool)"""
+    return str(spectrogram_store.build(Path(csv_path), PROFILES[profile_name]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Précalcul des spectrogrammes du dataset")
+    parser.add_argument("root", nargs="?", default=str(DEFAULT_ROOT), help="Racine du dataset")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Profils séparés par des virgules")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Recalculer même les spectrogrammes à jour")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if not root.exists():
+        print(f"❌ Dossier introuvable: {root}")
+        sys.exit(1)
+
+    profile_names = [name.strip() for name in args.profiles.split(",") if name.strip()]
+    unknown = [name for name in profile_names if name not in PROFILES]
+    if unknown:
+        print(f"❌ Profils inconnus: {', '.join(unknown)} (disponibles: {', '.join(PROFILES)})")
+        sys.exit(1)
+
+    files = manifest_for_root(root).paths()
+    todo = [(f, name) for f in files for name in profile_names
+            if args.force or not spectrogram_store.is_built(f, PROFILES[name])]
+    print(f"🔄 {len(todo)} spectrogramme(s) à calculer ({len(files)} fichiers, {args.workers} processus)")
+
+    errors = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(build_file, str(f), name): (f, name) for f, name in todo}
+        for future in as_completed(futures):
+            csv_file, name = futures[future]
+            try:
+                future.result()
+                print(f"✅ {csv_file.name} [{name}]")
+            except Exception as e:
+                errors += 1
+                print(f"❌ {csv_file.name} [{name}]: {e}")
+
+    if errors:
+        print(f"⚠️  {errors} erreur(s)")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Conversion du dataset Accelerometer en Parquet (ou sidecars .npy float32)
+en parallèle sur tous les cœurs, puis reconstruction du manifest.
+
+Usage: python convert_dataset.py [racine] [--format parquet|npy] [--workers N] [--force]
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.signal_store import signal_store
+from app.services.dataset_manifest import manifest_for_root
+
+DEFAULT_ROOT = Path(__file__).parent.parent / "Accelerometer"
+
+
+def is_converted(csv_path: Path, file_format: str) -> bool:
+    """Vrai si le fichier converti existe et est à jour"""
+    if file_format == "parquet":
+        return signal_store.has_columnar(csv_path)
+    return signal_store.is_fresh(csv_path)
+
+
+def convert_file(csv_path: str, file_format: str) -> str:
+    """Convertit un CSV (exécuté dans un processus du pool)"""
+    if file_format == "parquet":
+        return str(signal_store.convert_columnar(Path(csv_path)))
+    return str(signal_store.convert(Path(csv_path)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion du dataset Accelerometer")
+    parser.add_argument("root", nargs="?", default=str(DEFAULT_ROOT), help="Racine du dataset")
+    parser.add_argument("--format", choices=["parquet", "npy"], default="parquet")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Reconvertir même les fichiers à jour")
+    args = parser.parse_args()
+
+    root = Path(args.root)
+    if not root.exists():
+        print(f"❌ Dossier introuvable: {root}")
+        sys.exit(1)
+
+    csv_files = sorted(root.rglob("*.csv"))
+    todo = [f for f in csv_files if args.force or not is_converted(f, args.format)]
+    print(f"🔄 {len(todo)}/{len(csv_files)} fichiers à convertir en {args.format} ({args.workers} processus)")
+
+    errors = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = {executor.submit(convert_file, str(f), args.format): f for f in todo}
+        for future in as_completed(futures):
+            csv_file = futures[future]
+            try:
+                print(f"✅ {future.result()}")
+            except Exception as e:
+                errors += 1
+                print(f"❌ {csv_file}: {e}")
+
+    manifest = manifest_for_root(root)
+    manifest.refresh(force=True)
+    print(f"\n📋 Manifest: {len(manifest.files())} fichiers indexés")
+    if errors:
+        print(f"⚠️  {errors} erreur(s) de conversion")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Conversion hors ligne du modèle Keras de détection de fuite vers TFLite ou
+ONNX, avec quantification int8 post-entraînement optionnelle calibrée sur
+des spectrogrammes du dataset, et rapport de concordance avec Keras.
+
+Usage: python convert_model.py [--model transfer_learning_adxl345_model.h5]
+                               [--format tflite|onnx] [--quantize int8]
+                               [--root ../Accelerometer] [--calibration-samples 200]
+                               [--eval-samples 200] [--output chemin]
+
+Le modèle produit se sert avec ML_BACKEND=tflite|onnx et ML_MODEL_PATH=<sortie>.
+Le rapport JSON est écrit à côté (<sortie>.report.json).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.config import settings
+from app.services.dataset_manifest import manifest_for_root
+from app.services.inference_backends import create_backend
+from app.services.ml_preprocessing import create_spectrogram_224x224
+from app.services.signal_store import signal_store
+from app.services.spectrogram_store import PROFILES
+
+DEFAULT_ROOT = Path(__file__).parent.parent / "Accelerometer"
+DEFAULT_MODEL = "transfer_learning_adxl345_model.h5"
+
+
+def dataset_inputs(root: Path, window: int, count: int, seed: int) -> np.ndarray:
+    """
+    Entrées du modèle (n, 224, 224, 1) construites comme /api/ml/predict:
+    fenêtres de `window` échantillons tirées au hasard dans les fichiers du dataset
+    """
+    files = manifest_for_root(root).paths()
+    if not files:
+        raise ValueError(f"Aucun fichier de dataset sous {root}")
+    rng = np.random.default_rng(seed)
+    fs = PROFILES["dataset"].fs
+
+    inputs = []
+    for csv_path in rng.choice(files, size=count, replace=True):
+        values = signal_store.load(Path(csv_path))
+        if len(values) < window:
+            continue
+        start = int(rng.integers(0, len(values) - window + 1))
+        spectrogram, _ = create_spectrogram_224x224(np.abs(values[start:start + window]), fs)
+        inputs.append(spectrogram.astype(np.float32) / 255.0)
+    if not inputs:
+        raise ValueError(f"Aucun fichier d'au moins {window} échantillons")
+    return np.stack(inputs)
+
+
+def convert_tflite(model, output: Path, calibration: np.ndarray = None):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if calibration is not None:
+        # Poids et activations int8; entrée/sortie gardées en float32 (pas de changement côté API)
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = lambda: ([sample[None]] for sample in calibration)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    output.write_bytes(converter.convert())
+
+
+def convert_onnx(model, output: Path, calibration: np.ndarray = None):
+    import tensorflow as tf
+    import tf2onnx
+
+    # from_function plutôt que from_keras (non compatible Keras 3); lot dynamique
+    spec = (tf.TensorSpec((None, *model.input_shape[1:]), tf.float32, name="input"),)
+    forward = tf.function(lambda inputs: model(inputs, training=False))
+    float_path = output if calibration is None else output.with_suffix(".float.onnx")
+    tf2onnx.convert.from_function(forward, input_signature=spec, output_path=str(float_path))
+    if calibration is None:
+        return
+
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+
+    class SpectrogramReader(CalibrationDataReader):
+        def __init__(self):
+            self._samples = iter(calibration)
+
+        def get_next(self):
+            sample = next(self._samples, None)
+            return None if sample is None else {"input": sample[None]}
+
+    # Format QDQ: exécuté en int8 par ONNX Runtime sur CPU
+    quantize_static(str(float_path), str(output), SpectrogramReader(), quant_format=QuantFormat.QDQ,
+                    activation_type=QuantType.QInt8, weight_type=QuantType.QInt8)
+    float_path.unlink()
+
+
+def decisions(outputs: np.ndarray) -> np.ndarray:
+    """Classe prédite, comme /api/ml/predict (seuil sigmoid ou argmax softmax)"""
+    if outputs.shape[1] == 1:
+        return (outputs[:, 0] > settings.ML_LEAK_THRESHOLD).astype(int)
+    return outputs.argmax(axis=1)
+
+
+def predict_all(backend, samples: np.ndarray, batch_size: int = 32) -> np.ndarray:
+    return np.concatenate([backend.predict_on_batch(samples[i:i + batch_size])
+                           for i in range(0, len(samples), batch_size)])
+
+
+def latency_ms(backend, samples: np.ndarray, repeats: int = 20) -> float:
+    """Latence médiane d'une prédiction unitaire (après une exécution de chauffe)"""
+    backend.predict_on_batch(samples[:1])
+    timings = []
+    for i in range(repeats):
+        started = time.perf_counter()
+        backend.predict_on_batch(samples[i % len(samples)][None])
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return float(np.median(timings))
+
+
+def agreement_report(model_path: Path, output: Path, fmt: str, samples: np.ndarray) -> dict:
+    """Compare les sorties du modèle converti à celles du modèle Keras sur `samples`"""
+    reference = create_backend("keras", str(model_path))
+    converted = create_backend(fmt, str(output))
+    reference.load()
+    converted.load()
+
+    expected = predict_all(reference, samples)
+    actual = predict_all(converted, samples)
+    diff = np.abs(expected - actual)
+
+    return {
+        "samples": len(samples),
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "decision_agreement": float(np.mean(decisions(expected) == decisions(actual))),
+        "leak_threshold": settings.ML_LEAK_THRESHOLD,
+        "latency_ms": {"keras": latency_ms(reference, samples), fmt: latency_ms(converted, samples)},
+        "size_bytes": {"keras": model_path.stat().st_size, fmt: output.stat().st_size},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Conversion du modèle de détection de fuite (TFLite/ONNX)")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Modèle Keras (.h5)")
+    parser.add_argument("--format", choices=["tflite", "onnx"], default="tflite")
+    parser.add_argument("--quantize", choices=["int8"], help="Quantification post-entraînement")
+    parser.add_argument("--root", default=str(DEFAULT_ROOT), help="Racine du dataset (calibration et évaluation)")
+    parser.add_argument("--window", type=int, default=1000, help="Échantillons par spectrogramme")
+    parser.add_argument("--calibration-samples", type=int, default=200)
+    parser.add_argument("--eval-samples", type=int, default=200, help="Échantillons du rapport (0: pas de rapport)")
+    parser.add_argument("--output", help="Fichier produit (défaut: <modèle>[_int8].<format>)")
+    args = parser.parse_args()
+
+    model_path = Path(args.model)
+    if not model_path.exists():
+        print(f"❌ Modèle introuvable: {model_path}")
+        sys.exit(1)
+    root = Path(args.root)
+    if (args.quantize or args.eval_samples) and not root.exists():
+        print(f"❌ Dossier introuvable: {root}")
+        sys.exit(1)
+
+    suffix = "_int8" if args.quantize else ""
+    output = Path(args.output or model_path.with_name(f"{model_path.stem}{suffix}.{args.format}"))
+
+    from tensorflow import keras
+    model = keras.models.load_model(model_path)
+    print(f"✅ Modèle chargé: {model_path} (entrée {model.input_shape}, sortie {model.output_shape})")
+
+    calibration = None
+    if args.quantize:
+        calibration = dataset_inputs(root, args.window, args.calibration_samples, seed=0)
+        print(f"📊 Calibration int8: {len(calibration)} spectrogrammes du dataset")
+
+    started = time.perf_counter()
+    if args.format == "tflite":
+        convert_tflite(model, output, calibration)
+    else:
+        convert_onnx(model, output, calibration)
+    print(f"💾 {output} ({output.stat().st_size / 1e6:.1f} Mo, {time.perf_counter() - started:.1f}s)")
+
+    if args.eval_samples:
+        # Graine différente de la calibration: échantillons non vus par le quantificateur
+        samples = dataset_inputs(root, args.window, args.eval_samples, seed=1)
+        report = {"model": str(model_path), "output": str(output), "format": args.format,
+                  "quantize": args.quantize, **agreement_report(model_path, output, args.format, samples)}
+        report_path = output.with_name(output.name + ".report.json")
+        report_path.write_text(json.dumps(report, indent=2))
+
+        print(f"\n📈 Concordance avec Keras ({report['samples']} spectrogrammes):")
+        print(f"   - Écart max: {report['max_abs_diff']:.4f}, moyen: {report['mean_abs_diff']:.4f}")
+        print(f"   - Décisions identiques (seuil {settings.ML_LEAK_THRESHOLD}): {report['decision_agreement'] * 100:.1f}%")
+        for name, value in report["latency_ms"].items():
+            print(f"   - Latence {name}: {value:.1f} ms")
+        print(f"💾 Rapport: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+#!/usr/bin/env python3
+"""
+Extraction hors ligne des caractéristiques de tous les segments du dataset
+vers la table segment_features (reprise automatique via feature_checkpoints).
+
+Usage: python extract_features.py [--workers N] [--force]
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.dataset_service import DatasetService
+from app.services.feature_store import FeatureExtractionJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extraction des caractéristiques du dataset")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--force", action="store_true", help="Recalculer même les fichiers déjà traités")
+    args = parser.parse_args()
+
+    job = FeatureExtractionJob(DatasetService(), workers=args.workers)
+    stats = job.run(force=args.force)
+    print(f"\n📊 {stats['files']} fichier(s), {stats['segments']} segments, {stats['errors']} erreur(s)")
+    if stats["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
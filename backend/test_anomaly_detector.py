@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Validation du détecteur d'anomalies par capteur (StreamingDetector)
+
+Un pic isolé est signalé sans déplacer la ligne de base; un changement de
+niveau durable est signalé puis absorbé après DETECTOR_REBASELINE_AFTER
+anomalies consécutives.
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.anomaly_detector import StreamingDetector
+
+
+def make_detector() -> StreamingDetector:
+    return StreamingDetector(alpha=0.05, warmup=10, warning_z=3.0, anomaly_z=5.0, rebaseline_after=20)
+
+
+def baseline_segments(rng, level: float, count: int):
+    return [{"rms": level * (1 + 0.02 * rng.normal()), "peak": 3 * level * (1 + 0.02 * rng.normal())}
+            for _ in range(count)]
+
+
+def test_spike_does_not_move_baseline():
+    rng = np.random.default_rng(0)
+    detector = make_detector()
+    for metrics in baseline_segments(rng, 0.1, 50):
+        detector.observe("capteur", metrics)
+    ewma = detector.state("capteur")["rms"]["ewma"]
+
+    result = detector.observe("capteur", {"rms": 0.3, "peak": 0.9})
+    assert result["status"] == "anomaly", result
+    assert detector.state("capteur")["rms"]["ewma"] == ewma
+    assert detector.observe("capteur", baseline_segments(rng, 0.1, 1)[0])["status"] == "normal"
+    print("✅ Pic isolé: anomalie, ligne de base inchangée")
+
+
+def test_step_change_is_absorbed():
+    rng = np.random.default_rng(1)
+    detector = make_detector()
+    for metrics in baseline_segments(rng, 0.1, 50):
+        detector.observe("capteur", metrics)
+
+    statuses = [detector.observe("capteur", metrics) for metrics in baseline_segments(rng, 0.2, 40)]
+    anomalies = [result["status"] for result in statuses[:detector.rebaseline_after]]
+    assert anomalies == ["anomaly"] * detector.rebaseline_after, anomalies
+    assert statuses[detector.rebaseline_after - 1]["rebaselined"]
+    assert all(result["status"] == "normal" for result in statuses[-10:]), [r["status"] for r in statuses[-10:]]
+    assert abs(detector.state("capteur")["rms"]["ewma"] - 0.2) < 0.02
+    print(f"✅ Changement de niveau: absorbé après {detector.rebaseline_after} anomalies")
+
+
+if __name__ == "__main__":
+    print("🔄 Détecteur d'anomalies")
+    test_spike_does_not_move_baseline()
+    test_step_change_is_absorbed()
+    print("🎉 Détecteur validé")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Validation du module DSP interne contre librosa
+
+Compare STFT, conversion dB et axes sur les paramètres utilisés par
+vibration_analysis et ml_prediction (librosa requis pour ce script seulement).
+"""
+
+import os
+import sys
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import librosa
+from app.services import dsp
+
+# (longueur du signal, fréquence d'échantillonnage)
+CASES = [(16, 100.0), (100, 100.0), (513, 100.0), (1000, 1000.0), (4096, 3200.0), (51200, 51200.0)]
+
+
+def stft_params(n_samples: int):
+    """Paramètres STFT des routers (n_fft puissance de 2 <= 512, hop n_fft // 16)"""
+    n_fft = 2 ** int(np.log2(min(512, n_samples)))
+    return n_fft, max(1, n_fft // 16)
+
+
+def test_stft_matches_librosa():
+    rng = np.random.default_rng(0)
+    for n_samples, sr in CASES:
+        y = rng.normal(size=n_samples)
+        y = y / (np.max(np.abs(y)) + 1e-10)
+        n_fft, hop = stft_params(n_samples)
+
+        expected = librosa.stft(y, n_fft=n_fft, hop_length=hop, window='hann')
+        actual = dsp.stft(y, n_fft=n_fft, hop_length=hop, window='hann')
+        assert actual.shape == expected.shape, (actual.shape, expected.shape)
+        assert np.allclose(actual, expected, atol=1e-9), np.abs(actual - expected).max()
+
+        expected_db = librosa.amplitude_to_db(np.abs(expected), ref=np.max)
+        actual_db = dsp.amplitude_to_db(np.abs(actual), ref=np.max)
+        assert np.allclose(actual_db, expected_db, atol=1e-6), np.abs(actual_db - expected_db).max()
+
+        assert np.allclose(dsp.fft_frequencies(sr, n_fft), librosa.fft_frequencies(sr=sr, n_fft=n_fft))
+        frames = np.arange(expected.shape[1])
+        assert np.allclose(dsp.frames_to_time(frames, sr, hop),
+                           librosa.frames_to_time(frames, sr=sr, hop_length=hop))
+        print(f"✅ n={n_samples} sr={sr}: STFT {actual.shape}, écart dB max {np.abs(actual_db - expected_db).max():.2e}")
+
+
+def test_power_to_db_matches_librosa():
+    rng = np.random.default_rng(1)
+    S = rng.exponential(size=(64, 32))
+    for kwargs in ({}, {"ref": np.max}, {"top_db": None}, {"ref": 2.0, "amin": 1e-6}):
+        assert np.allclose(dsp.power_to_db(S, **kwargs), librosa.power_to_db(S, **kwargs))
+    print("✅ power_to_db identique")
+
+
+if __name__ == "__main__":
+    print("🔄 Validation DSP interne vs librosa", librosa.__version__)
+    test_stft_matches_librosa()
+    test_power_to_db_matches_librosa()
+    print("🎉 Module DSP conforme à librosa")
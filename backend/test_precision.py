@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Régression de précision: chemins DSP en float32 contre la référence float64
+
+Vérifie que le mode DSP_PRECISION=float32 reste dans les tolérances sur
+les spectrogrammes (dB) et les caractéristiques. Utilise un fichier du
+dataset Accelerometer s'il est présent, sinon un signal synthétique.
+"""
+
+import os
+import sys
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from scipy import signal
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.services import dsp
+from app.services.dsp_plans import decimation_filter
+from app.services.signal_store import signal_store
+from app.services.spectrogram_store import PROFILES
+from app.services.spectrogram_service import SpectrogramService
+from app.services.streaming_spectrogram import StreamingSpectrogram
+
+DATA_DIR = Path(__file__).parent.parent / "Accelerometer"
+
+# Écart max toléré en dB sur les bins à moins de DB_RANGE dB du maximum
+DB_TOLERANCE = 0.05
+DB_RANGE = 60.0
+# Écart relatif max toléré sur les caractéristiques
+FEATURE_TOLERANCE = 1e-3
+
+
+@lru_cache(maxsize=1)
+def load_signal(n_samples: int = 51200 * 2) -> np.ndarray:
+    """Deux secondes d'un enregistrement réel, ou bruit + raies si le dataset est absent (chargé une fois)"""
+    csv_files = sorted(DATA_DIR.rglob("*.csv")) if DATA_DIR.exists() else []
+    if csv_files:
+        print(f"📂 Signal: {csv_files[0].name}")
+        return np.asarray(signal_store.load(csv_files[0])[:n_samples], dtype=np.float64)
+    print("📂 Signal synthétique (dataset absent)")
+    rng = np.random.default_rng(0)
+    t = np.arange(n_samples) / 51200.0
+    return (0.02 * rng.normal(size=n_samples) + 0.01 * np.sin(2 * np.pi * 1200 * t)
+            + 0.005 * np.sin(2 * np.pi * 3100 * t))
+
+
+def compare_db(name: str, db32: np.ndarray, db64: np.ndarray):
+    assert db32.dtype == np.float32, f"{name}: {db32.dtype} au lieu de float32"
+    relevant = db64 > db64.max() - DB_RANGE
+    error = np.abs(db32.astype(np.float64) - db64)[relevant].max()
+    print(f"{'✅' if error <= DB_TOLERANCE else '❌'} {name}: écart max {error:.4f} dB")
+    assert error <= DB_TOLERANCE
+
+
+def test_streaming_spectrogram():
+    x = load_signal()
+    # Configuration du flux acoustique (/ws/acoustic et profil "acoustic" du store)
+    profile = PROFILES["acoustic"]
+    decimated = x
+    if profile.decimation > 1:
+        taps = decimation_filter(profile.decimation, profile.fs * profile.decimation, profile.max_freq)
+        decimated = signal.resample_poly(x, 1, profile.decimation, window=taps)
+    results = {}
+    for dtype in (np.float32, np.float64):
+        engine = StreamingSpectrogram(profile.fs, nperseg=profile.nperseg, hop=profile.hop, band=profile.band,
+                                      max_freq=profile.max_freq, history_frames=1000, window=profile.window,
+                                      dtype=dtype)
+        columns = [engine.push(chunk)[0] for chunk in np.array_split(decimated, 20)]
+        results[dtype] = np.concatenate(columns, axis=1)
+    compare_db("StreamingSpectrogram", results[np.float32], results[np.float64])
+
+
+def test_batch_spectrogram():
+    x = load_signal()
+    stacked = x[:4 * 8192].reshape(4, 8192)
+    db32 = SpectrogramService.generate_spectrograms_batch(stacked, dtype=np.float32)["spectrograms"]
+    db64 = SpectrogramService.generate_spectrograms_batch(stacked, dtype=np.float64)["spectrograms"]
+    compare_db("generate_spectrograms_batch", db32, db64)
+
+
+def test_librosa_style_stft():
+    x = load_signal()
+    results = {}
+    for dtype in (np.float32, np.float64):
+        y = x[:4096].astype(dtype)
+        y = y / (np.max(np.abs(y)) + 1e-10)
+        D = dsp.stft(y, n_fft=512, hop_length=32)
+        results[dtype] = dsp.amplitude_to_db(np.abs(D), ref=np.max)
+    compare_db("dsp.stft + amplitude_to_db", results[np.float32], results[np.float64])
+
+
+def test_features():
+    x = load_signal()
+    stacked = x[:8 * 8192].reshape(8, 8192)
+    f32 = SpectrogramService.extract_features_batch(stacked, fs=51200.0, dtype=np.float32)
+    f64 = SpectrogramService.extract_features_batch(stacked, fs=51200.0, dtype=np.float64)
+    worst = 0.0
+    for name, reference in f64.items():
+        scale = np.maximum(np.abs(reference), np.abs(reference).max() * 1e-3)
+        error = float(np.max(np.abs(f32[name] - reference) / scale))
+        worst = max(worst, error)
+        assert error <= FEATURE_TOLERANCE, f"{name}: écart relatif {error:.2e}"
+    print(f"✅ extract_features_batch: écart relatif max {worst:.2e}")
+
+
+if __name__ == "__main__":
+    print("🔄 Régression float32 vs float64")
+    test_streaming_spectrogram()
+    test_batch_spectrogram()
+    test_librosa_style_stft()
+    test_features()
+    print("🎉 Mode float32 dans les tolérances")